@@ -0,0 +1,174 @@
+"""
+Load test of the cancel_flight custom actions against local stub travel backends.
+
+N conversations run the actions of the cancel_flight flow (get_booking_details ->
+get_fare_rules -> calculate_cancellation_fee -> check_loyalty_status -> apply_loyalty_discount)
+at the same time, with the backends answering after BACKEND_LATENCY (FARES_LATENCY for the fare
+service, the slowest one). Conversations that fail, e.g. because connections time out, are
+counted as errors.
+
+By default the actions' TravelTools calls are replayed in process, through the shared pooled
+HttpTravelTools client and the prefetcher exactly like the async actions make them, and compared
+with a client that opens new connections for every call. Each backend gets MAX_CONCURRENCY pooled
+connections, the HttpTravelTools default: httpcore scans the whole pool for every request, and
+above about ten connections that costs more than the extra concurrency buys. Pass --action-server to load a running
+action server instead; start it from calm/ against the stub backend first:
+
+    TRAVEL_BACKEND_URL=http://127.0.0.1:8765 rasa run actions
+    python -m benchmarks.action_server_load --action-server http://localhost:5055 --backend-port 8765
+
+Run from the repository root:
+
+    python -m benchmarks.action_server_load
+"""
+import argparse
+import asyncio
+import inspect
+import statistics
+import time
+from datetime import datetime
+
+import httpx
+
+from benchmarks.stub_travel_backend import StubTravelBackend
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.http_tools import BACKEND_TOOLS, BackendConfig, HttpTravelTools, TOOL_BACKENDS
+from calm.shared_tools.prefetch import Prefetcher
+
+BACKEND_LATENCY = 0.02
+FARES_LATENCY = 0.1
+MAX_CONCURRENCY = BackendConfig._field_defaults["max_concurrency"]
+CONVERSATION_COUNTS = [10, 100, 500]
+UNPOOLED_MAX_CONVERSATIONS = 100
+CANCEL_FLIGHT_ACTIONS = ["get_booking_details", "get_fare_rules", "calculate_cancellation_fee",
+                         "check_loyalty_status", "apply_loyalty_discount"]
+
+
+class UnpooledTravelTools:
+    """A new HTTP client, and connection, for every call - what each action owning its client amounts to"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def __getattr__(self, name: str):
+        if name not in TOOL_BACKENDS:
+            raise AttributeError(name)
+        signature = inspect.signature(getattr(TravelTools, name))
+
+        async def call(*args):
+            async with httpx.AsyncClient(base_url=self.base_url) as client:
+                response = await client.post(f"/{name}", json=signature.bind(*args).arguments)
+            response.raise_for_status()
+            return response.json()
+
+        return call
+
+
+async def run_conversation(prefetcher: Prefetcher, sender_id: str) -> float:
+    """The TravelTools calls the cancel_flight actions make for one conversation, in flow order"""
+    start = time.perf_counter()
+    booking_details = await prefetcher.tools.get_booking_details("CONF12345")
+    prefetcher.prefetch_cancellation(sender_id, booking_details)
+    flight = booking_details["flight"]
+    await prefetcher.call(sender_id, "get_fare_rules", flight["airline"], flight["fare_class"],
+                          booking_details["booking_date"])
+    fee = await prefetcher.call(sender_id, "calculate_cancellation_fee", booking_details["booking_reference"],
+                                datetime.now().strftime("%Y-%m-%d"))
+    loyalty = await prefetcher.call(sender_id, "check_loyalty_status", booking_details["member_id"])
+    await prefetcher.call(sender_id, "apply_loyalty_discount", loyalty["status"], fee["original_amount"],
+                          fee["cancellation_fee"], booking_details["booking_reference"])
+    prefetcher.discard(sender_id)
+    return time.perf_counter() - start
+
+
+async def run_actions(base_url: str, conversations: int, pooled: bool):
+    if pooled:
+        tools = HttpTravelTools({backend: BackendConfig(base_url, MAX_CONCURRENCY) for backend in BACKEND_TOOLS})
+    else:
+        tools = UnpooledTravelTools(base_url)
+    prefetcher = Prefetcher(tools)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_conversation(prefetcher, f"load-{index}")
+                                     for index in range(conversations)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    if pooled:
+        await tools.aclose()
+    return elapsed, results
+
+
+async def run_action_server(action_server_url: str, conversations: int):
+    """Drive the actions through the action server webhook, carrying the slots they set"""
+    async def conversation(client: httpx.AsyncClient, sender_id: str) -> float:
+        slots = {"booking_id": "CONF12345"}
+        start = time.perf_counter()
+        for action in CANCEL_FLIGHT_ACTIONS:
+            response = await client.post("/webhook", json={
+                "next_action": action,
+                "sender_id": sender_id,
+                "tracker": {"sender_id": sender_id, "slots": dict(slots), "latest_message": {}, "events": [],
+                            "paused": False, "followup_action": None, "active_loop": {},
+                            "latest_action_name": None},
+                "domain": {},
+            })
+            response.raise_for_status()
+            for event in response.json()["events"]:
+                if event["event"] == "slot":
+                    slots[event["name"]] = event["value"]
+        return time.perf_counter() - start
+
+    limits = httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY)
+    async with httpx.AsyncClient(base_url=action_server_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(conversation(client, f"load-{index}") for index in range(conversations)),
+                                       return_exceptions=True)
+        return time.perf_counter() - start, results
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def print_row(label: str, conversations: int, elapsed: float, results, connections: int):
+    latencies = [result for result in results if not isinstance(result, BaseException)]
+    errors = len(results) - len(latencies)
+    if not latencies:
+        print(f"{label:>10} | {conversations:>13} | {'-':>15} | {'-':>8} | {'-':>8} | {connections:>11} | {errors:>6}")
+        return
+    print(f"{label:>10} | {conversations:>13} | {len(latencies) / elapsed:>15.1f} | "
+          f"{statistics.median(latencies) * 1000:>8.0f} | {percentile(latencies, 0.99) * 1000:>8.0f} | "
+          f"{connections:>11} | {errors:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--action-server", help="URL of a running action server to load instead of the "
+                                                "in-process replay")
+    parser.add_argument("--backend-port", type=int, default=0, help="port of the stub travel backend")
+    args = parser.parse_args()
+
+    print(f"Stub backend latency: {BACKEND_LATENCY * 1000:.0f} ms, fares {FARES_LATENCY * 1000:.0f} ms, "
+          f"{MAX_CONCURRENCY} requests in flight per backend")
+    print(f"{'client':>10} | {'conversations':>13} | {'conversations/s':>15} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | "
+          f"{'connections':>11} | {'errors':>6}")
+    with StubTravelBackend(latency=BACKEND_LATENCY, backend_latency={"fares": FARES_LATENCY},
+                           port=args.backend_port) as backend:
+        for conversations in CONVERSATION_COUNTS:
+            if args.action_server:
+                modes = [("server", None)]
+            elif conversations <= UNPOOLED_MAX_CONVERSATIONS:
+                modes = [("pooled", True), ("unpooled", False)]
+            else:
+                modes = [("pooled", True)]
+            for label, pooled in modes:
+                connections = backend.connection_count
+                if args.action_server:
+                    elapsed, results = asyncio.run(run_action_server(args.action_server, conversations))
+                else:
+                    elapsed, results = asyncio.run(run_actions(backend.base_url, conversations, pooled))
+                print_row(label, conversations, elapsed, results, backend.connection_count - connections)
+        print(f"Highest requests in flight per backend: {backend.max_in_flight}")
+
+
+if __name__ == "__main__":
+    main()
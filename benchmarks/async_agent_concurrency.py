@@ -0,0 +1,76 @@
+"""
+Concurrency benchmark for AsyncRealLLMTravelAgent against a local fake chat completions endpoint.
+
+N conversations each run one cancellation turn (3 LLM iterations, see CANCELLATION_SCRIPT). The
+async agent serves all of them from one event loop; the sync agent is given a fixed thread pool,
+which is the most it can do with one conversation per thread.
+
+Run from the repository root:
+
+    python -m benchmarks.async_agent_concurrency
+"""
+import asyncio
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.fake_chat_server import FakeChatCompletionsServer
+from flight_agent_react import AsyncRealLLMTravelAgent, RealLLMTravelAgent
+
+USER_MESSAGE = "Please cancel my booking CONF12345, last name Smith"
+LLM_LATENCY = 0.1
+SESSION_COUNTS = [1, 10, 100, 500]
+SYNC_THREADS = 8
+SYNC_MAX_SESSIONS = 100
+
+
+async def run_async_sessions(base_url: str, sessions: int) -> float:
+    # A generous connect timeout: with hundreds of turns starting at once, connections are opened
+    # while the event loop is busy building the first requests
+    llm_client = AsyncOpenAI(base_url=base_url, api_key="sk-fake", max_retries=0,
+                             timeout=httpx.Timeout(60.0, connect=30.0))
+    agents = [AsyncRealLLMTravelAgent(llm_client=llm_client) for _ in range(sessions)]
+    start = time.perf_counter()
+    await asyncio.gather(*(agent.react_loop(USER_MESSAGE) for agent in agents))
+    elapsed = time.perf_counter() - start
+    await llm_client.close()
+    return elapsed
+
+
+def run_sync_sessions(base_url: str, sessions: int) -> float:
+    llm_client = OpenAI(base_url=base_url, api_key="sk-fake", max_retries=0)
+    agents = [RealLLMTravelAgent(llm_client=llm_client) for _ in range(sessions)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=SYNC_THREADS) as pool:
+        list(pool.map(lambda agent: agent.react_loop(USER_MESSAGE), agents))
+    return time.perf_counter() - start
+
+
+def main():
+    rows = []
+    with FakeChatCompletionsServer(latency=LLM_LATENCY) as server:
+        for sessions in SESSION_COUNTS:
+            # The agents print every step, keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                async_time = asyncio.run(run_async_sessions(server.base_url, sessions))
+                sync_time = (run_sync_sessions(server.base_url, sessions)
+                             if sessions <= SYNC_MAX_SESSIONS else None)
+            rows.append((sessions, async_time, sync_time))
+
+    print(f"Fake LLM latency: {LLM_LATENCY * 1000:.0f} ms per call, {SYNC_THREADS} threads for the sync agent")
+    print(f"{'sessions':>8} | {'async (s)':>9} | {'async turns/s':>13} | {'sync (s)':>8} | {'sync turns/s':>12}")
+    for sessions, async_time, sync_time in rows:
+        sync_columns = (f"{sync_time:>8.2f} | {sessions / sync_time:>12.1f}" if sync_time is not None
+                        else f"{'-':>8} | {'-':>12}")
+        print(f"{sessions:>8} | {async_time:>9.2f} | {sessions / async_time:>13.1f} | {sync_columns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Lookup latency and memory of the booking repository behind get_booking_details,
+validate_booking_reference and validate_passenger_name (calm/shared_tools/booking_repository.py).
+
+Loads a synthetic bookings database (one million bookings by default, cached in the temp directory
+across runs), opens it and runs random lookups by booking reference, passenger last name and
+member id.
+
+Needs Linux (/proc) for the memory figures. Run from the repository root:
+
+    python -m benchmarks.booking_repository
+    python -m benchmarks.booking_repository --bookings 20000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from calm.shared_tools.booking_repository import LAST_NAMES, BookingRepository, load_bookings, synthetic_bookings
+
+QUERIES = 20000
+
+
+def database_path(bookings: int) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"bookings_{bookings}.sqlite")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        count = load_bookings(path, synthetic_bookings(bookings))
+        print(f"Loaded {count:,} bookings in {time.perf_counter() - start:.1f} s -> {path}")
+    return path
+
+
+def resident_mib() -> float:
+    """Current resident set size, the peak (ru_maxrss) would include the load"""
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--bookings", type=int, default=1_000_000, help="synthetic bookings (default %(default)s)")
+    args = parser.parse_args()
+
+    path = database_path(args.bookings)
+    rng = random.Random(1)
+    references = [f"CONF{rng.randrange(args.bookings):08d}" for _ in range(QUERIES)]
+    missing = [f"CONF{args.bookings + rng.randrange(10 ** 6):08d}" for _ in range(QUERIES)]
+    last_names = [rng.choice(LAST_NAMES) for _ in range(QUERIES)]
+    members = [booking["member_id"] for booking in synthetic_bookings(min(args.bookings, 50000), seed=0)
+               if booking["member_id"]]
+
+    rss_before = resident_mib()
+    repository = BookingRepository(path)
+    print(f"{len(repository):,} bookings, {os.path.getsize(path) / 2 ** 20:.0f} MiB file, "
+          f"page cache capped at {repository.cache_size_kib / 1024:.0f} MiB")
+    cases = [
+        ("get_booking (hit)", lambda reference, index: repository.get_booking(reference), references),
+        ("get_booking (miss)", lambda reference, index: repository.get_booking(reference), missing),
+        ("exists", lambda reference, index: repository.exists(reference), references),
+        ("has_passenger", lambda reference, index: repository.has_passenger(reference, last_names[index]),
+         references),
+        ("bookings_for_member", lambda member, index: repository.bookings_for_member(member),
+         [members[index % len(members)] for index in range(QUERIES)]),
+    ]
+    print(f"{'lookup':<20} | {'p50 (us)':>8} | {'p99 (us)':>8} | {'lookups/s':>10}")
+    for label, lookup, keys in cases:
+        latencies = []
+        for index, key in enumerate(keys):
+            start = time.perf_counter()
+            lookup(key, index)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        print(f"{label:<20} | {statistics.median(latencies):>8.1f} | {percentile(latencies, 0.99):>8.1f} | "
+              f"{len(latencies) / (sum(latencies) / 1e6):>10,.0f}")
+
+    rss_after = resident_mib()
+    print(f"RSS grew by {rss_after - rss_before:.1f} MiB over {len(cases) * QUERIES:,} lookups")
+    repository.close()
+
+
+if __name__ == "__main__":
+    main()
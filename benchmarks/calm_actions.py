@@ -0,0 +1,251 @@
+"""
+In-process benchmark of the calm custom actions, without rasa train or a running action server.
+
+The action modules under calm/actions are imported the way the action server does, and every
+Action found is run against a synthetic rasa_sdk Tracker and a CollectingDispatcher. The tracker
+carries the slots a conversation through the book_flight and cancel_flight flows has by the time
+the action runs: the collected slots come from SEED_SLOTS, the others from running the flows'
+actions in order first. The benchmark reports:
+
+- cold start: a fresh interpreter importing calm/actions, instantiating every action and running
+  each once (median of COLD_START_RUNS subprocesses)
+- per action: p50/p99 latency over RUNS runs, peak and retained memory allocated by one run
+  (tracemalloc) and the size of the returned events (the SlotSet payloads) as JSON
+
+Results can be saved and compared with an earlier run, the comparison exits with status 1 when
+an action got slower, or its payload bigger, by more than --threshold.
+
+Needs rasa_sdk, which comes with rasa pro. Run from the repository root:
+
+    python -m benchmarks.calm_actions --save before.json
+    python -m benchmarks.calm_actions --baseline before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+CALM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calm")
+# The actions import shared_tools from calm/, like the action server started from there
+sys.path.insert(0, CALM_DIR)
+
+from rasa_sdk import Action, Tracker
+from rasa_sdk.executor import CollectingDispatcher
+
+from react_agent.macro_tools import FLOWS_DIR, flow_actions
+
+RUNS = 200
+COLD_START_RUNS = 3
+SENDER_ID = "benchmark"
+FLOWS = [("book_flight.yml", "book_flight"), ("cancel_flight.yml", "cancel_flight")]
+# Slots filled by the collect steps of the flows
+SEED_SLOTS = {
+    "source_city": "New York",
+    "destination_city": "Paris",
+    "date_of_travel": "15/09/2025",
+    "chosen_flight_id": "AA101",
+    "passenger_name": "John Smith",
+    "passenger_age": 42.0,
+    "passenger_passport_id": "US12345678",
+    "passenger_nationality": "United States",
+    "booking_id": "CONF12345",
+    "confirmation_correct_booking": True,
+    "confirm_cancellation": True,
+}
+# Relative change above which a metric counts as a regression, and the absolute changes below
+# which it is noise whatever the ratio
+DEFAULT_THRESHOLD = 0.2
+NOISE_FLOOR = {"p50_ms": 0.05, "p99_ms": 0.1, "peak_kib": 1.0, "events_bytes": 16}
+
+
+def load_actions() -> Dict[str, Action]:
+    """Instantiate every Action defined under calm/actions, by action name"""
+    package = importlib.import_module("actions")
+    actions = {}
+    for module_info in pkgutil.walk_packages(package.__path__, "actions."):
+        module = importlib.import_module(module_info.name)
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if issubclass(cls, Action) and cls is not Action and cls.__module__ == module.__name__:
+                action = cls()
+                actions[action.name()] = action
+    return actions
+
+
+def make_tracker(slots: Dict[str, Any]) -> Tracker:
+    return Tracker(SENDER_ID, dict(slots), {}, [], False, None, {}, None)
+
+
+async def run_action(action: Action, slots: Dict[str, Any]) -> List[Dict[str, Any]]:
+    events = action.run(CollectingDispatcher(), make_tracker(slots), {})
+    if inspect.isawaitable(events):
+        events = await events
+    return events
+
+
+def flow_order(actions: Dict[str, Action]) -> List[str]:
+    """Action names in the order the flows run them, then the actions outside their main paths"""
+    ordered = []
+    for flow_file, flow_id in FLOWS:
+        ordered += [name for name in flow_actions(os.path.join(FLOWS_DIR, "flights", flow_file), flow_id)
+                    if name in actions and name not in ordered]
+    return ordered + sorted(name for name in actions if name not in ordered)
+
+
+async def conversation_slots(actions: Dict[str, Action]) -> Dict[str, Any]:
+    """Slots after running every action once in flow order, starting from SEED_SLOTS"""
+    slots = dict(SEED_SLOTS)
+    for name in flow_order(actions):
+        for event in await run_action(actions[name], slots):
+            if event.get("event") == "slot":
+                slots[event["name"]] = event["value"]
+    return slots
+
+
+def cold_start() -> Dict[str, Any]:
+    """Runs in a fresh interpreter, see --cold-start-probe"""
+    start = time.perf_counter()
+    actions = load_actions()
+    import_ms = (time.perf_counter() - start) * 1000
+    loop = asyncio.new_event_loop()
+    slots = dict(SEED_SLOTS)
+    first_run_ms = {}
+    for name in flow_order(actions):
+        run_start = time.perf_counter()
+        events = loop.run_until_complete(run_action(actions[name], slots))
+        first_run_ms[name] = (time.perf_counter() - run_start) * 1000
+        for event in events:
+            if event.get("event") == "slot":
+                slots[event["name"]] = event["value"]
+    loop.close()
+    return {"import_ms": import_ms, "first_run_ms": first_run_ms,
+            "total_ms": import_ms + sum(first_run_ms.values())}
+
+
+def measure_cold_start() -> Dict[str, Any]:
+    probes = []
+    for _ in range(COLD_START_RUNS):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.calm_actions", "--cold-start-probe"],
+                                cwd=os.path.dirname(CALM_DIR), capture_output=True, text=True, check=True).stdout
+        probes.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms": statistics.median(probe["import_ms"] for probe in probes),
+        "total_ms": statistics.median(probe["total_ms"] for probe in probes),
+        "first_run_ms": {name: statistics.median(probe["first_run_ms"][name] for probe in probes)
+                         for name in probes[0]["first_run_ms"]},
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure_action(loop: asyncio.AbstractEventLoop, action: Action, slots: Dict[str, Any]) -> Dict[str, float]:
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        events = loop.run_until_complete(run_action(action, slots))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    loop.run_until_complete(run_action(action, slots))
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 0.99),
+        "peak_kib": peak / 1024,
+        "retained_kib": retained / 1024,
+        "events_bytes": len(json.dumps(events, default=str)),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, metrics in results["actions"].items():
+        before = baseline["actions"].get(name)
+        if before is None:
+            continue
+        for metric, noise in NOISE_FLOOR.items():
+            change = metrics[metric] - before[metric]
+            if change > noise and change > threshold * before[metric]:
+                regressions.append(f"{name}: {metric} {before[metric]:.2f} -> {metrics[metric]:.2f}")
+    change = results["cold_start"]["total_ms"] - baseline["cold_start"]["total_ms"]
+    if change > threshold * baseline["cold_start"]["total_ms"]:
+        regressions.append(f"cold start: total_ms {baseline['cold_start']['total_ms']:.1f} -> "
+                           f"{results['cold_start']['total_ms']:.1f}")
+    return regressions
+
+
+def print_results(results: Dict[str, Any], baseline: Dict[str, Any] = None):
+    cold = results["cold_start"]
+    print(f"Cold start: import {cold['import_ms']:.1f} ms, import + first run of every action "
+          f"{cold['total_ms']:.1f} ms")
+    print(f"{'action':<32} | {'first (ms)':>10} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'peak KiB':>8} | "
+          f"{'kept KiB':>8} | {'events B':>8}" + (f" | {'p50 vs base':>11}" if baseline else ""))
+    for name, metrics in results["actions"].items():
+        row = (f"{name:<32} | {cold['first_run_ms'].get(name, 0):>10.2f} | {metrics['p50_ms']:>8.3f} | "
+               f"{metrics['p99_ms']:>8.3f} | {metrics['peak_kib']:>8.1f} | {metrics['retained_kib']:>8.1f} | "
+               f"{metrics['events_bytes']:>8}")
+        if baseline:
+            before = baseline["actions"].get(name)
+            row += (f" | {(metrics['p50_ms'] / before['p50_ms'] - 1) * 100:>+10.0f}%" if before
+                    else f" | {'new':>11}")
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results saved in this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change counted as a regression (default %(default)s)")
+    parser.add_argument("--cold-start-probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_probe:
+        with contextlib.redirect_stdout(io.StringIO()):
+            probe = cold_start()
+        print(json.dumps(probe))
+        return
+
+    results = {"python": platform.python_version(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "runs": RUNS, "cold_start": measure_cold_start(), "actions": {}}
+    loop = asyncio.new_event_loop()
+    actions = load_actions()
+    slots = loop.run_until_complete(conversation_slots(actions))
+    for name in flow_order(actions):
+        results["actions"][name] = measure_action(loop, actions[name], slots)
+    loop.close()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results saved to {args.save}")
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Minimal local stand-in for the OpenAI chat completions endpoint.
+
+It speaks just enough HTTP/1.1 (keep-alive, Content-Length bodies) for the official `openai`
+clients to talk to it via `base_url`, and replies from a fixed script instead of a model, after
+a configurable latency. Requests with `"stream": true` get server-sent event chunks, with the
+answer split into word tokens and tool call arguments split into fragments. Nothing leaves the
+machine.
+
+    with FakeChatCompletionsServer(latency=0.1) as server:
+        llm_client = OpenAI(base_url=server.base_url, api_key="sk-fake")
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+# One entry per LLM iteration of a turn: either the tool calls to request, as
+# (function name, arguments) pairs, or the final text answer.
+ScriptStep = Union[str, List[tuple]]
+
+CANCELLATION_SCRIPT: List[ScriptStep] = [
+    [("validate_booking_reference", {"reference_code": "CONF12345"}),
+     ("validate_passenger_name", {"booking_ref": "CONF12345", "last_name": "Smith"})],
+    [("get_booking_details", {"booking_reference": "CONF12345"})],
+    "Here are your booking details: flight AA101 from NYC to PAR on 2025-09-15 at 08:00. "
+    "Would you like to proceed with the cancellation of this booking?",
+]
+
+
+def approximate_tokens(payload) -> int:
+    """Rough token count (~4 characters per token), good enough for relative comparisons"""
+    return max(1, len(json.dumps(payload)) // 4)
+
+
+class LocalHttpServer:
+    """Keep-alive HTTP/1.1 server on its own event loop thread, subclasses answer the requests"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.connection_count = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._connections = {}
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle_connection, self.host, self.port, backlog=1024), self._loop
+        ).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        async def close():
+            self._server.close()
+            # Keep-alive connections outlive the listening socket, close them as well
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    async def _handle_request(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        raise NotImplementedError
+
+    @staticmethod
+    def _write_json(writer: asyncio.StreamWriter, status: str, payload):
+        data = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n"
+                     f"Connection: keep-alive\r\n\r\n".encode() + data)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connection_count += 1
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, value = line.decode("latin-1").split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await self._handle_request(method, path, body, writer)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+
+class FakeChatCompletionsServer(LocalHttpServer):
+    def __init__(self, latency: float = 0.1, jitter: float = 0.0, script: Optional[List[ScriptStep]] = None,
+                 token_latency: float = 0.0, error_rate: float = 0.0, slow_rate: float = 0.0,
+                 slow_latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        latency: seconds every chat completion takes before it is answered, or before its first
+            chunk when streaming
+        jitter: extra random delay in [0, jitter) seconds added to each reply
+        token_latency: seconds between two streamed chunks
+        error_rate: share of the requests answered with a 500 error, after the latency
+        slow_rate, slow_latency: share of the requests that take slow_latency seconds longer, the
+            occasional stragglers that make up the tail of real endpoints
+        script: replies for the successive iterations of a turn, see CANCELLATION_SCRIPT. The
+            step is picked by counting assistant messages after the last user message, so every
+            conversation follows the script independently.
+        """
+        super().__init__(host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.script = script if script is not None else CANCELLATION_SCRIPT
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.request_count = 0
+        self.received_count = 0
+        self.error_count = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _script_step(self, messages: List[Dict]) -> ScriptStep:
+        step = 0
+        for message in reversed(messages):
+            if message["role"] == "user":
+                break
+            if message["role"] == "assistant":
+                step += 1
+        return self.script[min(step, len(self.script) - 1)]
+
+    def completion(self, request: Dict) -> Dict:
+        """Build the chat completion payload answering `request`"""
+        self.request_count += 1
+        step = self._script_step(request["messages"])
+        if isinstance(step, str):
+            message = {"role": "assistant", "content": step}
+            finish_reason = "stop"
+        else:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{self.request_count}_{index}",
+                        "type": "function",
+                        "function": {"name": name, "arguments": json.dumps(arguments)}
+                    } for index, (name, arguments) in enumerate(step)
+                ]
+            }
+            finish_reason = "tool_calls"
+
+        prompt_tokens = approximate_tokens([request["messages"], request.get("tools", [])])
+        completion_tokens = approximate_tokens(message)
+        return {
+            "id": f"chatcmpl-fake-{self.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    @staticmethod
+    def stream_chunks(completion: Dict, include_usage: bool = False) -> List[Dict]:
+        """Split a chat completion into the chat.completion.chunk payloads of a streamed reply"""
+        message = completion["choices"][0]["message"]
+        deltas = [{"role": "assistant", "content": ""}]
+        if message.get("tool_calls"):
+            for index, call in enumerate(message["tool_calls"]):
+                deltas.append({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                               "function": {"name": call["function"]["name"], "arguments": ""}}]})
+                arguments = call["function"]["arguments"]
+                for offset in range(0, len(arguments), 8):
+                    deltas.append({"tool_calls": [{"index": index,
+                                                   "function": {"arguments": arguments[offset:offset + 8]}}]})
+        else:
+            deltas.extend({"content": token} for token in re.findall(r"\S+\s*", message["content"]))
+
+        base = {"id": completion["id"], "object": "chat.completion.chunk",
+                "created": completion["created"], "model": completion["model"]}
+        chunks = [dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]) for delta in deltas]
+        chunks.append(dict(base, choices=[{"index": 0, "delta": {},
+                                           "finish_reason": completion["choices"][0]["finish_reason"]}]))
+        if include_usage:
+            chunks.append(dict(base, choices=[], usage=completion["usage"]))
+        return chunks
+
+    async def _handle_request(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+            self._write_json(writer, "404 Not Found", {"error": {"message": f"Unknown route {method} {path}"}})
+            return
+        # Counted on arrival, unlike request_count, so requests the client gave up on are included
+        self.received_count += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if self.slow_rate and random.random() < self.slow_rate:
+            delay += self.slow_latency
+        await asyncio.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.error_count += 1
+            self._write_json(writer, "500 Internal Server Error",
+                             {"error": {"message": "Injected failure", "type": "server_error"}})
+            return
+        request = json.loads(body)
+        completion = self.completion(request)
+        chunks = self.stream_chunks(completion, (request.get("stream_options") or {}).get("include_usage", False))
+        if not request.get("stream"):
+            # A blocking reply only arrives once the whole message has been generated
+            await asyncio.sleep(self.token_latency * (len(chunks) - 1))
+            self._write_json(writer, "200 OK", completion)
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Transfer-Encoding: chunked\r\n"
+                     b"Connection: keep-alive\r\n\r\n")
+        events = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks]
+        events.append("data: [DONE]\n\n")
+        for index, event in enumerate(events):
+            if index and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            data = event.encode()
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
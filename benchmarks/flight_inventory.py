@@ -0,0 +1,78 @@
+"""
+Lookup latency of the flight inventory behind TravelTools.search_flights (calm/shared_tools/inventory.py).
+
+Generates a synthetic inventory of about two million flight legs (a year of flights between 50
+airports), cached in the temp directory across runs, opens it and runs random searches with the
+filters of TravelTools.search_flights and FlightInventory.search.
+
+Run from the repository root:
+
+    python -m benchmarks.flight_inventory
+"""
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+
+from calm.shared_tools.inventory import DEFAULT_AIRPORTS, FlightInventory, generate_inventory
+
+START_DATE = "2025-08-01"
+DAYS = 365
+ROUTE_SHARE = 0.5
+LEGS_PER_DAY = 4
+QUERIES = 20000
+
+
+def inventory_path() -> str:
+    path = os.path.join(tempfile.gettempdir(), f"flight_inventory_{DAYS}d_{ROUTE_SHARE}_{LEGS_PER_DAY}.bin")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        legs = generate_inventory(path, START_DATE, DAYS, ROUTE_SHARE, LEGS_PER_DAY)
+        print(f"Generated {legs:,} flight legs in {time.perf_counter() - start:.1f} s -> {path}")
+    return path
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    path = inventory_path()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    inventory = FlightInventory(path)
+    open_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(inventory):,} legs on {inventory.route_count:,} route days, {os.path.getsize(path) / 2 ** 20:.0f} MiB "
+          f"file, opened in {open_ms:.2f} ms")
+
+    rng = random.Random(1)
+    queries = [(rng.choice(DEFAULT_AIRPORTS), rng.choice(DEFAULT_AIRPORTS),
+                f"2025-{rng.randint(8, 12):02d}-{rng.randint(1, 28):02d}", rng.randint(1, 6))
+               for _ in range(QUERIES)]
+    cases = [
+        ("every flight", {}),
+        ("top 5 cheapest", {"top_k": 5}),
+        ("max price 400, top 5", {"max_price": 400, "top_k": 5}),
+        ("departs 06:00-12:00", {"departure_after": "06:00", "departure_before": "12:00"}),
+    ]
+    print(f"{'search':<22} | {'p50 (us)':>8} | {'p99 (us)':>8} | {'searches/s':>10} | {'avg results':>11}")
+    for label, filters in cases:
+        latencies, results = [], 0
+        for origin, destination, date, passengers in queries:
+            start = time.perf_counter()
+            results += len(inventory.search(origin, destination, date, passengers, **filters))
+            latencies.append((time.perf_counter() - start) * 1e6)
+        print(f"{label:<22} | {statistics.median(latencies):>8.1f} | {percentile(latencies, 0.99):>8.1f} | "
+              f"{len(latencies) / (sum(latencies) / 1e6):>10,.0f} | {results / len(queries):>11.1f}")
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"Peak RSS grew by {(rss_after - rss_before) / 1024:.1f} MiB over {len(cases) * QUERIES:,} searches "
+          f"(pages of the file touched by the searches)")
+    inventory.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Tail latency of the agent's turns with hedged LLM requests (react_agent/llm_requests.py).
+
+Runs the cancellation scenario of the local chat completions stub (benchmarks/fake_chat_server.py)
+from a few concurrent threads, with a small share of the stub's replies --slow-latency seconds
+late, the stragglers real endpoints have. A turn is three chat completions, so about three times
+that share of the turns hits one. The same turns are run through:
+
+- default: OpenAI client as flight_agent_react creates it, waits for every straggler
+- no keep-alive: a new connection for every request
+- timeout + retry: a short client timeout, and the client's retries after it
+- hedged p95: a duplicate request after the 95th percentile of the latencies so far
+- hedged fixed: a duplicate request after --hedge-after seconds
+
+Reports turn latency percentiles, the share of LLM requests sent beyond the ones the turns need,
+the connections the stub saw and the turns that failed. A streamed turn (react_loop_stream, as in
+interactive_mode) over the hedged client is checked first. Nothing leaves the machine. Run from the
+repository root:
+
+    python -m benchmarks.hedged_requests
+    python -m benchmarks.hedged_requests --turns 400 --slow-rate 0.05 --slow-latency 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import threading
+import time
+from typing import List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+import httpx
+from openai import OpenAI
+
+from benchmarks.fake_chat_server import CANCELLATION_SCRIPT, FakeChatCompletionsServer
+from flight_agent_react import LLM_REQUEST_TIMEOUT, RealLLMTravelAgent
+from react_agent.llm_requests import HedgedChatClient, pooled_async_openai
+
+USER_MESSAGE = "I want to cancel my flight, booking CONF12345, last name Smith"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_turns(llm_client, turns: int, threads: int):
+    """Runs `turns` turns from `threads` threads, returns (turn latencies in ms, failed turns)"""
+    latencies: List[float] = []
+    failures = []
+    remaining = iter(range(turns))
+    lock = threading.Lock()
+
+    def user():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            agent = RealLLMTravelAgent(llm_client=llm_client)
+            start = time.perf_counter()
+            try:
+                agent.react_loop(USER_MESSAGE)
+            except Exception as e:
+                failures.append(e)
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=user) for _ in range(threads)]
+    # The agents print every step, keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return latencies, failures
+
+
+def check_streaming(llm_client):
+    """react_loop_stream over the hedged client, as interactive_mode runs it, must give the scripted answer"""
+    agent = RealLLMTravelAgent(llm_client=llm_client)
+    with contextlib.redirect_stdout(io.StringIO()):
+        streamed = "".join(agent.react_loop_stream(USER_MESSAGE))
+    if streamed != CANCELLATION_SCRIPT[-1]:
+        raise RuntimeError(f"react_loop_stream over HedgedChatClient answered {streamed!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=200, help="turns per client setup (default %(default)s)")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent conversations (default %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.1, help="stub seconds per reply (default %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.05,
+                        help="extra random stub delay, up to this many seconds (default %(default)s)")
+    parser.add_argument("--slow-rate", type=float, default=0.03,
+                        help="share of the stub's replies that are stragglers (default %(default)s)")
+    parser.add_argument("--slow-latency", type=float, default=2.0,
+                        help="seconds a straggler takes longer (default %(default)s)")
+    parser.add_argument("--retry-timeout", type=float, default=0.5,
+                        help="client timeout of the timeout + retry setup (default %(default)s)")
+    parser.add_argument("--hedge-after", type=float, default=1.0,
+                        help="seconds before the duplicate of the hedged fixed setup (default %(default)s)")
+    args = parser.parse_args()
+
+    with FakeChatCompletionsServer(latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+                                   slow_latency=args.slow_latency) as server:
+        def pooled():
+            return pooled_async_openai(base_url=server.base_url, api_key="sk-fake", timeout=LLM_REQUEST_TIMEOUT)
+
+        setups = [
+            ("default", OpenAI(base_url=server.base_url, api_key="sk-fake", timeout=LLM_REQUEST_TIMEOUT)),
+            ("no keep-alive", OpenAI(base_url=server.base_url, api_key="sk-fake", timeout=LLM_REQUEST_TIMEOUT,
+                                     http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=0)))),
+            ("timeout + retry", OpenAI(base_url=server.base_url, api_key="sk-fake", timeout=args.retry_timeout,
+                                       max_retries=2)),
+            ("hedged p95", HedgedChatClient(pooled, deadline=LLM_REQUEST_TIMEOUT)),
+            ("hedged fixed", HedgedChatClient(pooled, deadline=LLM_REQUEST_TIMEOUT, hedge_after=args.hedge_after)),
+        ]
+        check_streaming(setups[3][1])
+        llm_calls = len(CANCELLATION_SCRIPT)
+        print(f"{args.turns} turns per setup from {args.threads} threads, {llm_calls} LLM calls per turn, stub latency "
+              f"{args.latency * 1000:.0f} ms + up to {args.jitter * 1000:.0f} ms, {args.slow_rate:.0%} of the replies "
+              f"{args.slow_latency:g} s late")
+        print(f"{'setup':<16} | {'p50 ms':>7} | {'p90 ms':>7} | {'p99 ms':>7} | {'max ms':>7} | "
+              f"{'extra requests':>14} | {'connections':>11} | failed")
+        for name, llm_client in setups:
+            # Warms up the connections and, for the p95 hedge, the latency window
+            run_turns(llm_client, 10, args.threads)
+            requests, connections = server.received_count, server.connection_count
+            latencies, failures = run_turns(llm_client, args.turns, args.threads)
+            expected = (len(latencies) + len(failures)) * llm_calls
+            extra = (server.received_count - requests - expected) / max(1, expected)
+            print(f"{name:<16} | {statistics.median(latencies):>7.0f} | {percentile(latencies, 0.9):>7.0f} | "
+                  f"{percentile(latencies, 0.99):>7.0f} | {max(latencies):>7.0f} | {extra:>14.1%} | "
+                  f"{server.connection_count - connections:>11} | {len(failures)}")
+            if isinstance(llm_client, HedgedChatClient):
+                stats = llm_client.stats()
+                print(f"{'':<16}   {stats['hedges']} hedges, {stats['hedge_wins']} won, {stats['cancelled']} cancelled,"
+                      f" hedge delay {stats['hedge_delay_ms']:.0f} ms, {stats['deadlines_exceeded']} deadlines missed")
+                llm_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Cost of the TravelTools instrumentation (calm/shared_tools/instrumentation.py) per tool call.
+
+Calls a cheap and a heavier tool unwrapped, with instrumentation disabled (the default) and with
+each sink enabled, next to the print to stdout every call used to make. Then prints the metrics
+the in-memory sink collected and the start of its Prometheus exposition.
+
+Run from the repository root:
+
+    python -m benchmarks.instrumentation
+"""
+import io
+import os
+import tempfile
+import time
+
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.instrumentation import (InMemoryMetrics, JsonlMetricsSink, PrometheusTextfileSink,
+                                               configure_instrumentation, disable_instrumentation)
+
+ROUNDS = 50_000
+TOOLS = {
+    "get_visa_requirements": ("US", "FR"),
+    "calculate_cancellation_fee": ("CONF12345", "2025-08-20"),
+}
+
+
+def per_call_us(tool_func, args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        tool_func(*args)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def with_print(tool_func, output: io.StringIO):
+    def printing(*args):
+        print(f"🛂 Calling {tool_func.__name__}: {args}", file=output)
+        result = tool_func(*args)
+        print(f"   Result: {result}", file=output)
+        return result
+
+    return printing
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    metrics = InMemoryMetrics()
+    setups = [
+        ("disabled", ()),
+        ("in memory", (metrics,)),
+        ("in memory, no sizes", (InMemoryMetrics(measure_sizes=False),)),
+        ("jsonl", (JsonlMetricsSink(os.path.join(directory, "calls.jsonl")),)),
+        ("prometheus textfile", (PrometheusTextfileSink(os.path.join(directory, "travel_tools.prom")),)),
+    ]
+    print(f"{'setup':<24} | " + " | ".join(f"{name:>26}" for name in TOOLS) + "  (µs per call)")
+    raw = {name: per_call_us(getattr(TravelTools, name).__wrapped__, args) for name, args in TOOLS.items()}
+    print(f"{'unwrapped':<24} | " + " | ".join(f"{raw[name]:>26.2f}" for name in TOOLS))
+    output = io.StringIO()
+    printed = {name: per_call_us(with_print(getattr(TravelTools, name).__wrapped__, output), args)
+               for name, args in TOOLS.items()}
+    print(f"{'print (before)':<24} | " + " | ".join(f"{printed[name]:>26.2f}" for name in TOOLS))
+    for label, sinks in setups:
+        configure_instrumentation(*sinks)
+        timings = {name: per_call_us(getattr(TravelTools, name), args) for name, args in TOOLS.items()}
+        disable_instrumentation()
+        print(f"{label:<24} | " + " | ".join(f"{f'{timings[name]:.2f} ({timings[name] - raw[name]:+.2f})':>26}"
+                                             for name in TOOLS))
+
+    print("\nIn memory metrics:")
+    for tool_name, tool_metrics in metrics.snapshot().items():
+        print(f"  {tool_name}: {tool_metrics['calls']:,} calls, {tool_metrics['errors']} errors, "
+              f"p50 <= {metrics.percentile_ms(tool_name, 0.5)} ms, "
+              f"p99 <= {metrics.percentile_ms(tool_name, 0.99)} ms, "
+              f"{tool_metrics['argument_bytes'] / tool_metrics['calls']:.0f} argument bytes and "
+              f"{tool_metrics['result_bytes'] / tool_metrics['calls']:.0f} result bytes per call")
+    print("\nPrometheus exposition:")
+    print("\n".join(metrics.prometheus_text().splitlines()[:6]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Load generator: how many concurrent conversations one process sustains with RealLLMTravelAgent.
+
+Starts the local OpenAI-compatible stub (benchmarks/fake_chat_server.py: scripted tool calls,
+configurable latency, jitter and injected errors) and drives N simulated users, one thread each,
+through react_loop. A user opens a session (a new agent), sends --turns messages with an
+exponentially distributed think time before each, then opens the next session, until --duration
+is over. Users start spread over --ramp-up seconds, so all of them are mid-conversation for most
+of the run.
+
+Reports turns completed, throughput, turn latency percentiles, the error rate (turns that
+raised) and the process' resident memory: the growth over the idle baseline at its peak, per
+concurrently open session. Nothing leaves the machine. Needs Linux (/proc) for the memory
+figures. Run from the repository root:
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --users 200 --duration 60 --think-time 2 --latency 0.8 --error-rate 0.01
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import threading
+import time
+from typing import Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai import OpenAI
+
+from benchmarks.fake_chat_server import FakeChatCompletionsServer
+from flight_agent_react import RealLLMTravelAgent
+
+USER_MESSAGES = [
+    "Please cancel my booking CONF12345, last name Smith",
+    "What would I get back if I cancel?",
+    "Okay, go ahead and cancel it",
+    "Can you send me the confirmation by email?",
+]
+
+
+def resident_mib() -> float:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.sessions = 0
+        self.open_sessions = 0
+        self.peak_open_sessions = 0
+
+    def session_opened(self):
+        with self.lock:
+            self.sessions += 1
+            self.open_sessions += 1
+            self.peak_open_sessions = max(self.peak_open_sessions, self.open_sessions)
+
+    def session_closed(self):
+        with self.lock:
+            self.open_sessions -= 1
+
+    def turn(self, seconds: float, error: Exception = None):
+        with self.lock:
+            if error is None:
+                self.latencies.append(seconds)
+            else:
+                name = type(error).__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def simulated_user(index: int, llm_client: OpenAI, args, stats: LoadStats, deadline: float):
+    rng = random.Random(index)
+    time.sleep(args.ramp_up * index / args.users)
+    while time.monotonic() < deadline:
+        agent = RealLLMTravelAgent(llm_client=llm_client)
+        stats.session_opened()
+        try:
+            for turn in range(args.turns):
+                time.sleep(rng.expovariate(1 / args.think_time) if args.think_time else 0)
+                if time.monotonic() >= deadline:
+                    return
+                start = time.perf_counter()
+                try:
+                    agent.react_loop(USER_MESSAGES[turn % len(USER_MESSAGES)])
+                except Exception as e:
+                    stats.turn(time.perf_counter() - start, e)
+                else:
+                    stats.turn(time.perf_counter() - start)
+        finally:
+            stats.session_closed()
+
+
+def sample_memory(samples: List[float], done: threading.Event, interval: float = 0.1):
+    while not done.wait(interval):
+        samples.append(resident_mib())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users (default %(default)s)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load (default %(default)s)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds to start all users (default %(default)s)")
+    parser.add_argument("--turns", type=int, default=4, help="turns per session (default %(default)s)")
+    parser.add_argument("--think-time", type=float, default=1.0,
+                        help="mean seconds a user takes before each message (default %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.3,
+                        help="stub seconds per chat completion (default %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.2,
+                        help="extra random stub delay, up to this many seconds (default %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of the stub's replies that are 500 errors (default %(default)s)")
+    parser.add_argument("--max-retries", type=int, default=0,
+                        help="OpenAI client retries on errors (default %(default)s)")
+    args = parser.parse_args()
+
+    stats = LoadStats()
+    memory_samples: List[float] = []
+    done = threading.Event()
+    with FakeChatCompletionsServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate) as server:
+        llm_client = OpenAI(base_url=server.base_url, api_key="sk-fake", max_retries=args.max_retries)
+        # Warm up imports, the client's connection pool and the tools before the baseline
+        with contextlib.redirect_stdout(io.StringIO()):
+            RealLLMTravelAgent(llm_client=llm_client).react_loop(USER_MESSAGES[0])
+        baseline_mib = resident_mib()
+        requests_before = server.request_count
+        sampler = threading.Thread(target=sample_memory, args=(memory_samples, done), daemon=True)
+        sampler.start()
+
+        start = time.perf_counter()
+        deadline = time.monotonic() + args.duration
+        users = [threading.Thread(target=simulated_user, args=(index, llm_client, args, stats, deadline),
+                                  name=f"user-{index}") for index in range(args.users)]
+        # The agents print every step, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for user in users:
+                user.start()
+            for user in users:
+                user.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+        llm_requests = server.request_count - requests_before
+        connections = server.connection_count
+
+    latencies = [latency * 1000 for latency in stats.latencies]
+    errors = sum(stats.errors.values())
+    turns = len(latencies) + errors
+    peak_mib = max(memory_samples + [resident_mib()])
+    print(f"{args.users} users for {elapsed:.1f} s, {args.turns} turns per session, {args.think_time:g} s mean think "
+          f"time, stub latency {args.latency * 1000:.0f} ms + up to {args.jitter * 1000:.0f} ms jitter")
+    print(f"Sessions: {stats.sessions:,} opened, up to {stats.peak_open_sessions} at once")
+    print(f"Turns: {turns:,} ({turns / elapsed:.1f}/s), {llm_requests:,} LLM requests ({llm_requests / elapsed:.1f}/s) "
+          f"over {connections} connections")
+    if latencies:
+        print(f"Turn latency ms: p50 {statistics.median(latencies):.0f}, p90 {percentile(latencies, 0.9):.0f}, "
+              f"p99 {percentile(latencies, 0.99):.0f}, max {max(latencies):.0f}")
+    print(f"Errors: {errors} ({errors / turns if turns else 0:.2%})"
+          + (" - " + ", ".join(f"{count} {name}" for name, count in sorted(stats.errors.items())) if errors else ""))
+    print(f"RSS: {baseline_mib:.1f} MiB idle, {peak_mib:.1f} MiB peak, "
+          f"{(peak_mib - baseline_mib) * 1024 / max(1, stats.peak_open_sessions):.0f} KiB per open session")
+
+
+if __name__ == "__main__":
+    main()
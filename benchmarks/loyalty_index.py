@@ -0,0 +1,153 @@
+"""
+Lookup throughput and memory of the loyalty index behind check_loyalty_status
+(calm/shared_tools/loyalty.py).
+
+Generates an index of ten million synthetic members (cached in the temp directory across runs),
+opens it and runs single and batch lookups, half of them for ids that aren't members. Then
+replaces the file while a thread keeps looking members up, to time the hot swap and check that
+no lookup fails during it. For comparison, the memory the same members take as a Python dict
+is measured on a tenth of them.
+
+Needs Linux (/proc) for the memory figures. Run from the repository root:
+
+    python -m benchmarks.loyalty_index
+    python -m benchmarks.loyalty_index --members 50000000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from calm.shared_tools.loyalty import (DEFAULT_TIERS, MEMBER_ID_ALPHABET, LoyaltyIndex, ReloadingLoyaltyIndex,
+                                       generate_loyalty_index, member_key)
+
+QUERIES = 100_000
+BATCH_SIZE = 1000
+
+
+def index_path(members: int) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"loyalty_index_{members}.bin")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        count = generate_loyalty_index(path, members)
+        print(f"Generated {count:,} members in {time.perf_counter() - start:.1f} s -> {path}")
+    return path
+
+
+def resident_mib() -> Dict[str, float]:
+    """Resident memory by kind: RssAnon is the process' own, RssFile pages of mapped files that the
+    kernel can drop and read back"""
+    with open("/proc/self/status") as file:
+        return {key: int(value.split()[0]) / 1024 for key, value in (line.split(":", 1) for line in file)
+                if key in ("RssAnon", "RssFile")}
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def lookups(index: LoyaltyIndex, member_ids):
+    latencies = []
+    for member_id in member_ids:
+        start = time.perf_counter()
+        index.tier(member_id)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def hot_swap(path: str, member_ids):
+    """Replace the index file under a reader thread, returns (swap ms, lookups during, failures)"""
+    swap_path = f"{path}.swap"
+    shutil.copyfile(path, swap_path)
+    index = ReloadingLoyaltyIndex(path, check_interval=0)
+    done = threading.Event()
+    counts = {"lookups": 0, "failures": 0}
+
+    def reader():
+        while not done.is_set():
+            for member_id in member_ids[:1000]:
+                if index.tier(member_id) is None:
+                    counts["failures"] += 1
+                counts["lookups"] += 1
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    os.replace(swap_path, path)
+    while index.reloads == 0:
+        time.sleep(0.0001)
+    swap_ms = (time.perf_counter() - start) * 1000
+    time.sleep(0.2)
+    done.set()
+    thread.join()
+    return swap_ms, counts["lookups"], counts["failures"]
+
+
+def dict_mib(members: int) -> float:
+    rng = random.Random(0)
+    before = resident_mib()["RssAnon"]
+    tiers = {f"LY{number:010d}": rng.choice(DEFAULT_TIERS) for number in range(0, members * 5, 5)}
+    size = resident_mib()["RssAnon"] - before
+    del tiers
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--members", type=int, default=10_000_000, help="synthetic members (default %(default)s)")
+    args = parser.parse_args()
+
+    path = index_path(args.members)
+    rng = random.Random(1)
+    with LoyaltyIndex(path) as probe:
+        # Sample existing ids from the file, alternating with ids nobody has
+        keys = probe._columns["keys"]
+        members = [keys[rng.randrange(len(keys))] for _ in range(QUERIES // 2)]
+
+    def member_id(key: int) -> str:
+        characters = []
+        while key:
+            key, digit = divmod(key, 37)
+            characters.append(MEMBER_ID_ALPHABET[digit - 1])
+        return "".join(reversed(characters))
+
+    member_ids = [member_id(key) for key in members]
+    assert all(member_key(value) == key for value, key in zip(member_ids[:100], members))
+    queries = [value for pair in zip(member_ids, (f"NM{rng.randrange(10 ** 10):010d}" for _ in member_ids))
+               for value in pair]
+
+    rss_before = resident_mib()
+    start = time.perf_counter()
+    index = LoyaltyIndex(path)
+    open_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(index):,} members, {os.path.getsize(path) / 2 ** 20:.0f} MiB file, opened in {open_ms:.2f} ms")
+
+    latencies = lookups(index, queries)
+    start = time.perf_counter()
+    for offset in range(0, len(queries), BATCH_SIZE):
+        index.tiers_many(queries[offset:offset + BATCH_SIZE])
+    batch_s = time.perf_counter() - start
+    rss_after = resident_mib()
+    print(f"{'lookup':<22} | {'p50 (us)':>8} | {'p99 (us)':>8} | {'lookups/s':>10}")
+    print(f"{'tier':<22} | {statistics.median(latencies):>8.1f} | {percentile(latencies, 0.99):>8.1f} | "
+          f"{len(latencies) / (sum(latencies) / 1e6):>10,.0f}")
+    print(f"{f'tiers_many x{BATCH_SIZE}':<22} | {'':>8} | {'':>8} | {len(queries) / batch_s:>10,.0f}")
+    print(f"Over {2 * len(queries):,} lookups RSS grew by {rss_after['RssAnon'] - rss_before['RssAnon']:.1f} MiB "
+          f"anonymous and {rss_after['RssFile'] - rss_before['RssFile']:.1f} MiB of mapped index pages")
+    index.close()
+
+    swap_ms, swap_lookups, failures = hot_swap(path, member_ids)
+    print(f"Hot swap: new file in use {swap_ms:.1f} ms after the replace, {swap_lookups:,} lookups meanwhile, "
+          f"{failures} failed")
+    print(f"For comparison, a dict of {args.members // 10:,} members takes {dict_mib(args.members // 10):.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
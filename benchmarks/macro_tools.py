@@ -0,0 +1,78 @@
+"""
+LLM calls and turn latency of the cancellation quote with and without a flow-compiled macro tool.
+
+Without the macro the agent spends one LLM iteration per step of the cancel_flight flow
+(get_booking_details -> get_fare_rules -> calculate_cancellation_fee -> check_loyalty_status ->
+apply_loyalty_discount) before answering. With get_cancellation_quote (react_agent/macro_tools.py)
+the chain runs locally after a single tool call. The fake model follows a script, so the
+benchmark measures what the chain costs, not whether a real model picks the macro.
+
+Run from the repository root:
+
+    python -m benchmarks.macro_tools
+"""
+import contextlib
+import io
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai import OpenAI
+
+from benchmarks.fake_chat_server import FakeChatCompletionsServer
+from calm.shared_tools.booking import TravelTools
+from flight_agent_react import RealLLMTravelAgent
+from react_agent.macro_tools import cancellation_quote_macro
+from react_agent.tracing import InMemorySpanCollector, Tracer
+
+LLM_LATENCY = 0.3
+USER_MESSAGE = "Yes, that's the booking (CONF12345). What would I get back if I cancel it?"
+ANSWER = "As a Platinum member your cancellation fee is waived and you will be refunded $650.00."
+
+STEP_BY_STEP_SCRIPT = [
+    [("get_booking_details", {"booking_reference": "CONF12345"})],
+    [("get_fare_rules", {"airline": "Delta", "fare_class": "Economy",
+                         "booking_date": "2024-02-15"})],
+    [("calculate_cancellation_fee", {"booking_ref": "CONF12345", "cancellation_date": "2025-08-20"})],
+    [("check_loyalty_status", {"member_id": "AXQW123456"})],
+    [("apply_loyalty_discount", {"loyalty_status": "Platinum", "original_booking_amount": 650.0,
+                                 "cancellation_fee": 200.0, "booking_ref": "CONF12345"})],
+    ANSWER,
+]
+MACRO_SCRIPT = [
+    [("get_cancellation_quote", {"booking_reference": "CONF12345", "cancellation_date": "2025-08-20"})],
+    ANSWER,
+]
+
+
+def run_turn(script, macro_tools=()):
+    collector = InMemorySpanCollector()
+    with FakeChatCompletionsServer(latency=LLM_LATENCY, script=script) as server:
+        agent = RealLLMTravelAgent(llm_client=OpenAI(base_url=server.base_url, api_key="sk-fake"),
+                                   tracer=Tracer(collector), macro_tools=macro_tools)
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.react_loop(USER_MESSAGE)
+    tool_time = sum(span["duration_ms"] for span in collector.by_name("tool_call"))
+    return (len(collector.by_name("llm_request")), len(collector.by_name("tool_call")),
+            collector.by_name("turn")[0]["duration_ms"], tool_time)
+
+
+def main():
+    macro = cancellation_quote_macro()
+    tools = TravelTools()
+    with contextlib.redirect_stdout(io.StringIO()):
+        quote = macro.run(lambda name, **arguments: getattr(tools, name)(**arguments),
+                          booking_reference="CONF12345", cancellation_date="2025-08-20")
+        step_by_step = tools.apply_loyalty_discount("Platinum", 650.0, 200.0, "CONF12345")
+    assert quote["refund_details"] == step_by_step
+
+    print(f"Fake LLM latency: {LLM_LATENCY * 1000:.0f} ms per call")
+    print(f"{'':<14} | {'LLM calls':>9} | {'tool calls':>10} | {'turn (ms)':>9} | {'in tools (ms)':>13}")
+    for label, result in (("step by step", run_turn(STEP_BY_STEP_SCRIPT)),
+                          ("macro tool", run_turn(MACRO_SCRIPT, [macro]))):
+        llm_calls, tool_calls, turn_ms, tool_ms = result
+        print(f"{label:<14} | {llm_calls:>9} | {tool_calls:>10} | {turn_ms:>9.0f} | {tool_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Latency and cost per route of the per-iteration model routing (react_agent/model_routing.py).
+
+Replays RECORDED_CONVERSATIONS through RealLLMTravelAgent with a fake LLM answering from the
+recording, with the latency and token prices of the model each request names (MODELS of
+benchmarks/tool_vs_process_calling.py; the fake really waits). The small model gets a share of
+its tool calls wrong (--mistake-rate): a renamed argument or the previous iteration's calls
+again. The same conversations run with:
+
+- gpt-4o: no router, the agent as it was
+- gpt-4o-mini: every request on the small model, its mistakes go to the tools
+- routed: ModelRouter(), gpt-4o-mini tool dispatch, gpt-4o answers and escalations
+- routed, mini answers: ModelRouter(small_final_answers=True)
+
+The routers first learn the iteration types from --warmup untimed replays, as a router shared by
+the agents of a deployment has from the conversations before.
+
+Reports per setup the LLM requests, p50/p95 turn latency, USD per conversation and the tool calls
+beyond the recorded ones (wrong calls that reached the tools), and for the routed setups the
+requests, latency and cost of each route. The replay answers the same text whichever model is
+asked, so this measures what routing costs and saves, not how well the small model writes. Nothing
+leaves the machine. Run from the repository root:
+
+    python -m benchmarks.model_routing
+    python -m benchmarks.model_routing --runs 3 --mistake-rate 0.2 --warmup 0
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai.types.chat import ChatCompletion
+
+from benchmarks.fake_chat_server import approximate_tokens
+from benchmarks.recorded_conversations import RECORDED_CONVERSATIONS
+from benchmarks.tool_vs_process_calling import MODELS, FakeLLM, percentile
+from flight_agent_react import RealLLMTravelAgent
+from react_agent.model_routing import ModelRouter
+
+SMALL_MODEL = "gpt-4o-mini"
+
+
+class MistakenReplayClient:
+    """Chat completions client replaying a recorded conversation, the small model now and then wrongly"""
+
+    def __init__(self, conversation: List[Dict], llm: FakeLLM, mistake_rate: float, seed: str):
+        self.turns = {turn["user"]: turn for turn in conversation}
+        self.llm = llm
+        self.mistake_rate = mistake_rate
+        self.rng = random.Random(seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.request_count = 0
+
+    def _create(self, model: str, messages: List[Dict], tools: List[Dict], **kwargs) -> ChatCompletion:
+        self.request_count += 1
+        user_index = max(index for index, message in enumerate(messages) if message["role"] == "user")
+        turn = self.turns[messages[user_index]["content"]]
+        # Wrong iterations that made it into the conversation don't advance the recording
+        step = sum(message["role"] == "assistant" and not message["tool_calls"][0]["id"].startswith("wrong")
+                   for message in messages[user_index:])
+        if step < len(turn["iterations"]):
+            calls = turn["iterations"][step]
+            prefix = "call"
+            if model == SMALL_MODEL and self.rng.random() < self.mistake_rate:
+                prefix = "wrong"
+                if step > 0 and self.rng.random() < 0.5:
+                    calls = turn["iterations"][step - 1]
+                else:
+                    name, arguments = calls[0]
+                    first = next(iter(arguments))
+                    calls = [(name, {f"{first}_value" if key == first else key: value
+                                     for key, value in arguments.items()})] + calls[1:]
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": f"{prefix}_{self.request_count}_{index}", "type": "function",
+                 "function": {"name": name, "arguments": json.dumps(arguments)}}
+                for index, (name, arguments) in enumerate(calls)]}
+            finish_reason = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": turn["answer"]}
+            finish_reason = "stop"
+        prompt_tokens = approximate_tokens([messages, tools])
+        completion_tokens = approximate_tokens(message)
+        self.llm.request(model, prompt_tokens, completion_tokens)
+        return ChatCompletion.model_validate({
+            "id": f"chatcmpl-replay-{self.request_count}", "object": "chat.completion", "created": 0,
+            "model": model, "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}})
+
+
+def replay(conversation: List[Dict], llm: FakeLLM, router, mistake_rate: float, seed: str):
+    """Replays the conversation, returns the turn latencies in ms, requests, extra tool calls and wrong answers"""
+    client = MistakenReplayClient(conversation, llm, mistake_rate, seed)
+    agent = RealLLMTravelAgent(llm_client=client, model_router=router)
+    tool_calls = []
+    original = agent.process_function_calls
+
+    def counting(function_calls):
+        tool_calls.extend(function_calls)
+        return original(function_calls)
+
+    agent.process_function_calls = counting
+    latencies = []
+    wrong_answers = 0
+    for turn in conversation:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            answer = agent.react_loop(turn["user"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        wrong_answers += answer != turn["answer"]
+    recorded = sum(len(calls) for turn in conversation for calls in turn["iterations"])
+    return latencies, client.request_count, len(tool_calls) - recorded, wrong_answers
+
+
+def run_setup(router_factory, args) -> Dict:
+    router = router_factory()
+    if router is not None:
+        # Earlier conversations the router learned the iteration types from, not timed
+        warmup_llm = FakeLLM(MODELS, args.jitter, args.seed, sleep=False)
+        for run in range(args.warmup):
+            for scenario, conversation in RECORDED_CONVERSATIONS.items():
+                replay(conversation, warmup_llm, router, args.mistake_rate, seed=f"warmup-{args.seed}-{run}-{scenario}")
+        router.reset_stats()
+
+    llm = FakeLLM(MODELS, args.jitter, args.seed, sleep=True)
+    latencies: List[float] = []
+    requests = extra_tool_calls = wrong_answers = conversations = 0
+    for run in range(args.runs):
+        for scenario, conversation in RECORDED_CONVERSATIONS.items():
+            turn_latencies, conversation_requests, extra, wrong = replay(
+                conversation, llm, router, args.mistake_rate, seed=f"{args.seed}-{run}-{scenario}")
+            latencies += turn_latencies
+            requests += conversation_requests
+            extra_tool_calls += extra
+            wrong_answers += wrong
+            conversations += 1
+    return {
+        "turns": len(latencies),
+        "requests_per_turn": requests / len(latencies),
+        "p50_turn_ms": statistics.median(latencies),
+        "p95_turn_ms": percentile(latencies, 0.95),
+        "usd_per_conversation": llm.cost / conversations,
+        "extra_tool_calls": extra_tool_calls,
+        "wrong_answers": wrong_answers,
+        "routes": router.stats() if router is not None else {},
+        "rejected": dict(router.rejected) if router is not None else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=1, help="replays of every conversation (default %(default)s)")
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="untimed replays of every conversation the routers learn from first (default %(default)s)")
+    parser.add_argument("--mistake-rate", type=float, default=0.1,
+                        help="share of the small model's tool iterations that are wrong (default %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="relative latency jitter (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setups = {
+        "gpt-4o": lambda: None,
+        "gpt-4o-mini": lambda: ModelRouter(small_model=SMALL_MODEL, large_model=SMALL_MODEL),
+        "routed": lambda: ModelRouter(small_model=SMALL_MODEL),
+        "routed, mini answers": lambda: ModelRouter(small_model=SMALL_MODEL, small_final_answers=True),
+    }
+    results = {name: run_setup(factory, args) for name, factory in setups.items()}
+
+    print(f"{len(RECORDED_CONVERSATIONS)} conversations x {args.runs} run(s), {args.mistake_rate:.0%} of the small "
+          f"model's tool iterations wrong")
+    print(f"{'setup':<21} | {'requests/turn':>13} | {'p50 turn ms':>11} | {'p95 turn ms':>11} | "
+          f"{'USD/conv.':>9} | {'extra tool calls':>16} | wrong answers")
+    for name, result in results.items():
+        print(f"{name:<21} | {result['requests_per_turn']:>13.2f} | {result['p50_turn_ms']:>11.0f} | "
+              f"{result['p95_turn_ms']:>11.0f} | {result['usd_per_conversation']:>9.4f} | "
+              f"{result['extra_tool_calls']:>16} | {result['wrong_answers']}")
+
+    for name in ("routed", "routed, mini answers"):
+        routes = results[name]["routes"]
+        total_cost = sum(route["cost"] for route in routes.values()) or 1.0
+        print(f"\n{name}: small model responses dropped {results[name]['rejected'] or 'never'}")
+        print(f"{'route':<11} | {'model':<11} | {'requests':>8} | {'mean ms':>7} | {'p95 ms':>7} | "
+              f"{'USD':>7} | share of cost")
+        for route_name, route in routes.items():
+            print(f"{route_name:<11} | {', '.join(route['models']):<11} | {route['requests']:>8} | "
+                  f"{route['mean_ms']:>7.0f} | {route['p95_ms']:>7.0f} | {route['cost']:>7.4f} | "
+                  f"{route['cost'] / total_cost:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares sequential vs concurrent execution of the tool calls returned in one LLM turn.
+
+The TravelTools lookups are slowed down with a fixed sleep to mimic real backends, so the
+sequential run should take roughly the sum of the latencies and the concurrent run roughly
+the slowest one.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_tool_calls
+"""
+import json
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from calm.shared_tools.booking import TravelTools
+from flight_agent_react import RealLLMTravelAgent
+
+TOOL_LATENCY = 0.3
+
+
+class SlowTravelTools(TravelTools):
+    """TravelTools with an artificial backend latency on the lookups used below"""
+
+    @staticmethod
+    def get_visa_requirements(passport_country, destination):
+        time.sleep(TOOL_LATENCY)
+        return TravelTools.get_visa_requirements(passport_country, destination)
+
+    @staticmethod
+    def get_country_entry_requirements(country_code):
+        time.sleep(TOOL_LATENCY)
+        return TravelTools.get_country_entry_requirements(country_code)
+
+    @staticmethod
+    def check_passport_expiry_status(passport_number, country, travel_date):
+        time.sleep(TOOL_LATENCY)
+        return TravelTools.check_passport_expiry_status(passport_number, country, travel_date)
+
+
+def make_tool_call(call_id, name, arguments):
+    """Shape of an entry in `message.tool_calls` as returned by the OpenAI client"""
+    return SimpleNamespace(id=call_id, type="function",
+                           function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+TOOL_CALLS = [
+    make_tool_call("call_1", "get_visa_requirements", {"passport_country": "IN", "destination": "FR"}),
+    make_tool_call("call_2", "get_country_entry_requirements", {"country_code": "FR"}),
+    make_tool_call("call_3", "check_passport_expiry_status",
+                   {"passport_number": "IN1234567", "country": "IN", "travel_date": "2025-09-15"}),
+]
+
+
+def run(agent):
+    start = time.perf_counter()
+    results = agent.process_function_calls(TOOL_CALLS)
+    elapsed = time.perf_counter() - start
+    assert [result["call_id"] for result in results] == [call.id for call in TOOL_CALLS]
+    return elapsed, results
+
+
+def main():
+    sequential_agent = RealLLMTravelAgent()
+    sequential_agent.tools = SlowTravelTools()
+    concurrent_agent = RealLLMTravelAgent(max_tool_workers=4)
+    concurrent_agent.tools = SlowTravelTools()
+
+    sequential_time, sequential_results = run(sequential_agent)
+    with concurrent_agent:
+        concurrent_time, concurrent_results = run(concurrent_agent)
+
+    assert [r["result"] for r in sequential_results] == [r["result"] for r in concurrent_results]
+
+    print("=" * 25)
+    print(f"Sequential: {round(sequential_time, 3)} s")
+    print(f"Concurrent: {round(concurrent_time, 3)} s")
+    print(f"Speedup:    {round(sequential_time / concurrent_time, 2)}x")
+
+
+if __name__ == "__main__":
+    main()
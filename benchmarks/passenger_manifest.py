@@ -0,0 +1,147 @@
+"""
+Group check-in of a full aircraft: one validate_passenger_manifest call vs the per-passenger
+validate_passport_format + check_passport_expiry_status calls (calm/shared_tools/passports.py).
+
+The manifest mixes nationalities, passports given as MRZ lines, malformed numbers and passports
+expiring too soon. In process the manifest call is slower, about 0.5x the per-passenger calls:
+it parses the MRZ lines and verifies their check digits, which the per-passenger tools can't, and
+builds a result with the errors of every passenger. Against a backend reached over HTTP
+(benchmarks/stub_travel_backend.py, through the pooled HttpTravelTools client) it saves two round
+trips per passenger, which is where it pays off. Both paths must flag the same passengers.
+
+Run from the repository root:
+
+    python -m benchmarks.passenger_manifest
+"""
+import asyncio
+import random
+import time
+
+from benchmarks.stub_travel_backend import StubTravelBackend
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.http_tools import BACKEND_TOOLS, BackendConfig, HttpTravelTools
+from calm.shared_tools.passports import check_digit
+
+PASSENGERS = 400
+RUNS = 20
+TRAVEL_DATE = "2025-09-15"
+DESTINATION = "FR"
+BACKEND_LATENCY = 0.02
+NUMBER_FORMATS = {"US": lambda rng: f"{rng.randrange(10 ** 9):09d}",
+                  "IN": lambda rng: f"{rng.choice('JKLMNPRSTUVZ')}{rng.randrange(10 ** 7):07d}",
+                  "DE": lambda rng: f"C{rng.randrange(10 ** 8):08d}",
+                  "FR": lambda rng: f"{rng.randrange(100):02d}AB{rng.randrange(10 ** 5):05d}",
+                  "UK": lambda rng: f"{rng.randrange(10 ** 9):09d}"}
+MRZ_NATIONALITIES = {"US": "USA", "IN": "IND", "DE": "D<<", "FR": "FRA", "UK": "GBR"}
+
+
+def mrz_line(passport_number: str, nationality: str, expiry_date: str) -> str:
+    number = passport_number.ljust(9, "<")
+    birth = "850317"
+    expiry = expiry_date[2:4] + expiry_date[5:7] + expiry_date[8:10]
+    personal = "<" * 14
+    line = (f"{number}{check_digit(number)}{MRZ_NATIONALITIES[nationality]}{birth}{check_digit(birth)}M"
+            f"{expiry}{check_digit(expiry)}{personal}<")
+    return line + str(check_digit(line[0:10] + line[13:20] + line[21:43]))
+
+
+def manifest(seed: int = 0):
+    rng = random.Random(seed)
+    passengers = []
+    for _ in range(PASSENGERS):
+        nationality = rng.choice(list(NUMBER_FORMATS))
+        passport_number = NUMBER_FORMATS[nationality](rng)
+        if rng.random() < 0.03:
+            passport_number = passport_number[:-2]
+        expiry_date = f"{rng.choice([2025, 2026, 2028, 2031])}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        passenger = {"passport_number": passport_number, "nationality": nationality, "expiry_date": expiry_date}
+        if rng.random() < 0.3:
+            passenger = {"mrz": mrz_line(passport_number, nationality, expiry_date), "nationality": nationality}
+        passengers.append(passenger)
+    return passengers
+
+
+def per_passenger_fields(passengers):
+    """The per-passenger tools take a number and an expiry date, not an MRZ"""
+    fields = []
+    for passenger in passengers:
+        if "mrz" in passenger:
+            line = passenger["mrz"]
+            expiry = line[21:27]
+            expiry_date = f"20{expiry[:2]}-{expiry[2:4]}-{expiry[4:]}"
+            fields.append((line[0:9].rstrip("<"), passenger["nationality"], expiry_date))
+        else:
+            fields.append((passenger["passport_number"], passenger["nationality"], passenger["expiry_date"]))
+    return fields
+
+
+def flagged_per_passenger(formats, expiries):
+    return [not (valid and expiry["meets_requirements"]) for valid, expiry in zip(formats, expiries)]
+
+
+def in_process(passengers):
+    tools = TravelTools()
+    fields = per_passenger_fields(passengers)
+
+    def per_passenger():
+        formats = [tools.validate_passport_format(number, nationality) for number, nationality, _ in fields]
+        expiries = [tools.check_passport_expiry_status(number, nationality, TRAVEL_DATE, expiry, DESTINATION)
+                    for number, nationality, expiry in fields]
+        return flagged_per_passenger(formats, expiries)
+
+    def batch():
+        return [not check["valid"] for check in tools.validate_passenger_manifest(passengers, TRAVEL_DATE,
+                                                                                   DESTINATION)]
+
+    timings = {}
+    for label, run in (("per passenger", per_passenger), ("manifest", batch)):
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            flagged = run()
+        timings[label] = ((time.perf_counter() - start) / RUNS * 1000, flagged)
+    return timings
+
+
+async def over_http(base_url: str, passengers):
+    tools = HttpTravelTools({backend: BackendConfig(base_url) for backend in BACKEND_TOOLS})
+    fields = per_passenger_fields(passengers)
+    timings = {}
+
+    start = time.perf_counter()
+    formats, expiries = await asyncio.gather(
+        asyncio.gather(*(tools.validate_passport_format(number, nationality) for number, nationality, _ in fields)),
+        asyncio.gather(*(tools.check_passport_expiry_status(number, nationality, TRAVEL_DATE, expiry, DESTINATION)
+                         for number, nationality, expiry in fields)))
+    timings["per passenger"] = ((time.perf_counter() - start) * 1000, flagged_per_passenger(formats, expiries))
+
+    start = time.perf_counter()
+    checks = await tools.validate_passenger_manifest(passengers, TRAVEL_DATE, DESTINATION)
+    timings["manifest"] = ((time.perf_counter() - start) * 1000, [not check["valid"] for check in checks])
+    await tools.aclose()
+    return timings
+
+
+def print_timings(title: str, timings):
+    print(title)
+    per_passenger_ms, expected = timings["per passenger"]
+    print(f"{'path':<14} | {'ms':>8} | {'passengers/s':>12} | {'flagged':>7}")
+    for label, (ms, flagged) in timings.items():
+        print(f"{label:<14} | {ms:>8.2f} | {PASSENGERS / ms * 1000:>12,.0f} | {sum(flagged):>7}")
+    manifest_ms, flagged = timings["manifest"]
+    print(f"Speedup {per_passenger_ms / manifest_ms:.1f}x, "
+          f"{'same' if flagged == expected else 'DIFFERENT'} passengers flagged")
+
+
+def main():
+    passengers = manifest()
+    local = in_process(passengers)
+    with StubTravelBackend(latency=BACKEND_LATENCY) as backend:
+        remote = asyncio.run(over_http(backend.base_url, passengers))
+    print_timings(f"In process, {PASSENGERS} passengers, destination {DESTINATION}", local)
+    print()
+    print_timings(f"Over HTTP, {BACKEND_LATENCY * 1000:.0f} ms backend latency, "
+                  f"{BackendConfig._field_defaults['max_concurrency']} connections per backend", remote)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Scripted conversations with the tool calls a well-behaved agent makes, used by the offline benchmarks.
+
+Every turn lists the LLM iterations that precede the answer: each iteration is the list of
+(tool name, arguments) pairs requested in one assistant message, followed by the final answer.
+"""
+
+RECORDED_CONVERSATIONS = {
+    "cancel_flight_platinum": [
+        {
+            "user": "cancel my flight booking",
+            "iterations": [],
+            "answer": "To assist you with cancelling your flight booking, please share your booking reference "
+                      "code and the last name of the passenger.",
+        },
+        {
+            "user": "CONF12345",
+            "iterations": [
+                [("validate_booking_reference", {"reference_code": "CONF12345"})],
+            ],
+            "answer": "Thanks! Please provide the last name of the passenger on booking CONF12345.",
+        },
+        {
+            "user": "Smith",
+            "iterations": [
+                [("validate_passenger_name", {"booking_ref": "CONF12345", "last_name": "Smith"})],
+                [("get_booking_details", {"booking_reference": "CONF12345"})],
+            ],
+            "answer": "Here are the details of your booking: flight AA101 from NYC to PAR on 2025-09-15 at 08:00, "
+                      "Economy, total paid $650.00. Would you like to proceed with the cancellation?",
+        },
+        {
+            "user": "yeah okay",
+            "iterations": [
+                [("get_fare_rules", {"airline": "Delta", "fare_class": "Economy",
+                                     "booking_date": "2024-02-15"}),
+                 ("check_loyalty_status", {"member_id": "AXQW123456"})],
+                [("calculate_cancellation_fee", {"booking_ref": "CONF12345", "cancellation_date": "2025-08-20"})],
+                [("apply_loyalty_discount", {"loyalty_status": "Platinum", "original_booking_amount": 650.0,
+                                             "cancellation_fee": 200.0, "booking_ref": "CONF12345"})],
+            ],
+            "answer": "As a Platinum member your cancellation fee is waived and you will be refunded $650.00. "
+                      "Would you like the refund to your original payment method, or as points with a 5% "
+                      "penalty reduction?",
+        },
+        {
+            "user": "original payment method please",
+            "iterations": [
+                [("process_refund", {"booking_ref": "CONF12345", "amount": 650.0,
+                                     "refund_method": "original_payment"})],
+                [("generate_cancellation_confirmation", {"booking_ref": "CONF12345",
+                                                         "refund_details": {"amount": 650.0}})],
+            ],
+            "answer": "Your booking CONF12345 has been cancelled and $650.00 will be refunded to your Visa "
+                      "within 7-10 business days.",
+        },
+    ],
+    "book_flight": [
+        {
+            "user": "I want to book a flight from New York to Paris on 2025-09-15",
+            "iterations": [
+                [("search_flights", {"origin": "NYC", "destination": "PAR", "date": "2025-09-15",
+                                     "passengers": 1})],
+            ],
+            "answer": "I found two flights: AA101 departing 08:00 for $650.00 and DL205 departing 14:15 for "
+                      "$720.00. Which one would you like?",
+        },
+        {
+            "user": "AA101 please",
+            "iterations": [],
+            "answer": "Great choice. Please share the passenger's name, passport number and nationality.",
+        },
+        {
+            "user": "John Smith, passport IN1234567, Indian national",
+            "iterations": [
+                [("validate_passport_format", {"passport_number": "IN1234567", "country_code": "IN"}),
+                 ("check_passport_expiry_status", {"passport_number": "IN1234567", "country": "IN",
+                                                   "travel_date": "2025-09-15"})],
+                [("get_country_entry_requirements", {"country_code": "FR"}),
+                 ("get_visa_requirements", {"passport_country": "IN", "destination": "FR"})],
+            ],
+            "answer": "Your passport is valid. Note that Indian passport holders need a visa for France, and all "
+                      "passengers must show evidence of Covid-19 vaccination. Shall I go ahead with the booking?",
+        },
+        {
+            "user": "Yes, charge my card 4111111111111111, expiry 12/27, cvv 123",
+            "iterations": [
+                [("validate_credit_card", {"card_number": "4111111111111111", "expiry": "12/27", "cvv": "123"})],
+                [("authorize_payment", {"card_details": {"card_number": "4111111111111111", "expiry": "12/27"},
+                                        "amount": 650.0})],
+            ],
+            "answer": "Your payment of $650.00 has been authorised and flight AA101 is booked.",
+        },
+    ],
+    "hotel_search": [
+        {
+            "user": "Can you find me a hotel room in Paris from 2025-09-15 to 2025-09-20?",
+            "iterations": [
+                [("search_hotels", {"city": "Paris", "checkin": "2025-09-15", "checkout": "2025-09-20",
+                                    "rooms": 1})],
+            ],
+            "answer": "Hotel Luxe Paris is $180 per night and Boutique Seine Hotel is $220 per night. Both are "
+                      "available.",
+        },
+    ],
+}
+
+# The same user goals as handled by the CALM assistant in calm/: every turn lists the commands the
+# command generator answers with, the flows then run their actions until the next collect step.
+# The CALM flows have no payment step and no hotel search.
+CALM_CONVERSATIONS = {
+    "cancel_flight_platinum": [
+        {"user": "cancel my flight booking", "commands": ["start flow cancel_flight"]},
+        {"user": "CONF12345", "commands": ["set slot booking_id CONF12345"]},
+        {"user": "yeah okay", "commands": ["set slot confirmation_correct_booking True"]},
+        {"user": "yes, go ahead with the cancellation", "commands": ["set slot confirm_cancellation True"]},
+    ],
+    "book_flight": [
+        {"user": "I want to book a flight from New York to Paris on 15/09/2025",
+         "commands": ["start flow book_flight", "set slot source_city New York", "set slot destination_city Paris",
+                      "set slot date_of_travel 15/09/2025"]},
+        {"user": "AA101 please", "commands": ["set slot chosen_flight_id AA101"]},
+        {"user": "John Smith, 42 years old, passport IN1234567, Indian national",
+         "commands": ["set slot passenger_name John Smith", "set slot passenger_age 42",
+                      "set slot passenger_passport_id IN1234567", "set slot passenger_nationality India"]},
+    ],
+}
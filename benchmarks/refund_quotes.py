@@ -0,0 +1,57 @@
+"""
+Bulk refund quoting for a schedule disruption (calm/shared_tools/fares.py).
+
+Quotes the cancellation of 100k synthetic bookings, spread over the default fare policies and
+their versions, with quote_refunds, and reports the throughput, the fee tiers hit and the fees
+charged per loyalty status after the waivers of the policies. quote_refunds quotes booking by booking;
+a column-wise path measured 1.1-1.2x here, too little to keep a second copy of the fee rules.
+
+Run from the repository root:
+
+    python -m benchmarks.refund_quotes
+"""
+import random
+import time
+from collections import Counter
+
+from calm.shared_tools.booking_repository import synthetic_bookings
+from calm.shared_tools.fares import FareRuleStore, DEFAULT_POLICIES, quote_refunds
+
+BOOKINGS = 100_000
+CANCELLATION_DATES = ["2025-08-20", "2025-09-10", "2025-09-14", "2025-10-01"]
+LOYALTY_STATUSES = [None, "Gold", "Platinum"]
+
+
+def main():
+    rng = random.Random(2)
+    bookings = list(synthetic_bookings(BOOKINGS, seed=2))
+    columns = {
+        "airlines": [booking["flight"]["airline"] for booking in bookings],
+        "fare_classes": [booking["flight"]["fare_class"] for booking in bookings],
+        "amounts": [booking["total_paid"] for booking in bookings],
+        "passenger_counts": [len(booking["passengers"]) for booking in bookings],
+        "booking_dates": [booking["booking_date"] for booking in bookings],
+        "travel_dates": [booking["flight"]["date"] for booking in bookings],
+        "cancellation_dates": [rng.choice(CANCELLATION_DATES) for _ in bookings],
+        "loyalty_statuses": [rng.choice(LOYALTY_STATUSES) for _ in bookings],
+    }
+    store = FareRuleStore(DEFAULT_POLICIES)
+
+    start = time.perf_counter()
+    quotes = quote_refunds(store, **columns)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(bookings):,} bookings, {len(list(store))} fare policy versions")
+    print(f"Quoted in {elapsed:.2f} s, {len(quotes) / elapsed:,.0f} quotes/s")
+    print("Tiers: " + ", ".join(f"{tier} {count:,}" for tier, count in Counter(q["tier"] for q in quotes).most_common()))
+    print(f"{'loyalty status':<14} | {'bookings':>8} | {'mean waiver':>11} | {'fees charged':>14}")
+    for status in LOYALTY_STATUSES:
+        status_quotes = [q for q in quotes if q.get("loyalty_status") == status]
+        waiver = sum(q.get("loyalty_waiver_percentage", 0) for q in status_quotes) / max(1, len(status_quotes))
+        charged = sum(q["cancellation_fee"] for q in status_quotes)
+        print(f"{str(status):<14} | {len(status_quotes):>8,} | {waiver:>10.0f}% | {charged:>14,.2f}")
+    print(f"Refunded in total: {sum(q['refund_amount'] for q in quotes):,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Repeated runs of the same conversations with the LLM response cache (react_agent/response_cache.py).
+
+Replays the cancellation scenario of the local fake chat completions endpoint
+(benchmarks/fake_chat_server.py) a few times, each run with fresh agents sharing one on-disk
+cache, as repeated test runs of the notebook scenarios do. The first run fills the cache, the
+later ones should be answered from it entirely, with the same tool calls and answers. A second
+cache with a small size limit shows the eviction at work.
+
+Run from the repository root:
+
+    python -m benchmarks.response_cache
+"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai import OpenAI
+
+from benchmarks.fake_chat_server import FakeChatCompletionsServer
+from flight_agent_react import RealLLMTravelAgent
+from react_agent.response_cache import CachingChatClient, ResponseCache
+
+LLM_LATENCY = 0.2
+RUNS = 3
+CONVERSATIONS = 4
+USER_MESSAGE = "I want to cancel my flight, booking CONF12345, last name Smith"
+
+
+def run(llm_client):
+    """One test run: CONVERSATIONS fresh agents, returns (seconds, [(tool calls, answer)])"""
+    transcripts = []
+    start = time.perf_counter()
+    for _ in range(CONVERSATIONS):
+        agent = RealLLMTravelAgent(llm_client=llm_client)
+        calls = []
+        original = agent.process_function_calls
+
+        def recording(function_calls):
+            calls.extend((call.id, call.function.name, call.function.arguments) for call in function_calls)
+            return original(function_calls)
+
+        agent.process_function_calls = recording
+        with contextlib.redirect_stdout(io.StringIO()):
+            answer = agent.react_loop(USER_MESSAGE)
+        transcripts.append((calls, answer))
+    return time.perf_counter() - start, transcripts
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite3")
+    with FakeChatCompletionsServer(latency=LLM_LATENCY) as server:
+        openai_client = OpenAI(base_url=server.base_url, api_key="sk-fake")
+        cache = ResponseCache(path)
+        llm_client = CachingChatClient(openai_client, cache)
+        print(f"{CONVERSATIONS} conversations per run, fake LLM latency {LLM_LATENCY * 1000:.0f} ms")
+        print(f"{'run':<4} | {'LLM requests':>12} | {'cache hits':>10} | {'run (ms)':>9} | same transcript")
+        first = None
+        for index in range(RUNS):
+            requests, hits = server.request_count, cache.hits
+            seconds, transcripts = run(llm_client)
+            first = first if first is not None else transcripts
+            print(f"{index + 1:<4} | {server.request_count - requests:>12} | {cache.hits - hits:>10} | "
+                  f"{seconds * 1000:>9.0f} | {'yes' if transcripts == first else 'NO'}")
+        stats = cache.stats()
+        print(f"Hit rate {stats['hit_rate']:.0%}, {stats['saved_seconds']:.2f} s of LLM time saved, "
+              f"{stats['entries']} responses in {stats['stored_bytes'] / 1024:.1f} KiB")
+        cache.close()
+
+        # Reopened from disk, as a new process would
+        reopened = ResponseCache(path)
+        requests = server.request_count
+        run(CachingChatClient(openai_client, reopened))
+        print(f"Reopened cache: {reopened.hits} hits, {server.request_count - requests} LLM requests")
+        reopened.close()
+
+        small = ResponseCache(":memory:", max_bytes=1024)
+        run(CachingChatClient(openai_client, small))
+        stats = small.stats()
+        print(f"1 KiB cache: {stats['entries']} responses kept, {stats['evictions']} evicted, "
+              f"{stats['stored_bytes']} bytes stored")
+
+
+if __name__ == "__main__":
+    main()
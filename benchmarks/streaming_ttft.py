@@ -0,0 +1,56 @@
+"""
+Time to first token of react_loop vs react_loop_stream against a local fake chat completions endpoint.
+
+The fake model needs LLM_LATENCY before its first chunk and TOKEN_LATENCY between chunks. Both loops
+go through the same tool call iterations. A streamed message only shows whether it calls tools once
+it is complete, so react_loop_stream holds the content of each iteration until then: it never shows
+text written before a tool call as the answer, and yields the answer once its iteration is complete,
+at about the time react_loop returns.
+
+Run from the repository root:
+
+    python -m benchmarks.streaming_ttft
+"""
+import contextlib
+import io
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai import OpenAI
+
+from benchmarks.fake_chat_server import FakeChatCompletionsServer
+from flight_agent_react import RealLLMTravelAgent
+
+USER_MESSAGE = "Please cancel my booking CONF12345, last name Smith"
+LLM_LATENCY = 0.3
+TOKEN_LATENCY = 0.02
+RUNS = 5
+
+
+def main():
+    blocking, streaming = [], []
+    with FakeChatCompletionsServer(latency=LLM_LATENCY, token_latency=TOKEN_LATENCY) as server:
+        llm_client = OpenAI(base_url=server.base_url, api_key="sk-fake", max_retries=0)
+        for _ in range(RUNS):
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent = RealLLMTravelAgent(llm_client=llm_client)
+                blocking_answer = agent.react_loop(USER_MESSAGE)
+                blocking.append(agent.last_turn_timing["total"])
+
+                agent = RealLLMTravelAgent(llm_client=llm_client)
+                tokens = list(agent.react_loop_stream(USER_MESSAGE))
+                streaming.append(agent.last_turn_timing)
+
+            assert "".join(tokens) == blocking_answer
+
+    mean = lambda values: sum(values) / len(values)
+    print(f"Fake LLM latency: {LLM_LATENCY * 1000:.0f} ms to first chunk, {TOKEN_LATENCY * 1000:.0f} ms per chunk")
+    print(f"react_loop        first token / total: {mean(blocking):.2f} s / {mean(blocking):.2f} s")
+    print(f"react_loop_stream first token / total: "
+          f"{mean([t['time_to_first_token'] for t in streaming]):.2f} s / "
+          f"{mean([t['total'] for t in streaming]):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
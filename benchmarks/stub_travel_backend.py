@@ -0,0 +1,56 @@
+"""
+Local stand-in for the booking, fare, loyalty, ... services behind TravelTools.
+
+Answers the requests of calm/shared_tools/http_tools.HttpTravelTools - `POST /<method name>`
+with the arguments as a JSON object - with the result of the mock TravelTools method, after the
+latency configured for the method's backend. It also records how many connections were opened
+and the highest number of requests each backend had in flight at once.
+
+    with StubTravelBackend(latency=0.05) as backend:
+        tools = HttpTravelTools({name: BackendConfig(backend.base_url) for name in BACKEND_TOOLS})
+"""
+import asyncio
+import json
+from typing import Dict, Optional
+
+from benchmarks.fake_chat_server import LocalHttpServer
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.http_tools import TOOL_BACKENDS
+
+
+class StubTravelBackend(LocalHttpServer):
+    def __init__(self, latency: float = 0.05, backend_latency: Optional[Dict[str, float]] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        latency: seconds every request takes before it is answered
+        backend_latency: per backend overrides of `latency`, e.g. {"fares": 0.2}
+        """
+        super().__init__(host, port)
+        self.latency = latency
+        self.backend_latency = backend_latency or {}
+        self.request_count = 0
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle_request(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        tool_name = path.strip("/")
+        if method != "POST" or tool_name not in TOOL_BACKENDS:
+            self._write_json(writer, "404 Not Found", {"error": f"Unknown route {method} {path}"})
+            return
+        backend = TOOL_BACKENDS[tool_name]
+        self.request_count += 1
+        self.in_flight[backend] = self.in_flight.get(backend, 0) + 1
+        self.max_in_flight[backend] = max(self.max_in_flight.get(backend, 0), self.in_flight[backend])
+        try:
+            await asyncio.sleep(self.backend_latency.get(backend, self.latency))
+            result = getattr(TravelTools, tool_name)(**json.loads(body))
+        except Exception as e:
+            self._write_json(writer, "500 Internal Server Error", {"error": str(e)})
+            return
+        finally:
+            self.in_flight[backend] -= 1
+        self._write_json(writer, "200 OK", result)
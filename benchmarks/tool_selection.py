@@ -0,0 +1,62 @@
+"""
+Offline benchmark of per-request tool selection (react_agent/tool_selection.py).
+
+Replays RECORDED_CONVERSATIONS, asks the selector which schemas it would send for every LLM
+request of every turn, and reports the schema tokens saved against sending all of TOOL_SCHEMAS,
+plus the retrieval recall: the share of tool calls the recorded agent made whose tool was offered.
+
+Run from the repository root:
+
+    python -m benchmarks.tool_selection
+"""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from benchmarks.fake_chat_server import approximate_tokens
+from benchmarks.recorded_conversations import RECORDED_CONVERSATIONS
+from flight_agent_react import TOOL_GROUPS, TOOL_SCHEMAS
+from react_agent.tool_selection import ToolSelector
+
+
+def replay(selector: ToolSelector, conversation):
+    requests = offered_calls = total_calls = 0
+    full_tokens = selected_tokens = 0
+    fallbacks = 0
+    messages, used_tools = [], set()
+    for turn in conversation:
+        messages.append({"role": "user", "content": turn["user"]})
+        # One LLM request per tool iteration plus the one producing the answer
+        for iteration in turn["iterations"] + [[]]:
+            tools = selector.select(messages, used_tools)
+            offered = {schema["function"]["name"] for schema in tools}
+            requests += 1
+            fallbacks += len(tools) == len(TOOL_SCHEMAS)
+            full_tokens += approximate_tokens(TOOL_SCHEMAS)
+            selected_tokens += approximate_tokens(tools)
+            for name, _ in iteration:
+                total_calls += 1
+                offered_calls += name in offered
+                used_tools.add(name)
+        messages.append({"role": "assistant", "content": turn["answer"]})
+    return requests, fallbacks, full_tokens, selected_tokens, offered_calls, total_calls
+
+
+def main():
+    selector = ToolSelector(TOOL_SCHEMAS, TOOL_GROUPS)
+    print(f"{'conversation':<24} | {'requests':>8} | {'fallbacks':>9} | {'schema tokens':>17} | {'saved':>6} | "
+          f"{'recall':>6}")
+    totals = [0] * 6
+    for name, conversation in RECORDED_CONVERSATIONS.items():
+        result = replay(selector, conversation)
+        totals = [total + value for total, value in zip(totals, result)]
+        requests, fallbacks, full_tokens, selected_tokens, offered_calls, total_calls = result
+        print(f"{name:<24} | {requests:>8} | {fallbacks:>9} | {selected_tokens:>7} / {full_tokens:>7} | "
+              f"{1 - selected_tokens / full_tokens:>6.1%} | {offered_calls / max(total_calls, 1):>6.1%}")
+    requests, fallbacks, full_tokens, selected_tokens, offered_calls, total_calls = totals
+    print(f"{'all':<24} | {requests:>8} | {fallbacks:>9} | {selected_tokens:>7} / {full_tokens:>7} | "
+          f"{1 - selected_tokens / full_tokens:>6.1%} | {offered_calls / max(total_calls, 1):>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Cost and catch rate of the tool call argument validation (react_agent/tool_validation.py).
+
+Times every tool call of RECORDED_CONVERSATIONS through json.loads alone, which is what the
+agent did before, and through the compiled validators. Then sends broken variants of the same
+calls (an argument dropped, mistyped or renamed, malformed JSON) through both paths: without
+validation the tool raises or silently works on bad input, with it the call is rejected with an
+error result listing the problems. Dropping an optional argument, or wrapping a value of a free-form
+object argument, leaves a valid call, so not every variant is rejected.
+
+Run from the repository root:
+
+    python -m benchmarks.tool_validation
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from benchmarks.recorded_conversations import RECORDED_CONVERSATIONS
+from calm.shared_tools.booking import TravelTools
+from flight_agent_react import TOOL_SCHEMAS, TOOL_VALIDATORS
+from react_agent.tool_validation import compile_tool_validators
+
+ROUNDS = 2000
+
+
+def recorded_calls():
+    return [(tool_name, json.dumps(arguments))
+            for conversation in RECORDED_CONVERSATIONS.values() for turn in conversation
+            for iteration in turn["iterations"] for tool_name, arguments in iteration]
+
+
+def broken_calls(calls, seed: int = 0):
+    rng = random.Random(seed)
+    broken = []
+    for tool_name, raw_arguments in calls:
+        arguments = json.loads(raw_arguments)
+        if not arguments:
+            continue
+        name = rng.choice(sorted(arguments))
+        variants = {
+            "dropped": {key: value for key, value in arguments.items() if key != name},
+            "mistyped": {**arguments, name: {"value": arguments[name]}},
+            "renamed": {**{key: value for key, value in arguments.items() if key != name}, f"{name}_value": 1},
+        }
+        broken += [(kind, tool_name, json.dumps(variant)) for kind, variant in variants.items()]
+        broken.append(("malformed JSON", tool_name, raw_arguments[:-1]))
+    return broken
+
+
+def per_call_us(parse, calls) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for tool_name, raw_arguments in calls:
+            parse(tool_name, raw_arguments)
+    return (time.perf_counter() - start) / ROUNDS / len(calls) * 1e6
+
+
+def unvalidated_outcome(tool_name: str, raw_arguments: str) -> str:
+    try:
+        arguments = json.loads(raw_arguments)
+    except ValueError:
+        return "turn crashed"
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            getattr(TravelTools, tool_name)(**arguments)
+    except Exception as e:
+        return f"tool raised {type(e).__name__}"
+    return "ran on bad input"
+
+
+def main():
+    start = time.perf_counter()
+    compile_tool_validators(TOOL_SCHEMAS, TravelTools)
+    print(f"Compiled {len(TOOL_SCHEMAS)} tool schemas in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    calls = recorded_calls()
+    parse_only = per_call_us(lambda tool_name, raw_arguments: json.loads(raw_arguments), calls)
+    validated = per_call_us(TOOL_VALIDATORS.validate, calls)
+    print(f"{len(calls)} recorded tool calls, µs per call:")
+    print(f"  json.loads only   {parse_only:6.2f}")
+    print(f"  validated         {validated:6.2f}  (+{validated - parse_only:.2f})")
+    assert all(TOOL_VALIDATORS.validate(tool_name, raw_arguments)[1] is None for tool_name, raw_arguments in calls)
+
+    outcomes = {}
+    example = None
+    for kind, tool_name, raw_arguments in broken_calls(calls):
+        _, error = TOOL_VALIDATORS.validate(tool_name, raw_arguments)
+        counts = outcomes.setdefault(kind, {"calls": 0, "rejected": 0, "unvalidated": {}})
+        counts["calls"] += 1
+        counts["rejected"] += error is not None
+        outcome = unvalidated_outcome(tool_name, raw_arguments)
+        counts["unvalidated"][outcome] = counts["unvalidated"].get(outcome, 0) + 1
+        if example is None and kind == "mistyped":
+            example = (tool_name, raw_arguments, error)
+
+    print(f"\n{'broken call':<15} | {'calls':>5} | {'rejected':>8} | without validation")
+    for kind, counts in outcomes.items():
+        unvalidated = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts["unvalidated"].items()))
+        print(f"{kind:<15} | {counts['calls']:>5} | {counts['rejected']:>8} | {unvalidated}")
+
+    tool_name, raw_arguments, error = example
+    print(f"\nExample: {tool_name}({raw_arguments}) gets back")
+    print(json.dumps(error, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+"""
+Record/replay comparison of tool calling (the ReAct agent in flight_agent_react.py) and process
+calling (the CALM assistant in calm/) on the same scripted conversations.
+
+Both architectures talk to a deterministic fake LLM that replays the recorded replies:
+
+- ReAct: RealLLMTravelAgent runs RECORDED_CONVERSATIONS, one LLM request per tool iteration plus
+  the one producing the answer, its tool calls executed for real against TravelTools
+- CALM: every user turn is one command generator request answered with the commands of
+  CALM_CONVERSATIONS, then the flows in calm/data/flows run their custom actions (for real,
+  through rasa_sdk) until the next collect step, and every response the bot utters goes through
+  the rephraser (rephrase_all in calm/endpoints.yml), one gpt-4o-mini request each
+
+Prompt tokens are estimated at ~4 characters per token: the ReAct requests as sent, the CALM
+prompts from calm/prompts with the flows, slots and conversation filled in. The fake LLM's latency
+is per_call + prompt_tokens * per_prompt_token + completion_tokens * per_completion_token, with
+seeded jitter, added to the measured time of the turn without sleeping, so a run takes seconds
+and gives the same LLM counts every time (--sleep to really wait). Tool calls are counted by the
+TravelTools instrumentation (calm/shared_tools/instrumentation.py).
+
+Nothing leaves the machine, so it runs in CI; --check exits with status 1 when a conversation
+didn't complete as recorded. The CALM side needs rasa_sdk, without it only ReAct is reported.
+Run from the repository root:
+
+    python -m benchmarks.tool_vs_process_calling
+    python -m benchmarks.tool_vs_process_calling --runs 50 --call-latency 0.8 --json results.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import yaml
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai.types.chat import ChatCompletion
+
+from benchmarks.fake_chat_server import approximate_tokens
+from benchmarks.recorded_conversations import CALM_CONVERSATIONS, RECORDED_CONVERSATIONS
+from calm.shared_tools import instrumentation
+from flight_agent_react import RealLLMTravelAgent
+
+CALM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calm")
+# Actions import shared_tools from calm/, like the action server started from there
+sys.path.insert(0, CALM_DIR)
+
+from shared_tools import instrumentation as calm_instrumentation
+
+
+class ModelProfile(NamedTuple):
+    per_call: float
+    per_prompt_token: float
+    per_completion_token: float
+    # USD per million tokens
+    prompt_price: float
+    completion_price: float
+
+
+MODELS = {
+    "gpt-4o": ModelProfile(0.35, 0.00002, 0.012, 2.50, 10.00),
+    "gpt-4o-mini": ModelProfile(0.25, 0.00001, 0.008, 0.15, 0.60),
+}
+REACT_MODEL = "gpt-4o"
+COMMAND_GENERATOR_MODEL = "gpt-4o"
+REPHRASER_MODEL = "gpt-4o-mini"
+
+
+class FakeLLM:
+    """Latency and token accounting of the replayed LLM requests"""
+
+    def __init__(self, models: Dict[str, ModelProfile], jitter: float, seed: int, sleep: bool):
+        self.models = models
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self.virtual_seconds = 0.0
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    def request(self, model: str, prompt_tokens: int, completion_tokens: int):
+        profile = self.models[model]
+        latency = (profile.per_call + prompt_tokens * profile.per_prompt_token
+                   + completion_tokens * profile.per_completion_token)
+        latency *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        if self.sleep:
+            time.sleep(latency)
+        else:
+            self.virtual_seconds += latency
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += (prompt_tokens * profile.prompt_price + completion_tokens * profile.completion_price) / 1e6
+
+
+class ToolCallCounter:
+    """Instrumentation sink counting the TravelTools calls"""
+    wants_sizes = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def record(self, event: Dict[str, Any]):
+        self.calls += 1
+
+
+class TurnStats(NamedTuple):
+    llm_calls: int
+    tool_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    seconds: float
+
+
+class Meter:
+    """Measures what one turn cost, wall time plus the fake LLM's virtual latency"""
+
+    def __init__(self, llm: FakeLLM, counter: ToolCallCounter):
+        self.llm = llm
+        self.counter = counter
+
+    @contextlib.contextmanager
+    def turn(self, turns: List[TurnStats]):
+        llm = self.llm
+        before = (llm.calls, self.counter.calls, llm.prompt_tokens, llm.completion_tokens, llm.cost,
+                  llm.virtual_seconds)
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        turns.append(TurnStats(llm.calls - before[0], self.counter.calls - before[1], llm.prompt_tokens - before[2],
+                               llm.completion_tokens - before[3], llm.cost - before[4],
+                               elapsed + llm.virtual_seconds - before[5]))
+
+
+# =============================================================================
+# ReAct
+# =============================================================================
+
+class ReplayChatClient:
+    """Chat completions client answering the ReAct agent from a recorded conversation"""
+
+    def __init__(self, conversation: List[Dict], llm: FakeLLM):
+        self.turns = {turn["user"]: turn for turn in conversation}
+        self.llm = llm
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.request_count = 0
+
+    def _create(self, model: str, messages: List[Dict], tools: List[Dict], **kwargs) -> ChatCompletion:
+        self.request_count += 1
+        user_index = max(index for index, message in enumerate(messages) if message["role"] == "user")
+        turn = self.turns[messages[user_index]["content"]]
+        step = sum(message["role"] == "assistant" for message in messages[user_index:])
+        if step < len(turn["iterations"]):
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": f"call_{self.request_count}_{index}", "type": "function",
+                 "function": {"name": name, "arguments": json.dumps(arguments)}}
+                for index, (name, arguments) in enumerate(turn["iterations"][step])]}
+            finish_reason = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": turn["answer"]}
+            finish_reason = "stop"
+        prompt_tokens = approximate_tokens([messages, tools])
+        completion_tokens = approximate_tokens(message)
+        self.llm.request(REACT_MODEL, prompt_tokens, completion_tokens)
+        return ChatCompletion.model_validate({
+            "id": f"chatcmpl-replay-{self.request_count}", "object": "chat.completion", "created": 0,
+            "model": model, "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}})
+
+
+def run_react(conversation: List[Dict], meter: Meter) -> List[TurnStats]:
+    agent = RealLLMTravelAgent(llm_client=ReplayChatClient(conversation, meter.llm))
+    turns = []
+    for turn in conversation:
+        with meter.turn(turns), contextlib.redirect_stdout(io.StringIO()):
+            answer = agent.react_loop(turn["user"])
+        if answer != turn["answer"]:
+            raise RuntimeError(f"ReAct answered {answer!r} to {turn['user']!r}, recorded {turn['answer']!r}")
+    return turns
+
+
+# =============================================================================
+# CALM
+# =============================================================================
+
+def _prompt_text(template_file: str) -> str:
+    """A prompt template without its jinja tags, the data it is filled with is added separately"""
+    with open(os.path.join(CALM_DIR, "prompts", template_file), encoding="utf-8") as file:
+        return re.sub(r"\{[{%].*?[%}]\}", "", file.read())
+
+
+class _MissingAsNone(dict):
+    """Slots for filling a response, which shows unset ones as None like Rasa does"""
+
+    def __missing__(self, key):
+        return None
+
+
+class CalmAssistant:
+    """Runs the flows of calm/data/flows the way the FlowPolicy does, for the steps they use:
+    collect, action, ids and `next` with `slots.<name> is True/False` conditions"""
+
+    def __init__(self, actions: Dict[str, Any], llm: FakeLLM, loop: asyncio.AbstractEventLoop):
+        from benchmarks.calm_actions import run_action
+
+        self.run_action = run_action
+        self.actions = actions
+        self.llm = llm
+        self.loop = loop
+        self.flows, self.slot_types, self.responses = {}, {}, {}
+        for directory, key in (("data/flows/flights", "flows"), ("domain/flights", None)):
+            for file_name in sorted(os.listdir(os.path.join(CALM_DIR, directory))):
+                with open(os.path.join(CALM_DIR, directory, file_name), encoding="utf-8") as file:
+                    content = yaml.safe_load(file)
+                if key:
+                    self.flows.update(content[key])
+                else:
+                    self.slot_types.update({name: slot["type"] for name, slot in content.get("slots", {}).items()})
+                    self.responses.update({name: variants[0]["text"]
+                                           for name, variants in content.get("responses", {}).items()})
+        self.command_generator_prompt = _prompt_text("cmd_gen.jinja2")
+        self.rephraser_prompt = _prompt_text("rephraser.jinja2")
+        self.slots: Dict[str, Any] = {}
+        self.stack: List = []
+        self.active_flow: Optional[str] = None
+        self.transcript: List[str] = []
+
+    def _flows_data(self) -> List[Dict]:
+        return [{"name": name, "description": flow["description"],
+                 "slots": [{"name": step["collect"], "description": step.get("description")}
+                           for step in flow["steps"] if "collect" in step]}
+                for name, flow in self.flows.items()]
+
+    def handle(self, user_message: str, commands: List[str]):
+        """One user turn: the command generator request, then the flow until its next collect"""
+        self.transcript.append(f"USER: {user_message}")
+        state = {"active_flow": self.active_flow, "slots": self.slots}
+        prompt = [self.command_generator_prompt, self._flows_data(), state, "\n".join(self.transcript)]
+        self.llm.request(COMMAND_GENERATOR_MODEL, approximate_tokens(prompt), approximate_tokens("\n".join(commands)))
+        for command in commands:
+            words = command.split(" ", 3)
+            if words[:2] == ["start", "flow"]:
+                self.active_flow = words[2]
+                self.stack = [(self.flows[words[2]]["steps"], 0)]
+            elif words[:2] == ["set", "slot"]:
+                self.slots[words[2]] = self._slot_value(words[2], words[3])
+            else:
+                raise ValueError(f"Unsupported command {command!r}")
+        self._advance()
+
+    def _slot_value(self, name: str, value: str) -> Any:
+        if self.slot_types.get(name) == "bool":
+            return value == "True"
+        if self.slot_types.get(name) == "float":
+            return float(value)
+        return value
+
+    def _utter(self, response: str):
+        text = self.responses[response].format_map(_MissingAsNone(self.slots))
+        prompt = [self.rephraser_prompt, "\n".join(self.transcript), text]
+        self.llm.request(REPHRASER_MODEL, approximate_tokens(prompt), approximate_tokens(text))
+        self.transcript.append(f"AI: {text}")
+
+    def _next(self, step: Dict) -> Any:
+        target = step.get("next")
+        if not isinstance(target, list):
+            return target
+        for branch in target:
+            if "if" in branch:
+                name, expected = re.fullmatch(r"slots\.(\w+) is (True|False)", branch["if"]).groups()
+                if self.slots.get(name) is (expected == "True"):
+                    return branch["then"]
+            else:
+                return branch["else"]
+        return None
+
+    def _advance(self):
+        while self.stack:
+            steps, index = self.stack[-1]
+            if index >= len(steps):
+                self.stack.pop()
+                continue
+            step = steps[index]
+            if "collect" in step and self.slots.get(step["collect"]) is None:
+                self._utter(f"utter_ask_{step['collect']}")
+                return
+            if "action" in step:
+                name = step["action"]
+                if name.startswith("utter_"):
+                    self._utter(name)
+                else:
+                    events = self.loop.run_until_complete(self.run_action(self.actions[name], self.slots))
+                    self.slots.update({event["name"]: event["value"] for event in events
+                                       if event.get("event") == "slot"})
+            self.stack[-1] = (steps, index + 1)
+            target = self._next(step)
+            if target == "END":
+                self.stack = []
+            elif isinstance(target, list):
+                self.stack.append((target, 0))
+            elif isinstance(target, str):
+                flow_steps = self.flows[self.active_flow]["steps"]
+                self.stack = [(flow_steps, next(position for position, candidate in enumerate(flow_steps)
+                                                if candidate.get("id") == target))]
+        self.active_flow = None
+
+
+def run_calm(conversation: List[Dict], meter: Meter, actions, loop) -> List[TurnStats]:
+    assistant = CalmAssistant(actions, meter.llm, loop)
+    turns = []
+    for turn in conversation:
+        with meter.turn(turns), contextlib.redirect_stdout(io.StringIO()):
+            assistant.handle(turn["user"], turn["commands"])
+    if assistant.active_flow is not None:
+        raise RuntimeError(f"Flow {assistant.active_flow} didn't finish, waiting at {assistant.stack[-1]}")
+    return turns
+
+
+def load_calm_actions():
+    """The calm custom actions by name, None when rasa_sdk isn't installed"""
+    try:
+        from benchmarks.calm_actions import load_actions
+    except ImportError as e:
+        print(f"Skipping CALM: {e}")
+        return None
+    with contextlib.redirect_stdout(io.StringIO()):
+        return load_actions()
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(turns: List[TurnStats], conversations: int) -> Dict[str, float]:
+    latencies = [turn.seconds * 1000 for turn in turns]
+    return {
+        "turns": len(turns) // conversations,
+        "llm_calls_per_turn": sum(turn.llm_calls for turn in turns) / len(turns),
+        "tool_calls_per_turn": sum(turn.tool_calls for turn in turns) / len(turns),
+        "prompt_tokens_per_turn": sum(turn.prompt_tokens for turn in turns) / len(turns),
+        "completion_tokens_per_turn": sum(turn.completion_tokens for turn in turns) / len(turns),
+        "p50_turn_ms": statistics.median(latencies),
+        "p95_turn_ms": percentile(latencies, 0.95),
+        "usd_per_conversation": sum(turn.cost for turn in turns) / conversations,
+    }
+
+
+def print_results(results: Dict[str, Dict[str, Dict[str, float]]]):
+    print(f"{'architecture':<12} | {'scenario':<22} | {'turns':>5} | {'LLM calls':>9} | {'tool calls':>10} | "
+          f"{'prompt tok':>10} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'$/conv':>7}")
+    print(f"{'':<12} | {'':<22} | {'':>5} | {'per turn':>9} | {'per turn':>10} | {'per turn':>10} | "
+          f"{'turn':>8} | {'turn':>8} |")
+    for architecture, scenarios in results.items():
+        for scenario, summary in scenarios.items():
+            print(f"{architecture:<12} | {scenario:<22} | {summary['turns']:>5} | "
+                  f"{summary['llm_calls_per_turn']:>9.2f} | {summary['tool_calls_per_turn']:>10.2f} | "
+                  f"{summary['prompt_tokens_per_turn']:>10,.0f} | {summary['p50_turn_ms']:>8.0f} | "
+                  f"{summary['p95_turn_ms']:>8.0f} | {summary['usd_per_conversation']:>7.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20, help="replays of every conversation (default %(default)s)")
+    parser.add_argument("--call-latency", type=float, default=MODELS["gpt-4o"].per_call,
+                        help="seconds per gpt-4o request before any token (default %(default)s)")
+    parser.add_argument("--prompt-token-ms", type=float, default=MODELS["gpt-4o"].per_prompt_token * 1000,
+                        help="gpt-4o ms per prompt token (default %(default)s)")
+    parser.add_argument("--completion-token-ms", type=float, default=MODELS["gpt-4o"].per_completion_token * 1000,
+                        help="gpt-4o ms per completion token (default %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="relative latency jitter (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sleep", action="store_true", help="wait for the fake LLM latency instead of adding it")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 if a conversation doesn't complete as recorded")
+    args = parser.parse_args()
+
+    models = dict(MODELS, **{"gpt-4o": MODELS["gpt-4o"]._replace(
+        per_call=args.call_latency, per_prompt_token=args.prompt_token_ms / 1000,
+        per_completion_token=args.completion_token_ms / 1000)})
+    counter = ToolCallCounter()
+    instrumentation.configure_instrumentation(counter)
+    calm_instrumentation.configure_instrumentation(counter)
+    meter = Meter(FakeLLM(models, args.jitter, args.seed, args.sleep), counter)
+    actions = load_calm_actions()
+    loop = asyncio.new_event_loop()
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {"ReAct": {}, "CALM": {}}
+    failures = []
+    for architecture, conversations in (("ReAct", RECORDED_CONVERSATIONS), ("CALM", CALM_CONVERSATIONS)):
+        if architecture == "CALM" and actions is None:
+            del results["CALM"]
+            continue
+        for scenario, conversation in conversations.items():
+            turns = []
+            try:
+                for _ in range(args.runs):
+                    if architecture == "ReAct":
+                        turns += run_react(conversation, meter)
+                    else:
+                        turns += run_calm(conversation, meter, actions, loop)
+            except Exception as e:
+                failures.append(f"{architecture} {scenario}: {type(e).__name__}: {e}")
+                continue
+            results[architecture][scenario] = summarize(turns, args.runs)
+    loop.close()
+
+    print(f"{args.runs} replays per conversation, fake gpt-4o: {args.call_latency * 1000:.0f} ms per request + "
+          f"{args.prompt_token_ms:g} ms per prompt token + {args.completion_token_ms:g} ms per completion token")
+    print_results(results)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"arguments": vars(args), "results": results, "failures": failures}, file, indent=2)
+        print(f"Results saved to {args.json}")
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cost of the tracing spans in react_agent/tracing.py, plus the span tree of one traced turn.
+
+The micro benchmark opens the four nested spans of a single-tool iteration (turn, iteration,
+llm_request, tool_call) with tracing disabled and enabled. The traced turn runs the sync agent
+against a local fake chat completions endpoint and prints where the time went.
+
+Run from the repository root:
+
+    python -m benchmarks.tracing_overhead
+"""
+import contextlib
+import io
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from openai import OpenAI
+
+from benchmarks.fake_chat_server import FakeChatCompletionsServer
+from flight_agent_react import RealLLMTravelAgent
+from react_agent.tracing import NOOP_TRACER, InMemorySpanCollector, Tracer
+
+ROUNDS = 100_000
+USER_MESSAGE = "Please cancel my booking CONF12345, last name Smith"
+
+
+def nested_spans(tracer) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        with tracer.span("turn") as turn_span:
+            with tracer.span("iteration", index=1):
+                with tracer.span("llm_request") as llm_span:
+                    if llm_span.recording:
+                        llm_span.set(model="gpt-4o", prompt_tokens=1200, completion_tokens=40, retries=0)
+                with tracer.span("tool_call", tool="get_booking_details"):
+                    pass
+            turn_span.set(iterations=1)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def print_tree(collector: InMemorySpanCollector, span, depth=0):
+    attributes = ", ".join(f"{key}={value}" for key, value in span["attributes"].items())
+    print(f"{'  ' * depth}{span['name']:<12} {span['duration_ms']:>9.2f} ms  {attributes}")
+    for child in sorted(collector.children(span), key=lambda child: child["start_time"]):
+        print_tree(collector, child, depth + 1)
+
+
+def main():
+    disabled = nested_spans(NOOP_TRACER)
+    enabled = nested_spans(Tracer(InMemorySpanCollector()))
+    print(f"4 nested spans, tracing disabled: {disabled * 1e6:.2f} µs per iteration")
+    print(f"4 nested spans, tracing enabled:  {enabled * 1e6:.2f} µs per iteration")
+
+    collector = InMemorySpanCollector()
+    with FakeChatCompletionsServer(latency=0.1) as server:
+        agent = RealLLMTravelAgent(llm_client=OpenAI(base_url=server.base_url, api_key="sk-fake"),
+                                   tracer=Tracer(collector))
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.react_loop(USER_MESSAGE)
+
+    print("\nTraced turn:")
+    print_tree(collector, collector.by_name("turn")[0])
+
+
+if __name__ == "__main__":
+    main()
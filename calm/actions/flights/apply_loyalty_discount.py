@@ -2,30 +2,34 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.prefetch import shared_prefetcher
 from rasa_sdk.events import SlotSet, BotUttered
 import json
 from datetime import datetime
 
-tools = TravelTools()
+prefetcher = shared_prefetcher()
 
 class ApplyLoyaltyDiscount(Action):
 
     def name(self) -> Text:
         return "apply_loyalty_discount"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         dispatcher.utter_message("Applying loyalty discount based on your membership tier")
 
         loyalty_status = tracker.get_slot("loyalty_status")
         cancellation_fee_details = tracker.get_slot("cancellation_fee_details")
-
-        refund_details = tools.apply_loyalty_discount(loyalty_status["status"],
-                                                      cancellation_fee_details["original_amount"],
-                                                      cancellation_fee_details["cancellation_fee"]
-                                                      )
+        if not loyalty_status or "error" in loyalty_status \
+                or not cancellation_fee_details or "error" in cancellation_fee_details:
+            return [SlotSet("refund_details", {"error": "No cancellation fee calculated for this booking"})]
+
+        refund_details = await prefetcher.call(tracker.sender_id, "apply_loyalty_discount",
+                                               loyalty_status["status"],
+                                               cancellation_fee_details["original_amount"],
+                                               cancellation_fee_details["cancellation_fee"],
+                                               (tracker.get_slot("booking_details") or {}).get("booking_reference"))
 
         return [SlotSet("refund_details", refund_details)]
@@ -0,0 +1,21 @@
+from typing import Any, Text, Dict, List
+
+from rasa_sdk import Action, Tracker
+from rasa_sdk.executor import CollectingDispatcher
+from shared_tools.prefetch import shared_prefetcher
+
+prefetcher = shared_prefetcher()
+
+class DiscardCancellationPrefetch(Action):
+
+    def name(self) -> Text:
+        return "discard_cancellation_prefetch"
+
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+
+        # The user stopped the cancellation, drop the lookups started by get_booking_details
+        prefetcher.discard(tracker.sender_id)
+
+        return []
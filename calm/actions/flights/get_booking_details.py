@@ -2,23 +2,33 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.http_tools import shared_async_travel_tools
+from shared_tools.prefetch import shared_prefetcher
 from rasa_sdk.events import SlotSet
 
-tools = TravelTools()
+tools = shared_async_travel_tools()
+prefetcher = shared_prefetcher()
 
 class GetBookingDetails(Action):
 
     def name(self) -> Text:
         return "get_booking_details"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         booking_id = tracker.get_slot("booking_id")
 
-        booking_details = tools.get_booking_details(booking_id)
+        booking_details = await tools.get_booking_details(booking_id)
+        if booking_details is None:
+            return [
+                SlotSet("booking_details", None),
+                SlotSet("booking_details_readable", f"No booking found with reference {booking_id}\n"),
+            ]
+
+        # Start the cancellation lookups while the user confirms the booking
+        prefetcher.prefetch_cancellation(tracker.sender_id, booking_details)
 
         readable_booking_details = (f"Status: {booking_details['status']}\n"
                                     f"Flight ID: {booking_details['flight']['flight_id']}\n"
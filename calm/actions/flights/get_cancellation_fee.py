@@ -2,26 +2,29 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.prefetch import shared_prefetcher
 from rasa_sdk.events import SlotSet, BotUttered
 import json
 from datetime import datetime
 
-tools = TravelTools()
+prefetcher = shared_prefetcher()
 
 class CalculateCancellationFee(Action):
 
     def name(self) -> Text:
         return "calculate_cancellation_fee"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
-        booking_details = dict(tracker.get_slot("booking_details"))
+        booking_details = tracker.get_slot("booking_details")
+        if booking_details is None:
+            return [SlotSet("cancellation_fee_details", {"error": "No booking loaded"})]
+        booking_details = dict(booking_details)
         cancellation_date = datetime.now().strftime("%Y-%m-%d")
 
-        cancellation_fee_details = tools.calculate_cancellation_fee(booking_details["booking_reference"],
-                                                                    cancellation_date)
+        cancellation_fee_details = await prefetcher.call(tracker.sender_id, "calculate_cancellation_fee",
+                                                         booking_details["booking_reference"], cancellation_date)
 
         return [SlotSet("cancellation_fee_details", cancellation_fee_details)]
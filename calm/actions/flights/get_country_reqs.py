@@ -2,19 +2,19 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.http_tools import shared_async_travel_tools
 from rasa_sdk.events import SlotSet
 
-tools = TravelTools()
+tools = shared_async_travel_tools()
 
 class ValidatePassportFormat(Action):
 
     def name(self) -> Text:
         return "get_country_entry_requirements"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
 
         destination_city = tracker.get_slot("destination_city")
@@ -23,7 +23,7 @@ class ValidatePassportFormat(Action):
                                "berlin": "Germany",
                                "paris": "France"}.get(destination_city.lower())
 
-        entry_requirements = tools.get_country_entry_requirements(destination_country)
+        entry_requirements = await tools.get_country_entry_requirements(destination_country)
 
 
         return [SlotSet("country_entry_requirements", f"{entry_requirements['special_requirements']}\n"
@@ -2,25 +2,31 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.prefetch import shared_prefetcher
 from rasa_sdk.events import SlotSet, BotUttered
 import json
 
 
-tools = TravelTools()
+prefetcher = shared_prefetcher()
 
 class GetFareRules(Action):
 
     def name(self) -> Text:
         return "get_fare_rules"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         dispatcher.utter_message("Fetching fare rules included in your booking.... ")
-        booking_details = dict(tracker.get_slot("booking_details"))
-
-        fare_rules = tools.get_fare_rules(booking_details["flight"]["airline"], booking_details["flight"]["fare_class"])
+        booking_details = tracker.get_slot("booking_details")
+        if booking_details is None:
+            return [SlotSet("fare_rules", {"error": "No booking loaded"})]
+        booking_details = dict(booking_details)
+
+        fare_rules = await prefetcher.call(tracker.sender_id, "get_fare_rules",
+                                           booking_details["flight"]["airline"],
+                                           booking_details["flight"]["fare_class"],
+                                           booking_details["booking_date"])
 
         return [SlotSet("fare_rules", fare_rules)]
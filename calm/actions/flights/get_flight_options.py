@@ -2,26 +2,26 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.http_tools import shared_async_travel_tools
 from rasa_sdk.events import SlotSet
 
-tools = TravelTools()
+tools = shared_async_travel_tools()
 
 class GetFlightOptions(Action):
 
     def name(self) -> Text:
         return "get_flight_options"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         source_city = tracker.get_slot("source_city")
         destination_city = tracker.get_slot("destination_city")
         num_passengers = 1
         date_of_travel = tracker.get_slot("date_of_travel")
 
-        flight_options = tools.search_flights(source_city, destination_city, date_of_travel, num_passengers)
+        flight_options = await tools.search_flights(source_city, destination_city, date_of_travel, num_passengers)
 
         readable_options = "\n\n".join([f"Flight ID: {option['flight_id']}\n"
                                           f"Departure: {option['departure']}\n"
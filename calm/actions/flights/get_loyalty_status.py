@@ -2,28 +2,30 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.prefetch import shared_prefetcher
 from rasa_sdk.events import SlotSet, BotUttered
 import json
 
 
-tools = TravelTools()
+prefetcher = shared_prefetcher()
 
 class GetLoyaltyStatus(Action):
 
     def name(self) -> Text:
         return "check_loyalty_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         dispatcher.utter_message("Checking your membership tier if you qualify for any rebates...")
 
-        booking_details = dict(tracker.get_slot("booking_details"))
+        booking_details = tracker.get_slot("booking_details")
+        if booking_details is None:
+            return [SlotSet("loyalty_status", {"error": "No booking loaded"})]
 
-        member_id = booking_details["member_id"]
+        member_id = booking_details.get("member_id")
 
-        loyalty_status = tools.check_loyalty_status(member_id)
+        loyalty_status = await prefetcher.call(tracker.sender_id, "check_loyalty_status", member_id)
 
         return [SlotSet("loyalty_status", loyalty_status)]
@@ -2,25 +2,25 @@ from typing import Any, Text, Dict, List
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from shared_tools.booking import TravelTools
+from shared_tools.http_tools import shared_async_travel_tools
 from rasa_sdk.events import SlotSet
 
-tools = TravelTools()
+tools = shared_async_travel_tools()
 
 class ValidatePassportFormat(Action):
 
     def name(self) -> Text:
         return "get_visa_requirements"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
 
         nationality = tracker.get_slot("passenger_nationality")
         destination_city = tracker.get_slot("destination_city")
 
-        entry_requirements = tools.get_visa_requirements(nationality, destination_city)
+        entry_requirements = await tools.get_visa_requirements(nationality, destination_city)
 
 
         return [SlotSet("visa_requirements", f"Visa required: {entry_requirements['visa_required']}\n"
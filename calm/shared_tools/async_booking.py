@@ -0,0 +1,41 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Callable, Optional
+
+from .booking import TravelTools
+
+
+class AsyncTravelTools:
+    """Awaitable facade over TravelTools for use from an asyncio event loop.
+
+    Every public TravelTools method is exposed as a coroutine function with the same name and
+    signature. Methods that are already coroutine functions are awaited directly. Plain methods
+    are called inline by default, which is right for the in-memory mocks; pass
+    `offload_to_thread=True` once a method does blocking I/O so it runs in the default executor
+    instead of stalling every other conversation on the loop.
+    """
+
+    def __init__(self, tools: Optional[TravelTools] = None, offload_to_thread: bool = False):
+        self.tools = tools if tools is not None else TravelTools()
+        self.offload_to_thread = offload_to_thread
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        tool_func = getattr(self.tools, name)
+
+        if inspect.iscoroutinefunction(tool_func):
+            wrapper = tool_func
+        elif self.offload_to_thread:
+            @functools.wraps(tool_func)
+            async def wrapper(*args, **kwargs):
+                return await asyncio.to_thread(tool_func, *args, **kwargs)
+        else:
+            @functools.wraps(tool_func)
+            async def wrapper(*args, **kwargs):
+                return tool_func(*args, **kwargs)
+
+        # Cache the wrapper so the next lookup skips __getattr__
+        setattr(self, name, wrapper)
+        return wrapper
@@ -1,14 +1,28 @@
+import copy
 import random
-from typing import List, Dict
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
+from .booking_repository import shared_booking_repository
+from .fares import ANY, loyalty_waiver, quote_refund, quote_refunds, shared_fare_rule_store
+from .instrumentation import debug, instrument_tools
+from .inventory import shared_flight_inventory
+from .loyalty import shared_loyalty_index
+from .passports import shared_passport_rules
 
+
+@instrument_tools
 class TravelTools:
     """Mock implementations of travel tools with realistic responses"""
 
     @staticmethod
-    def search_flights(origin: str, destination: str, date: str, passengers: int) -> List[Dict]:
-        """Mock flight search - returns fixed flight options"""
-        print(f"🔍 Searching flights: {origin} → {destination} on {date} for {passengers} passengers")
+    def search_flights(origin: str, destination: str, date: str, passengers: int,
+                       max_price: Optional[float] = None, max_results: int = 10) -> List[Dict]:
+        """Flight search over the inventory at FLIGHT_INVENTORY_PATH, cheapest first - returns fixed
+        flight options when no inventory is configured"""
+        debug("🔍 Searching flights: %s → %s on %s for %s passengers", origin, destination, date, passengers)
+        inventory = shared_flight_inventory()
+        if inventory is not None:
+            return inventory.search(origin, destination, date, passengers, max_price=max_price, top_k=max_results)
         flights = [
             {
                 "flight_id": "AA101",
@@ -29,12 +43,12 @@ class TravelTools:
                 "fare_class": "Economy"
             }
         ]
-        return flights
+        return [flight for flight in flights if max_price is None or flight["price"] <= max_price][:max_results]
 
     @staticmethod
     def get_visa_requirements(passport_country: str, destination: str) -> Dict:
         """Mock visa requirements check"""
-        print(f"🛂 Checking visa requirements: {passport_country} → {destination}")
+        debug("🛂 Checking visa requirements: %s → %s", passport_country, destination)
         visa_required = False
         if passport_country in ["India", "IN"]:
             visa_required = True
@@ -49,22 +63,22 @@ class TravelTools:
     @staticmethod
     def check_minimum_age(birth_date: str, minimum_age: int) -> bool:
         """Mock age verification"""
-        print(f"📅 Checking age requirement: DOB {birth_date}, min age {minimum_age}")
+        debug("📅 Checking age requirement: DOB %s, min age %s", birth_date, minimum_age)
         from datetime import datetime
         dob = datetime.strptime(birth_date, "%Y-%m-%d")
         age = (datetime.now() - dob).days // 365
         meets_requirement = age >= minimum_age
-        print(f"   Age: {age}, Meets requirement: {meets_requirement}")
+        debug("   Age: %s, Meets requirement: %s", age, meets_requirement)
         return meets_requirement
 
     @staticmethod
     def get_country_entry_requirements(country_code: str) -> Dict:
         """Mock country entry requirements"""
-        print(f"🌍 Getting entry requirements for: {country_code}")
+        debug("🌍 Getting entry requirements for: %s", country_code)
         health_advisory = "All passengers must be vaccinated against Covid-19 and must show evidence of it on entry" if country_code in ["United States", "US", "Germany", "DE", "France", "FR"] else "No current health restrictions"
         return {
             "country": country_code,
-            "passport_validity_months": 6,
+            "passport_validity_months": shared_passport_rules().rule(country_code).entry_validity_months,
             "vaccinations_required": [],
             "special_requirements": "None for elderly travelers",
             "health_advisory": health_advisory
@@ -72,31 +86,40 @@ class TravelTools:
 
     @staticmethod
     def validate_passport_format(passport_number: str, country_code: str) -> bool:
-        """Mock passport format validation"""
-        print(f"📘 Validating passport format: {passport_number} ({country_code})")
-        is_valid = len(passport_number) >= 8 and passport_number.startswith(country_code)
-        print(f"   Format valid: {is_valid}")
+        """Passport number format validation against the issuing country's rules"""
+        debug("📘 Validating passport format: %s (%s)", passport_number, country_code)
+        is_valid = shared_passport_rules().validate_number(passport_number, country_code)
+        debug("   Format valid: %s", is_valid)
         return is_valid
 
     @staticmethod
-    def check_passport_expiry_status(passport_number: str, country: str, travel_date: str) -> Dict:
-        """Mock passport expiry check"""
-        print(f"📅 Checking passport expiry: {passport_number} for travel on {travel_date}")
-        result = {
-            "passport_number": passport_number,
-            "valid": True,
-            "expires": "2028-12-15",
-            "months_remaining": 18,
-            "meets_requirements": True,
-            "travel_date": travel_date
-        }
-        print(f"   Expiry status: {result}")
+    def check_passport_expiry_status(passport_number: str, country: str, travel_date: str,
+                                     expiry_date: Optional[str] = None, destination: Optional[str] = None) -> Dict:
+        """Passport validity on the travel date, against the destination's entry rules when given"""
+        debug("📅 Checking passport expiry: %s for travel on %s", passport_number, travel_date)
+        result = shared_passport_rules().expiry_status(passport_number, travel_date,
+                                                       expiry_date or TravelTools.MOCK_PASSPORT_EXPIRY, destination)
+        debug("   Expiry status: %s", result)
         return result
 
+    # Mock: expiry date of passports whose expiry date isn't known
+    MOCK_PASSPORT_EXPIRY = "2028-12-15"
+
+    @staticmethod
+    def validate_passenger_manifest(passengers: List[Dict], travel_date: str,
+                                    destination: Optional[str] = None) -> List[Dict]:
+        """Passport format, MRZ and expiry checks of every passenger of a booking, e.g. a group or a
+        full flight. Passengers are {"passport_number", "nationality", "expiry_date"} or {"mrz"}"""
+        debug("🛂 Validating manifest of %s passengers for travel on %s", len(passengers), travel_date)
+        # Mock: passengers without an expiry date are checked with MOCK_PASSPORT_EXPIRY
+        passengers = [passenger if passenger.get("expiry_date") or passenger.get("mrz")
+                      else {**passenger, "expiry_date": TravelTools.MOCK_PASSPORT_EXPIRY} for passenger in passengers]
+        return shared_passport_rules().validate_manifest(passengers, travel_date, destination)
+
     @staticmethod
     def search_hotels(city: str, checkin: str, checkout: str, rooms: int) -> List[Dict]:
         """Mock hotel search"""
-        print(f"🏨 Searching hotels in {city}: {checkin} to {checkout}, {rooms} room(s)")
+        debug("🏨 Searching hotels in %s: %s to %s, %s room(s)", city, checkin, checkout, rooms)
         return [
             {
                 "hotel_id": "HTL001",
@@ -119,7 +142,7 @@ class TravelTools:
     @staticmethod
     def validate_credit_card(card_number: str, expiry: str, cvv: str) -> Dict:
         """Mock credit card validation"""
-        print(f"💳 Validating credit card: {card_number[-4:]} exp {expiry}")
+        debug("💳 Validating credit card: %s exp %s", card_number[-4:], expiry)
         return {
             "valid": True,
             "card_type": "Visa",
@@ -130,7 +153,7 @@ class TravelTools:
     @staticmethod
     def authorize_payment(card_details: Dict, amount: float) -> Dict:
         """Mock payment authorization"""
-        print(f"💰 Authorizing payment: ${amount}")
+        debug("💰 Authorizing payment: $%s", amount)
         return {
             "authorized": True,
             "auth_code": f"AUTH{random.randint(100000, 999999)}",
@@ -142,7 +165,7 @@ class TravelTools:
     def create_flight_booking(flight_details: Dict, passengers: List, payment_auth: str) -> str:
         """Mock flight booking creation"""
         confirmation = f"CONF{random.randint(100000, 999999)}"
-        print(f"✈️ Creating flight booking: {confirmation}")
+        debug("✈️ Creating flight booking: %s", confirmation)
         return confirmation
 
     # =============================================================================
@@ -152,26 +175,42 @@ class TravelTools:
     @staticmethod
     def validate_booking_reference(reference_code: str) -> bool:
         """Mock booking reference validation"""
-        print(f"🔍 Validating booking reference: {reference_code}")
-        # Mock: Accept any 6+ character reference starting with CONF
-        is_valid = len(reference_code) >= 6 and reference_code.startswith("CONF")
-        print(f"   Reference valid: {is_valid}")
+        debug("🔍 Validating booking reference: %s", reference_code)
+        repository = shared_booking_repository()
+        if repository is not None:
+            is_valid = repository.exists(reference_code)
+        else:
+            # Mock: Accept any 6+ character reference starting with CONF
+            is_valid = len(reference_code) >= 6 and reference_code.startswith("CONF")
+        debug("   Reference valid: %s", is_valid)
         return is_valid
 
     @staticmethod
     def validate_passenger_name(booking_ref: str, last_name: str) -> bool:
         """Mock passenger name validation against booking"""
-        print(f"👤 Validating passenger name: {last_name} for booking {booking_ref}")
-        # Mock: Accept common last names for demo
-        valid_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia"]
-        is_valid = last_name in valid_names
-        print(f"   Name validation: {is_valid}")
+        debug("👤 Validating passenger name: %s for booking %s", last_name, booking_ref)
+        repository = shared_booking_repository()
+        if repository is not None:
+            is_valid = repository.has_passenger(booking_ref, last_name)
+        else:
+            # Mock: Accept common last names for demo
+            valid_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia"]
+            is_valid = last_name in valid_names
+        debug("   Name validation: %s", is_valid)
         return is_valid
 
     @staticmethod
-    def get_booking_details(booking_reference: str) -> Dict:
-        """Mock booking details retrieval"""
-        print(f"📋 Retrieving booking details for: {booking_reference}")
+    def get_booking_details(booking_reference: str) -> Optional[Dict]:
+        """Booking details from the repository at BOOKINGS_DB_PATH - falls back to two mock bookings
+        when no repository is configured. None when the booking doesn't exist"""
+        debug("📋 Retrieving booking details for: %s", booking_reference)
+        return TravelTools._booking(booking_reference)
+
+    @staticmethod
+    def _booking(booking_reference: str) -> Optional[Dict]:
+        repository = shared_booking_repository()
+        if repository is not None:
+            return repository.get_booking(booking_reference)
         if booking_reference == "CONF12345":
             flight_details = {
                 "flight_id": "AA101",
@@ -192,6 +231,8 @@ class TravelTools:
                 "price": 650.00,
                 "airline": "Delta"
             }
+        else:
+            return None
         return {
             "booking_reference": booking_reference,
             "status": "confirmed",
@@ -205,86 +246,85 @@ class TravelTools:
         }
 
     @staticmethod
-    def get_fare_rules(airline: str, fare_class: str) -> Dict:
-        """Mock fare rules retrieval"""
-        print(f"📜 Getting fare rules: {airline} {fare_class}")
-        return {
-            "airline": airline,
-            "fare_class": fare_class,
-            "cancellation_policy": {
-                "24_hour_free": True,
-                "before_7_days": {"fee": 200, "percentage": 0},
-                "7_days_to_24_hours": {"fee": 300, "percentage": 25},
-                "within_24_hours": {"fee": 400, "percentage": 50},
-                "after_departure": {"fee": 0, "percentage": 100}
-            },
-            "refund_timeline": "7-10 business days"
-        }
+    def get_fare_rules(airline: str, fare_class: str, booking_date: Optional[str] = None,
+                       booking_ref: Optional[str] = None) -> Dict:
+        """Fare rules from the fare rule store - the version in force on the booking date, taken from
+        booking_ref when not given. The latest version, the one new bookings get, without either"""
+        debug("📜 Getting fare rules: %s %s", airline, fare_class)
+        if booking_date is None and booking_ref is not None:
+            booking = TravelTools._booking(booking_ref)
+            if booking is None:
+                return {"error": f"No booking found with reference {booking_ref}"}
+            booking_date = booking["booking_date"]
+        return shared_fare_rule_store().rules(airline, fare_class, booking_date)
 
     @staticmethod
     def calculate_cancellation_fee(booking_ref: str, cancellation_date: str) -> Dict:
-        """Mock cancellation fee calculation"""
-        print(f"💰 Calculating cancellation fee for {booking_ref} on {cancellation_date}")
-
-        # Mock calculation based on timing
-        from datetime import datetime, timedelta
-        cancel_date = datetime.strptime(cancellation_date, "%Y-%m-%d")
-        travel_date = datetime(2025, 9, 15)  # Mock travel date
-        days_before = (travel_date - cancel_date).days
-
-        if days_before > 7:
-            fee = 200
-            refund_amount = 450.00  # 650 - 200
-        elif days_before > 1:
-            fee = 300
-            refund_amount = 350.00  # 650 - 300
-        else:
-            fee = 400
-            refund_amount = 250.00  # 650 - 400
+        """Cancellation fee and refund of a booking under the fare rules it was booked on, before any
+        loyalty waiver - apply_loyalty_discount applies that"""
+        debug("💰 Calculating cancellation fee for %s on %s", booking_ref, cancellation_date)
+        booking = TravelTools._booking(booking_ref)
+        if booking is None:
+            return {"error": f"No booking found with reference {booking_ref}"}
+        flight = booking["flight"]
+        result = quote_refund(shared_fare_rule_store(), flight["airline"], flight["fare_class"], booking["total_paid"],
+                              booking["passenger_count"], booking["booking_date"], flight["date"], cancellation_date)
+        debug("   Cancellation calculation: %s", result)
+        return result
 
+    @staticmethod
+    def check_loyalty_status(member_id: str) -> Dict:
+        """Loyalty tier from the index at LOYALTY_INDEX_PATH, status None for unknown members - falls
+        back to a mock when no index is configured"""
+        debug("🏆 Checking loyalty status for member: %s", member_id)
         result = {
-            "original_amount": 650.00,
-            "cancellation_fee": fee,
-            "refund_amount": refund_amount,
-            "days_before_travel": days_before,
+            "member_id": member_id,
+            "status": TravelTools._loyalty_tier(member_id),
         }
-        print(f"   Cancellation calculation: {result}")
+        debug("   Loyalty status: %s", result)
         return result
 
     @staticmethod
-    def check_loyalty_status(member_id: str) -> Dict:
-        """Mock loyalty status check"""
-        print(f"🏆 Checking loyalty status for member: {member_id}")
-
+    def _loyalty_tier(member_id: Optional[str]) -> Optional[str]:
+        if member_id is None:
+            return None
+        index = shared_loyalty_index()
+        if index is not None:
+            return index.tier(member_id)
         # Mock: Some member IDs are platinum
         platinum_members = ["AXQW123456", "PLT789012", "PLT345678"]
-        is_platinum = member_id in platinum_members
+        return "Platinum" if member_id in platinum_members else "Gold"
 
+    @staticmethod
+    def apply_loyalty_discount(loyalty_status: str, original_booking_amount: float, cancellation_fee: float,
+                               booking_ref: Optional[str] = None) -> Dict:
+        """Refund of a cancellation after the waiver the fare rules give loyalty_status on the fee
+        calculate_cancellation_fee quoted - the rules booking_ref was booked on, the latest rules
+        without it"""
+        debug("🏆 Applying %s loyalty discount to a $%s fee", loyalty_status, cancellation_fee)
+        if booking_ref is None:
+            policy = shared_fare_rule_store().policy(ANY, ANY)
+        else:
+            booking = TravelTools._booking(booking_ref)
+            if booking is None:
+                return {"error": f"No booking found with reference {booking_ref}"}
+            policy = shared_fare_rule_store().policy(booking["flight"]["airline"], booking["flight"]["fare_class"],
+                                                     booking["booking_date"])
+        fee, waiver = loyalty_waiver(policy, cancellation_fee, loyalty_status)
         result = {
-            "member_id": member_id,
-            "status": "Platinum" if is_platinum else "Gold",
+            "original_amount": original_booking_amount,
+            "loyalty_status": loyalty_status,
+            "loyalty_waiver_percentage": waiver,
+            "cancellation_fee": fee,
+            "refund_amount": round(original_booking_amount - fee, 2),
         }
-        print(f"   Loyalty status: {result}")
+        debug("   Loyalty discount: %s", result)
         return result
 
-    @staticmethod
-    def apply_loyalty_discount(loyalty_status: str, original_booking_amount: float, cancellation_fee: float) -> Dict:
-        """Mock loyalty discount calculation"""
-        if loyalty_status == "Platinum":
-            return {
-                "original_amount": original_booking_amount,
-                "refund_amount": original_booking_amount,
-            }
-        else:
-            return {
-                "original_amount": original_booking_amount,
-                "refund_amount": original_booking_amount - cancellation_fee,
-            }
-
     @staticmethod
     def calculate_points_refund(original_amount: float, penalty_reduction: float = 0.05) -> Dict:
         """Mock points refund calculation with penalty reduction"""
-        print(f"🎯 Calculating points refund: ${original_amount} with {penalty_reduction * 100}% reduction")
+        debug("🎯 Calculating points refund: $%s with %s%% reduction", original_amount, penalty_reduction * 100)
 
         # Convert to points (mock: $1 = 100 points)
         base_points = int(original_amount * 100)
@@ -301,13 +341,13 @@ class TravelTools:
             "total_points": total_points,
             "points_value": f"${total_points / 100:.2f} equivalent"
         }
-        print(f"   Points calculation: {result}")
+        debug("   Points calculation: %s", result)
         return result
 
     @staticmethod
     def process_refund(booking_ref: str, amount: float, refund_method: str) -> Dict:
         """Mock refund processing"""
-        print(f"💳 Processing refund: {booking_ref} - ${amount} via {refund_method}")
+        debug("💳 Processing refund: %s - $%s via %s", booking_ref, amount, refund_method)
 
         transaction_id = f"REF{random.randint(100000, 999999)}"
 
@@ -319,18 +359,95 @@ class TravelTools:
             "processing_time": "7-10 business days" if refund_method == "original_payment" else "immediate",
             "status": "processed"
         }
-        print(f"   Refund processed: {result}")
+        debug("   Refund processed: %s", result)
         return result
 
     @staticmethod
     def generate_cancellation_confirmation(booking_ref: str, refund_details: Dict) -> str:
         """Mock cancellation confirmation generation"""
         confirmation_code = f"CANC{random.randint(100000, 999999)}"
-        print(f"📧 Generated cancellation confirmation: {confirmation_code}")
+        debug("📧 Generated cancellation confirmation: %s", confirmation_code)
         return confirmation_code
 
     @staticmethod
     def send_cancellation_email(email: str, cancellation_details: Dict) -> bool:
         """Mock cancellation email sending"""
-        print(f"📧 Sending cancellation confirmation email to: {email}")
+        debug("📧 Sending cancellation confirmation email to: %s", email)
         return True
+
+    # =============================================================================
+    # BATCH LOOKUPS
+    # =============================================================================
+    # Columnar variants of the lookups above: one list per argument of the single lookup, all of
+    # the same length. Identical requests are looked up once and the results come back in input
+    # order, repeats as copies.
+
+    @staticmethod
+    def _batch(tool: Callable[..., Any], *columns: Sequence) -> List:
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError(f"All argument lists must have the same length, got {[len(column) for column in columns]}")
+        results = {}
+        batch = []
+        for request in zip(*columns):
+            if request in results:
+                batch.append(copy.deepcopy(results[request]))
+            else:
+                results[request] = tool(*request)
+                batch.append(results[request])
+        return batch
+
+    @staticmethod
+    def search_flights_many(origins: List[str], destinations: List[str], dates: List[str],
+                            passengers: List[int]) -> List[List[Dict]]:
+        """Batch flight search, one list of flight options per route"""
+        return TravelTools._batch(TravelTools.search_flights, origins, destinations, dates, passengers)
+
+    @staticmethod
+    def get_visa_requirements_many(passport_countries: List[str], destinations: List[str]) -> List[Dict]:
+        """Batch visa requirements check, e.g. for every passenger of a group booking"""
+        return TravelTools._batch(TravelTools.get_visa_requirements, passport_countries, destinations)
+
+    @staticmethod
+    def validate_passport_format_many(passport_numbers: List[str], country_codes: List[str]) -> List[bool]:
+        """Batch passport format validation"""
+        return TravelTools._batch(TravelTools.validate_passport_format, passport_numbers, country_codes)
+
+    @staticmethod
+    def check_passport_expiry_status_many(passport_numbers: List[str], countries: List[str],
+                                          travel_dates: List[str]) -> List[Dict]:
+        """Batch passport expiry check"""
+        return TravelTools._batch(TravelTools.check_passport_expiry_status, passport_numbers, countries,
+                                  travel_dates)
+
+    @staticmethod
+    def check_loyalty_status_many(member_ids: List[str]) -> List[Dict]:
+        """Batch loyalty status check"""
+        index = shared_loyalty_index()
+        if index is None:
+            return TravelTools._batch(TravelTools.check_loyalty_status, member_ids)
+        debug("🏆 Checking loyalty status for %s members", len(member_ids))
+        return [{"member_id": member_id, "status": status}
+                for member_id, status in zip(member_ids, index.tiers_many(member_ids))]
+
+    @staticmethod
+    def calculate_cancellation_fee_many(booking_refs: List[str], cancellation_dates: List[str]) -> List[Dict]:
+        """Batch cancellation fee calculation, e.g. for every booking of a disrupted flight"""
+        debug("💰 Calculating cancellation fees for %s bookings", len(booking_refs))
+        if len(booking_refs) != len(cancellation_dates):
+            raise ValueError(f"All argument lists must have the same length, "
+                             f"got {[len(booking_refs), len(cancellation_dates)]}")
+        bookings = {booking_ref: TravelTools._booking(booking_ref) for booking_ref in set(booking_refs)}
+        found = [index for index, booking_ref in enumerate(booking_refs) if bookings[booking_ref] is not None]
+        rows = [bookings[booking_refs[index]] for index in found]
+        quotes = quote_refunds(shared_fare_rule_store(),
+                               [booking["flight"]["airline"] for booking in rows],
+                               [booking["flight"]["fare_class"] for booking in rows],
+                               [booking["total_paid"] for booking in rows],
+                               [booking["passenger_count"] for booking in rows],
+                               [booking["booking_date"] for booking in rows],
+                               [booking["flight"]["date"] for booking in rows],
+                               [cancellation_dates[index] for index in found])
+        results = [{"error": f"No booking found with reference {booking_ref}"} for booking_ref in booking_refs]
+        for index, quote in zip(found, quotes):
+            results[index] = quote
+        return results
@@ -0,0 +1,222 @@
+import os
+import random
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# One clustered B-tree per table (WITHOUT ROWID): a booking and its passengers are found with a
+# single index descent on the booking reference, a handful of pages even with tens of millions
+# of bookings. Member ids and passenger last names get secondary indexes.
+SCHEMA = """
+CREATE TABLE bookings (
+    booking_reference TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    member_id TEXT,
+    total_paid REAL NOT NULL,
+    payment_method TEXT,
+    booking_date TEXT,
+    flight_id TEXT NOT NULL,
+    route TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    fare_class TEXT NOT NULL,
+    price REAL NOT NULL,
+    airline TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE passengers (
+    booking_reference TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    last_name TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (booking_reference, position)
+) WITHOUT ROWID;
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+INDEXES = """
+CREATE INDEX bookings_by_member ON bookings (member_id);
+CREATE INDEX passengers_by_last_name ON passengers (last_name, booking_reference);
+"""
+BOOKING_COLUMNS = ["booking_reference", "status", "member_id", "total_paid", "payment_method", "booking_date"]
+FLIGHT_COLUMNS = ["flight_id", "route", "date", "time", "fare_class", "price", "airline"]
+
+# The bookings the demos use, see TravelTools.get_booking_details
+DEMO_BOOKINGS = [
+    {
+        "booking_reference": "CONF12345", "status": "confirmed", "total_paid": 650.00,
+        "payment_method": "Visa ending in 9012", "booking_date": "2024-02-15", "passengers": ["John Smith"],
+        "member_id": "AXQW123456",
+        "flight": {"flight_id": "AA101", "route": "NYC-PAR", "date": "2025-09-15", "time": "08:00",
+                   "fare_class": "Economy", "price": 650.00, "airline": "Delta"},
+    },
+    {
+        "booking_reference": "CONF98765", "status": "confirmed", "total_paid": 650.00,
+        "payment_method": "Visa ending in 9012", "booking_date": "2024-02-15", "passengers": ["John Smith"],
+        "member_id": "AXQW123456",
+        "flight": {"flight_id": "AA102", "route": "PAR-NYC", "date": "2025-09-20", "time": "02:00",
+                   "fare_class": "Economy", "price": 650.00, "airline": "Delta"},
+    },
+]
+
+
+class BookingRepository:
+    """Read-only lookups in a bookings database written by load_bookings().
+
+    Each thread gets its own read-only SQLite connection with a page cache capped at
+    `cache_size_kib`, so the resident footprint stays small whatever the size of the file; the
+    OS page cache keeps the hot parts of the indexes in memory.
+    """
+
+    def __init__(self, path: str, cache_size_kib: int = 8192):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.cache_size_kib = cache_size_kib
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            connection.execute(f"PRAGMA cache_size = -{self.cache_size_kib}")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def __len__(self) -> int:
+        row = self._connection().execute("SELECT value FROM metadata WHERE key = 'booking_count'").fetchone()
+        return int(row[0]) if row else 0
+
+    def get_booking(self, booking_reference: str) -> Optional[Dict]:
+        """Booking in the shape of TravelTools.get_booking_details, None if it doesn't exist"""
+        connection = self._connection()
+        row = connection.execute(
+            f"SELECT {', '.join(BOOKING_COLUMNS + FLIGHT_COLUMNS)} FROM bookings WHERE booking_reference = ?",
+            (booking_reference,)).fetchone()
+        if row is None:
+            return None
+        passengers = [name for name, in connection.execute(
+            "SELECT name FROM passengers WHERE booking_reference = ? ORDER BY position", (booking_reference,))]
+        booking = dict(zip(BOOKING_COLUMNS, row))
+        booking["flight"] = dict(zip(FLIGHT_COLUMNS, row[len(BOOKING_COLUMNS):]))
+        booking["passengers"] = passengers
+        booking["passenger_count"] = len(passengers)
+        return booking
+
+    def exists(self, booking_reference: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM bookings WHERE booking_reference = ?", (booking_reference,)).fetchone() is not None
+
+    def has_passenger(self, booking_reference: str, last_name: str) -> bool:
+        """Whether a passenger of the booking has this last name, ignoring case"""
+        return self._connection().execute(
+            "SELECT 1 FROM passengers WHERE booking_reference = ? AND last_name = ? LIMIT 1",
+            (booking_reference, last_name.strip())).fetchone() is not None
+
+    def bookings_for_member(self, member_id: str, limit: int = 100) -> List[str]:
+        return [reference for reference, in self._connection().execute(
+            "SELECT booking_reference FROM bookings WHERE member_id = ? LIMIT ?", (member_id, limit))]
+
+    def bookings_for_passenger(self, last_name: str, limit: int = 100) -> List[str]:
+        return [reference for reference, in self._connection().execute(
+            "SELECT booking_reference FROM passengers WHERE last_name = ? LIMIT ?", (last_name.strip(), limit))]
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def load_bookings(path: str, bookings: Iterable[Dict], batch_size: int = 50000) -> int:
+    """Write bookings, in the shape of TravelTools.get_booking_details, to a new database at `path`.
+
+    The file is built next to `path` and moved into place once complete, and the secondary
+    indexes are built after the bulk insert, which is several times faster than maintaining them.
+    """
+    temporary_path = f"{path}.tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    connection = sqlite3.connect(temporary_path)
+    connection.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA)
+    insert_booking = (f"INSERT INTO bookings VALUES "
+                      f"({', '.join('?' * (len(BOOKING_COLUMNS) + len(FLIGHT_COLUMNS)))})")
+    insert_passenger = "INSERT INTO passengers VALUES (?, ?, ?, ?)"
+    count = 0
+    booking_rows, passenger_rows = [], []
+
+    def flush():
+        connection.executemany(insert_booking, booking_rows)
+        connection.executemany(insert_passenger, passenger_rows)
+        booking_rows.clear()
+        passenger_rows.clear()
+
+    for booking in bookings:
+        booking_rows.append([booking.get(column) for column in BOOKING_COLUMNS]
+                            + [booking["flight"][column] for column in FLIGHT_COLUMNS])
+        passenger_rows.extend((booking["booking_reference"], position, name, name.split()[-1])
+                              for position, name in enumerate(booking["passengers"]))
+        count += 1
+        if len(booking_rows) >= batch_size:
+            flush()
+    flush()
+    connection.executescript(INDEXES)
+    connection.execute("INSERT INTO metadata VALUES ('booking_count', ?)", (str(count),))
+    connection.commit()
+    connection.close()
+    os.replace(temporary_path, path)
+    return count
+
+
+FIRST_NAMES = ["John", "Mary", "Wei", "Priya", "Carlos", "Fatima", "Hans", "Yuki", "Olga", "Ahmed", "Emma", "Luca"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Müller", "Schmidt", "Sharma", "Patel", "Chen", "Wang", "Tanaka", "Kim", "Rossi", "Dubois", "Novak"]
+ROUTES = ["NYC-PAR", "PAR-NYC", "NYC-LON", "LON-NYC", "BER-DEL", "DEL-BER", "PAR-BER", "BER-PAR", "LON-DEL",
+          "DEL-LON", "NYC-BER", "BER-NYC"]
+AIRLINES = [("AA", "American Airlines"), ("DL", "Delta"), ("AF", "Air France"), ("LH", "Lufthansa"),
+            ("BA", "British Airways"), ("AI", "Air India")]
+FARE_CLASSES = ["Economy", "Economy", "Economy", "Premium Economy", "Business", "First"]
+
+
+def synthetic_bookings(count: int, seed: int = 0) -> Iterable[Dict]:
+    """DEMO_BOOKINGS followed by `count` random bookings with references CONF00000000, CONF00000001, ..."""
+    rng = random.Random(seed)
+    yield from DEMO_BOOKINGS
+    for index in range(count):
+        passenger_count = rng.choices((1, 2, 3, 4), weights=(60, 25, 10, 5))[0]
+        last_name = rng.choice(LAST_NAMES)
+        price = round(rng.uniform(90, 2400), 2)
+        airline_code, airline = rng.choice(AIRLINES)
+        yield {
+            "booking_reference": f"CONF{index:08d}",
+            "status": rng.choices(("confirmed", "cancelled", "flown"), weights=(80, 5, 15))[0],
+            "member_id": f"M{rng.randrange(10 ** 9):09d}" if rng.random() < 0.6 else None,
+            "total_paid": round(price * passenger_count, 2),
+            "payment_method": f"Visa ending in {rng.randrange(10000):04d}",
+            "booking_date": f"2025-{rng.randint(1, 8):02d}-{rng.randint(1, 28):02d}",
+            "passengers": [f"{rng.choice(FIRST_NAMES)} {last_name}" for _ in range(passenger_count)],
+            "flight": {"flight_id": f"{airline_code}{rng.randint(100, 9999)}", "route": rng.choice(ROUTES),
+                       "date": f"2025-{rng.randint(9, 12):02d}-{rng.randint(1, 28):02d}",
+                       "time": f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 5):02d}",
+                       "fare_class": rng.choice(FARE_CLASSES), "price": price, "airline": airline},
+        }
+
+
+_shared_repository = None
+_shared_repository_lock = threading.Lock()
+
+
+def shared_booking_repository() -> Optional[BookingRepository]:
+    """Process-wide repository for the database at BOOKINGS_DB_PATH, None when it isn't set"""
+    global _shared_repository
+    path = os.environ.get("BOOKINGS_DB_PATH")
+    if path is None:
+        return None
+    if _shared_repository is None or _shared_repository.path != path:
+        with _shared_repository_lock:
+            if _shared_repository is None or _shared_repository.path != path:
+                _shared_repository = BookingRepository(path)
+    return _shared_repository
@@ -0,0 +1,160 @@
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from .booking import TravelTools
+from .countries import normalize_country
+
+
+class CachePolicy(NamedTuple):
+    ttl_seconds: float
+    max_entries: int
+
+
+# Only pure lookups may be listed here. Anything with side effects (process_refund,
+# authorize_payment, send_cancellation_email, ...) or random output must never be cached.
+# check_loyalty_status isn't: its index is swapped while the process runs and a new tier must show
+# within a second, and a lookup in the memory-mapped index costs less than the cache would. The fare
+# rule store is read once per process, so the fare rules TTL only bounds how long a pair nobody asks
+# for any more is kept.
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "get_fare_rules": CachePolicy(ttl_seconds=3600, max_entries=1024),
+    "get_visa_requirements": CachePolicy(ttl_seconds=24 * 3600, max_entries=4096),
+    "get_country_entry_requirements": CachePolicy(ttl_seconds=24 * 3600, max_entries=512),
+}
+
+# How each argument is canonicalised before it becomes part of a cache key. The tool is then called
+# with the canonical value, so a cached result never depends on the spelling of the call that filled
+# it. Only list normalisations the tools accept: the fare rule store matches airline and fare class
+# case-sensitively, so those are used as given.
+ARGUMENT_NORMALIZERS: Dict[str, Callable[[Any], Any]] = {
+    "passport_country": normalize_country,
+    "destination": normalize_country,
+    "country_code": normalize_country,
+    "country": normalize_country,
+}
+
+
+class _ToolCache:
+    """LRU map with a per-entry TTL for the results of one tool"""
+
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.policy.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.policy.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self.entries),
+            }
+
+
+class CachedTravelTools:
+    """TravelTools with a TTL/LRU result cache in front of the deterministic lookups.
+
+    Only the tools listed in `policies` (CACHE_POLICIES by default) are cached; every other
+    attribute is passed through to the wrapped TravelTools untouched. The cached tools are called
+    with normalised arguments, which also make up the cache key, so get_visa_requirements("India",
+    "FR") and get_visa_requirements("IN", "fr") share an entry and give the same result whichever
+    came first. Fields that echo an argument back (e.g. "destination_country") carry the
+    normalised form. Results are deep-copied on the way out so callers can't mutate a cached value.
+    """
+
+    def __init__(self, tools: Optional[TravelTools] = None, policies: Optional[Dict[str, CachePolicy]] = None):
+        self.tools = tools if tools is not None else TravelTools()
+        self._caches = {
+            tool_name: _ToolCache(policy)
+            for tool_name, policy in (CACHE_POLICIES if policies is None else policies).items()
+        }
+        for tool_name in self._caches:
+            setattr(self, tool_name, self._cached_tool(tool_name))
+
+    def _cached_tool(self, tool_name: str) -> Callable[..., Any]:
+        tool_func = getattr(self.tools, tool_name)
+        signature = inspect.signature(tool_func)
+        cache = self._caches[tool_name]
+
+        @functools.wraps(tool_func)
+        def cached_tool(*args, **kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                # Let the tool itself report the bad call
+                return tool_func(*args, **kwargs)
+            bound.apply_defaults()
+            for name, value in bound.arguments.items():
+                if isinstance(value, str) and name in ARGUMENT_NORMALIZERS:
+                    bound.arguments[name] = ARGUMENT_NORMALIZERS[name](value)
+            key = tuple(bound.arguments.values())
+
+            found, result = cache.get(key)
+            if not found:
+                result = tool_func(*bound.args, **bound.kwargs)
+                cache.put(key, result)
+            return copy.deepcopy(result)
+
+        return cached_tool
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not set in __init__, i.e. the uncached tools
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.tools, name)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss/eviction counters and current size for every cached tool"""
+        return {tool_name: cache.stats() for tool_name, cache in self._caches.items()}
+
+    def clear_cache(self):
+        for cache in self._caches.values():
+            with cache.lock:
+                cache.entries.clear()
+
+
+_shared_tools = None
+_shared_tools_lock = threading.Lock()
+
+
+def shared_travel_tools() -> CachedTravelTools:
+    """Process-wide CachedTravelTools, so every custom action module shares one cache"""
+    global _shared_tools
+    if _shared_tools is None:
+        with _shared_tools_lock:
+            if _shared_tools is None:
+                _shared_tools = CachedTravelTools()
+    return _shared_tools
@@ -0,0 +1,31 @@
+from typing import Optional
+
+# Country names as they show up in slots and LLM tool arguments, mapped to the codes used by TravelTools
+COUNTRY_CODES = {
+    "india": "IN",
+    "united states": "US",
+    "usa": "US",
+    "germany": "DE",
+    "france": "FR",
+    "united kingdom": "UK",
+    "italy": "IT",
+}
+
+
+def normalize_country(country: Optional[str]) -> Optional[str]:
+    """Canonical form of a country name or code, e.g. "India", "india " and "IN" all become "IN"."""
+    if country is None:
+        return None
+    country = country.strip()
+    return COUNTRY_CODES.get(country.casefold(), country.upper())
+
+# Nationality codes of passport machine readable zones (ICAO 9303), mapped to the codes above
+MRZ_COUNTRY_CODES = {
+    "IND": "IN",
+    "USA": "US",
+    "D": "DE",
+    "DEU": "DE",
+    "FRA": "FR",
+    "GBR": "UK",
+    "ITA": "IT",
+}
@@ -0,0 +1,9 @@
+import datetime
+
+
+def parse_date(value: str) -> datetime.date:
+    """Date in YYYY-MM-DD, or DD/MM/YYYY as collected by the CALM flows"""
+    value = value.strip()
+    if "/" in value:
+        return datetime.datetime.strptime(value, "%d/%m/%Y").date()
+    return datetime.date.fromisoformat(value)
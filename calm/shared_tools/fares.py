@@ -0,0 +1,213 @@
+import bisect
+import json
+import os
+import threading
+from datetime import date as Date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Cancellation tiers of a fare policy by days before departure, in the order they apply
+TIERS = ("before_7_days", "7_days_to_24_hours", "within_24_hours", "after_departure")
+FREE_TIER = "24_hour_free"
+ANY = "*"
+
+
+class FarePolicy(NamedTuple):
+    """One version of the cancellation rules of an (airline, fare_class), "*" matching any.
+
+    Each tier charges its fixed fee per passenger or its percentage of the amount paid, whichever
+    is higher, never more than the amount paid. Loyalty tiers waive a percentage of that fee, and
+    with free_within_24_hours a booking cancelled within a day of being made, at least 7 days
+    before departure, is refunded in full. A version applies to bookings made on or after its
+    effective_from date (YYYY-MM-DD).
+    """
+    airline: str
+    fare_class: str
+    version: int
+    effective_from: str
+    # tier -> (fee, percentage)
+    tiers: Dict[str, Tuple[float, float]]
+    free_within_24_hours: bool
+    # loyalty status -> percentage of the fee waived
+    loyalty_waivers: Dict[str, float]
+    refund_timeline: str
+
+    def as_rules(self, airline: Optional[str] = None, fare_class: Optional[str] = None) -> Dict:
+        """The policy in the shape returned by TravelTools.get_fare_rules"""
+        cancellation_policy = {FREE_TIER: self.free_within_24_hours}
+        cancellation_policy.update({tier: {"fee": fee, "percentage": percentage}
+                                    for tier, (fee, percentage) in self.tiers.items()})
+        return {
+            "airline": airline or self.airline,
+            "fare_class": fare_class or self.fare_class,
+            "version": self.version,
+            "effective_from": self.effective_from,
+            "cancellation_policy": cancellation_policy,
+            "loyalty_waivers": dict(self.loyalty_waivers),
+            "refund_timeline": self.refund_timeline,
+        }
+
+    @classmethod
+    def from_rules(cls, rules: Dict) -> "FarePolicy":
+        cancellation_policy = rules["cancellation_policy"]
+        missing = [tier for tier in TIERS if tier not in cancellation_policy]
+        if missing:
+            raise ValueError(f"Fare rules for {rules['airline']} {rules['fare_class']} miss the tiers {missing}")
+        return cls(rules["airline"], rules["fare_class"], rules["version"], rules["effective_from"],
+                   {tier: (cancellation_policy[tier]["fee"], cancellation_policy[tier]["percentage"])
+                    for tier in TIERS},
+                   cancellation_policy.get(FREE_TIER, False), rules.get("loyalty_waivers", {}),
+                   rules.get("refund_timeline", ""))
+
+
+STANDARD_TIERS = {"before_7_days": (200, 0), "7_days_to_24_hours": (300, 25), "within_24_hours": (400, 50),
+                  "after_departure": (0, 100)}
+DEFAULT_POLICIES = [
+    FarePolicy(ANY, ANY, 1, "2000-01-01", STANDARD_TIERS, True, {"Platinum": 100}, "7-10 business days"),
+    FarePolicy(ANY, ANY, 2, "2025-06-01", STANDARD_TIERS, True, {"Platinum": 100, "Gold": 25},
+               "7-10 business days"),
+    FarePolicy(ANY, "Business", 1, "2000-01-01",
+               {"before_7_days": (0, 0), "7_days_to_24_hours": (100, 10), "within_24_hours": (200, 25),
+                "after_departure": (0, 100)},
+               True, {"Platinum": 100, "Gold": 50}, "3-5 business days"),
+    FarePolicy(ANY, "First", 1, "2000-01-01",
+               {"before_7_days": (0, 0), "7_days_to_24_hours": (0, 0), "within_24_hours": (100, 10),
+                "after_departure": (0, 100)},
+               True, {"Platinum": 100, "Gold": 100}, "3-5 business days"),
+]
+
+
+class FareRuleStore:
+    """Versioned fare policies indexed by (airline, fare_class).
+
+    policy() picks the most specific match - the exact pair, then the airline's policy for any
+    fare class, then the fare class on any airline, then the catch-all - and of that the version
+    in force on the booking date, or the latest version without a booking date.
+    """
+
+    def __init__(self, policies: Iterable[FarePolicy] = ()):
+        self._versions: Dict[Tuple[str, str], List[FarePolicy]] = {}
+        self._effective_dates: Dict[Tuple[str, str], List[str]] = {}
+        for policy in policies:
+            self.add(policy)
+
+    def add(self, policy: FarePolicy):
+        key = (policy.airline, policy.fare_class)
+        versions = self._versions.setdefault(key, [])
+        if any(existing.version == policy.version for existing in versions):
+            raise ValueError(f"Version {policy.version} of the {key} fare policy already exists")
+        versions.append(policy)
+        versions.sort(key=lambda version: version.effective_from)
+        self._effective_dates[key] = [version.effective_from for version in versions]
+
+    def versions(self, airline: str, fare_class: str) -> List[FarePolicy]:
+        return list(self._versions.get((airline, fare_class), []))
+
+    def policy(self, airline: str, fare_class: str, booking_date: Optional[str] = None) -> FarePolicy:
+        for key in ((airline, fare_class), (airline, ANY), (ANY, fare_class), (ANY, ANY)):
+            versions = self._versions.get(key)
+            if not versions:
+                continue
+            if booking_date is None:
+                return versions[-1]
+            index = bisect.bisect_right(self._effective_dates[key], booking_date) - 1
+            if index >= 0:
+                return versions[index]
+        raise KeyError(f"No fare policy for {airline} {fare_class} on {booking_date}")
+
+    def rules(self, airline: str, fare_class: str, booking_date: Optional[str] = None) -> Dict:
+        return self.policy(airline, fare_class, booking_date).as_rules(airline, fare_class)
+
+    def __iter__(self):
+        for versions in self._versions.values():
+            yield from versions
+
+    @classmethod
+    def load(cls, path: str) -> "FareRuleStore":
+        """Store from a JSON list of fare rules in the get_fare_rules shape, see save()"""
+        with open(path, encoding="utf-8") as file:
+            return cls(FarePolicy.from_rules(rules) for rules in json.load(file))
+
+    def save(self, path: str):
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump([policy.as_rules() for policy in self], file, indent=2)
+        os.replace(temporary_path, path)
+
+
+def _ordinal(iso_date: str) -> int:
+    return Date.fromisoformat(iso_date).toordinal()
+
+
+def loyalty_waiver(policy: FarePolicy, cancellation_fee: float, loyalty_status: Optional[str]) -> Tuple[float, float]:
+    """The fee left after the waiver the policy gives loyalty_status, and the percentage waived"""
+    waiver = policy.loyalty_waivers.get(loyalty_status, 0)
+    return round(cancellation_fee * (100 - waiver) / 100, 2), waiver
+
+
+def _quote(policy: FarePolicy, amount: float, passengers: int, days_before_travel: int, days_since_booking: int,
+           days_booked_ahead: int, loyalty_status: Optional[str]) -> Dict:
+    """The refund formula of quote_refund, dates as day differences"""
+    if policy.free_within_24_hours and 0 <= days_since_booking <= 1 and days_booked_ahead >= 7:
+        tier, fee, waiver = FREE_TIER, 0.0, 0
+    else:
+        if days_before_travel > 7:
+            tier = "before_7_days"
+        elif days_before_travel > 1:
+            tier = "7_days_to_24_hours"
+        elif days_before_travel >= 0:
+            tier = "within_24_hours"
+        else:
+            tier = "after_departure"
+        fixed_fee, percentage = policy.tiers[tier]
+        fee = min(amount, max(fixed_fee * passengers, amount * percentage / 100))
+        fee, waiver = loyalty_waiver(policy, fee, loyalty_status)
+    quote = {
+        "original_amount": amount,
+        "cancellation_fee": fee,
+        "refund_amount": round(amount - fee, 2),
+        "days_before_travel": days_before_travel,
+        "tier": tier,
+        "fare_rules_version": policy.version,
+    }
+    if loyalty_status is not None:
+        quote.update(loyalty_status=loyalty_status, loyalty_waiver_percentage=waiver)
+    return quote
+
+
+def quote_refund(store: FareRuleStore, airline: str, fare_class: str, amount: float, passengers: int,
+                 booking_date: str, travel_date: str, cancellation_date: str,
+                 loyalty_status: Optional[str] = None) -> Dict:
+    """Cancellation fee and refund of one booking under the fare policy in force when it was booked,
+    after the policy's waiver for loyalty_status when one is given"""
+    booked, travel, cancelled = _ordinal(booking_date), _ordinal(travel_date), _ordinal(cancellation_date)
+    return _quote(store.policy(airline, fare_class, booking_date), amount, passengers, travel - cancelled,
+                  cancelled - booked, travel - booked, loyalty_status)
+
+
+def quote_refunds(store: FareRuleStore, airlines: Sequence[str], fare_classes: Sequence[str],
+                  amounts: Sequence[float], passenger_counts: Sequence[int], booking_dates: Sequence[str],
+                  travel_dates: Sequence[str], cancellation_dates: Sequence[str],
+                  loyalty_statuses: Optional[Sequence[Optional[str]]] = None) -> List[Dict]:
+    """quote_refund over columns of bookings, e.g. every booking affected by a schedule disruption"""
+    if loyalty_statuses is None:
+        loyalty_statuses = [None] * len(airlines)
+    columns = (airlines, fare_classes, amounts, passenger_counts, booking_dates, travel_dates, cancellation_dates,
+               loyalty_statuses)
+    if len({len(column) for column in columns}) > 1:
+        raise ValueError(f"All columns must have the same length, got {[len(column) for column in columns]}")
+    return [quote_refund(store, *row) for row in zip(*columns)]
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def shared_fare_rule_store() -> FareRuleStore:
+    """Process-wide store, loaded from FARE_RULES_PATH when it is set, else DEFAULT_POLICIES"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                path = os.environ.get("FARE_RULES_PATH")
+                _shared_store = FareRuleStore.load(path) if path else FareRuleStore(DEFAULT_POLICIES)
+    return _shared_store
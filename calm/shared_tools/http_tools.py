@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import inspect
+import os
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import httpx
+
+from .booking import TravelTools
+
+# Which service answers each TravelTools method
+BACKEND_TOOLS = {
+    "flights": ["search_flights", "create_flight_booking", "search_flights_many"],
+    "documents": ["get_visa_requirements", "check_minimum_age", "get_country_entry_requirements",
+                  "validate_passport_format", "check_passport_expiry_status", "get_visa_requirements_many",
+                  "validate_passport_format_many", "check_passport_expiry_status_many", "validate_passenger_manifest"],
+    "hotels": ["search_hotels"],
+    "payments": ["validate_credit_card", "authorize_payment", "process_refund"],
+    "bookings": ["validate_booking_reference", "validate_passenger_name", "get_booking_details",
+                 "generate_cancellation_confirmation", "send_cancellation_email"],
+    "fares": ["get_fare_rules", "calculate_cancellation_fee", "calculate_cancellation_fee_many"],
+    "loyalty": ["check_loyalty_status", "apply_loyalty_discount", "calculate_points_refund",
+                "check_loyalty_status_many"],
+}
+TOOL_BACKENDS = {tool: backend for backend, tools in BACKEND_TOOLS.items() for tool in tools}
+
+
+class BackendConfig(NamedTuple):
+    base_url: str
+    # Requests in flight to the backend at once, also the size of its connection pool. httpcore
+    # scans the whole pool for every request, larger pools get slower rather than faster
+    # (see benchmarks/action_server_load.py).
+    max_concurrency: int = 10
+
+
+class HttpTravelTools:
+    """Async TravelTools client for travel services reached over HTTP.
+
+    Every TravelTools method becomes a coroutine function with the same signature which POSTs its
+    arguments as a JSON object to `<backend base_url>/<method name>` and returns the decoded JSON
+    reply. Each backend gets its own keep-alive connection pool, sized to its `max_concurrency`,
+    and a semaphore so that a slow service queues its own callers without starving the others.
+
+    Create one instance per process (see shared_async_travel_tools) and reuse it, a client per
+    action or per request would reopen connections on every call.
+    """
+
+    def __init__(self, backends: Dict[str, BackendConfig], timeout: float = 10.0, keepalive_expiry: float = 30.0):
+        missing = sorted(set(BACKEND_TOOLS) - set(backends))
+        if missing:
+            raise ValueError(f"No configuration for backends: {', '.join(missing)}")
+        self.backends = backends
+        self._clients = {
+            name: httpx.AsyncClient(
+                base_url=config.base_url,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=config.max_concurrency,
+                                    max_keepalive_connections=config.max_concurrency,
+                                    keepalive_expiry=keepalive_expiry),
+            ) for name, config in backends.items()
+        }
+        self._limiters = {name: asyncio.Semaphore(config.max_concurrency) for name, config in backends.items()}
+        self.request_counts = {name: 0 for name in backends}
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_") or name not in TOOL_BACKENDS:
+            raise AttributeError(name)
+        backend = TOOL_BACKENDS[name]
+        signature = inspect.signature(getattr(TravelTools, name))
+
+        @functools.wraps(getattr(TravelTools, name))
+        async def call(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            async with self._limiters[backend]:
+                self.request_counts[backend] += 1
+                response = await self._clients[backend].post(f"/{name}", json=arguments)
+            response.raise_for_status()
+            return response.json()
+
+        # Cache the wrapper so the next lookup skips __getattr__
+        setattr(self, name, call)
+        return call
+
+    async def aclose(self):
+        await asyncio.gather(*(client.aclose() for client in self._clients.values()))
+
+
+def backends_from_env(environ=None) -> Optional[Dict[str, BackendConfig]]:
+    """Backend configuration from TRAVEL_BACKEND_URL, overridden per backend by
+    TRAVEL_<BACKEND>_URL and TRAVEL_<BACKEND>_CONCURRENCY. None when no URL is set."""
+    environ = os.environ if environ is None else environ
+    default_url = environ.get("TRAVEL_BACKEND_URL")
+    backends = {}
+    for name in BACKEND_TOOLS:
+        base_url = environ.get(f"TRAVEL_{name.upper()}_URL", default_url)
+        if base_url is None:
+            continue
+        config = BackendConfig(base_url.rstrip("/"))
+        concurrency = environ.get(f"TRAVEL_{name.upper()}_CONCURRENCY")
+        if concurrency:
+            config = config._replace(max_concurrency=int(concurrency))
+        backends[name] = config
+    if not backends:
+        return None
+    return backends
+
+
+_shared_async_tools = None
+
+
+def shared_async_travel_tools():
+    """Process-wide async TravelTools client for the custom actions.
+
+    Talks to the HTTP backends configured in the environment (see backends_from_env), and falls
+    back to the in-memory mocks, through the shared result cache, when none are configured.
+    """
+    global _shared_async_tools
+    if _shared_async_tools is None:
+        backends = backends_from_env()
+        if backends is not None:
+            _shared_async_tools = HttpTravelTools(backends)
+        else:
+            from .async_booking import AsyncTravelTools
+            from .cache import shared_travel_tools
+            _shared_async_tools = AsyncTravelTools(shared_travel_tools())
+    return _shared_async_tools
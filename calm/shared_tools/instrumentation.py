@@ -0,0 +1,300 @@
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Every public TravelTools method is wrapped by instrument_tools(). Once instrumentation is configured,
+# each call is timed and handed to the sinks as an event {"tool", "time", "duration_ms", "error",
+# "argument_bytes", "result_bytes"}: InMemoryMetrics aggregates call and error counts, a latency
+# histogram and sizes per tool, JsonlMetricsSink appends one line per call and PrometheusTextfileSink
+# keeps a Prometheus text exposition file up to date. What the tools do is logged at DEBUG on the
+# "travel_tools" logger for `debug_sample_rate` of the calls. Unconfigured, the default, a call costs
+# one global lookup on top of the tool and debug() returns straight away.
+logger = logging.getLogger("travel_tools")
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_debug_call: contextvars.ContextVar = contextvars.ContextVar("travel_tools_debug", default=False)
+
+
+def debug(message: str, *args):
+    """Log a TravelTools debug line, formatted lazily, if the current call is sampled for it"""
+    if _debug_call.get():
+        logger.debug(message, *args)
+
+
+def _json_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class Instrumentation:
+    def __init__(self, sinks: Sequence, debug_sample_rate: float = 0.0):
+        self.sinks = list(sinks)
+        self.debug_sample_rate = debug_sample_rate
+        # Sizes cost a JSON encoding of arguments and result, only pay for it if a sink wants them
+        self.measure_sizes = any(getattr(sink, "wants_sizes", True) for sink in self.sinks)
+
+    def call(self, tool_name: str, tool_func: Callable[..., Any], args, kwargs) -> Any:
+        token = None
+        if self.debug_sample_rate and random.random() < self.debug_sample_rate:
+            token = _debug_call.set(True)
+        error = None
+        start = time.perf_counter()
+        try:
+            result = tool_func(*args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            result = None
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            if token is not None:
+                _debug_call.reset(token)
+            event = {"tool": tool_name, "time": time.time(), "duration_ms": duration * 1000, "error": error,
+                     "argument_bytes": None, "result_bytes": None}
+            if self.measure_sizes:
+                event["argument_bytes"] = _json_size([args, kwargs] if kwargs else args)
+                event["result_bytes"] = _json_size(result) if error is None else 0
+            for sink in self.sinks:
+                # Metrics are best effort, a broken sink never fails the tool call
+                try:
+                    sink.record(event)
+                except Exception:
+                    logger.warning("Metrics sink %s failed to record a %s call", type(sink).__name__, tool_name,
+                                   exc_info=True)
+        return result
+
+
+_instrumentation: Optional[Instrumentation] = None
+
+
+def configure_instrumentation(*sinks, debug_sample_rate: float = 0.0):
+    """Send every TravelTools call to `sinks` and debug log `debug_sample_rate` of them"""
+    global _instrumentation
+    if not 0 <= debug_sample_rate <= 1:
+        raise ValueError(f"debug_sample_rate must be between 0 and 1, got {debug_sample_rate}")
+    _instrumentation = Instrumentation(sinks, debug_sample_rate) if sinks or debug_sample_rate else None
+
+
+def disable_instrumentation():
+    global _instrumentation
+    _instrumentation = None
+
+
+def instrumented(tool_name: str, tool_func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(tool_func)
+    def wrapper(*args, **kwargs):
+        instrumentation = _instrumentation
+        if instrumentation is None:
+            return tool_func(*args, **kwargs)
+        return instrumentation.call(tool_name, tool_func, args, kwargs)
+
+    return wrapper
+
+
+def instrument_tools(cls):
+    """Class decorator wrapping every public static method of a tools class with instrumented()"""
+    for name, attribute in list(vars(cls).items()):
+        if not name.startswith("_") and isinstance(attribute, staticmethod):
+            setattr(cls, name, staticmethod(instrumented(name, attribute.__func__)))
+    return cls
+
+
+class _ToolMetrics:
+    __slots__ = ("calls", "errors", "duration_sum", "buckets", "argument_bytes", "result_bytes",
+                 "max_argument_bytes", "max_result_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.duration_sum = 0.0
+        # One count per bucket of LATENCY_BUCKETS, then the calls slower than the last bound
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.argument_bytes = 0
+        self.result_bytes = 0
+        self.max_argument_bytes = 0
+        self.max_result_bytes = 0
+
+
+class InMemoryMetrics:
+    """Aggregates the call events per tool"""
+
+    def __init__(self, measure_sizes: bool = True):
+        self.wants_sizes = measure_sizes
+        self._tools: Dict[str, _ToolMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: Dict[str, Any]):
+        duration = event["duration_ms"] / 1000
+        with self._lock:
+            metrics = self._tools.get(event["tool"])
+            if metrics is None:
+                metrics = self._tools[event["tool"]] = _ToolMetrics()
+            metrics.calls += 1
+            if event["error"] is not None:
+                metrics.errors += 1
+            metrics.duration_sum += duration
+            metrics.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+            if event["argument_bytes"] is not None:
+                metrics.argument_bytes += event["argument_bytes"]
+                metrics.result_bytes += event["result_bytes"]
+                metrics.max_argument_bytes = max(metrics.max_argument_bytes, event["argument_bytes"])
+                metrics.max_result_bytes = max(metrics.max_result_bytes, event["result_bytes"])
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters per tool, the histogram as {bucket upper bound: calls in that bucket}"""
+        with self._lock:
+            return {
+                tool_name: {
+                    "calls": metrics.calls,
+                    "errors": metrics.errors,
+                    "duration_ms_sum": metrics.duration_sum * 1000,
+                    "latency_histogram": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], metrics.buckets)),
+                    "argument_bytes": metrics.argument_bytes,
+                    "result_bytes": metrics.result_bytes,
+                    "max_argument_bytes": metrics.max_argument_bytes,
+                    "max_result_bytes": metrics.max_result_bytes,
+                }
+                for tool_name, metrics in sorted(self._tools.items())
+            }
+
+    def percentile_ms(self, tool_name: str, fraction: float) -> Optional[float]:
+        """Upper bound of the histogram bucket holding the given percentile, None past the last bound"""
+        with self._lock:
+            metrics = self._tools.get(tool_name)
+            if metrics is None or metrics.calls == 0:
+                return None
+            rank = fraction * metrics.calls
+            seen = 0
+            for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                seen += count
+                if seen >= rank:
+                    return bound * 1000
+            return None
+
+    def prometheus_text(self) -> str:
+        """The metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP travel_tools_calls_total TravelTools calls.",
+            "# TYPE travel_tools_calls_total counter",
+        ]
+        snapshot_tools = self._copy()
+        lines += [f'travel_tools_calls_total{{tool="{tool}"}} {metrics.calls}' for tool, metrics in snapshot_tools]
+        lines += ["# HELP travel_tools_errors_total TravelTools calls that raised.",
+                  "# TYPE travel_tools_errors_total counter"]
+        lines += [f'travel_tools_errors_total{{tool="{tool}"}} {metrics.errors}' for tool, metrics in snapshot_tools]
+        lines += ["# HELP travel_tools_call_duration_seconds TravelTools call latency.",
+                  "# TYPE travel_tools_call_duration_seconds histogram"]
+        for tool, metrics in snapshot_tools:
+            cumulative = 0
+            for bound, count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], metrics.buckets):
+                cumulative += count
+                lines.append(f'travel_tools_call_duration_seconds_bucket{{tool="{tool}",le="{bound}"}} {cumulative}')
+            lines.append(f'travel_tools_call_duration_seconds_sum{{tool="{tool}"}} {metrics.duration_sum}')
+            lines.append(f'travel_tools_call_duration_seconds_count{{tool="{tool}"}} {metrics.calls}')
+        for name, attribute, help_text in (("argument", "argument_bytes", "JSON size of the arguments"),
+                                           ("result", "result_bytes", "JSON size of the results")):
+            lines += [f"# HELP travel_tools_{name}_bytes_total {help_text}.",
+                      f"# TYPE travel_tools_{name}_bytes_total counter"]
+            lines += [f'travel_tools_{name}_bytes_total{{tool="{tool}"}} {getattr(metrics, attribute)}'
+                      for tool, metrics in snapshot_tools]
+        return "\n".join(lines) + "\n"
+
+    def _copy(self) -> List:
+        with self._lock:
+            copies = []
+            for tool_name, metrics in sorted(self._tools.items()):
+                copy = _ToolMetrics()
+                for slot in _ToolMetrics.__slots__:
+                    value = getattr(metrics, slot)
+                    setattr(copy, slot, list(value) if isinstance(value, list) else value)
+                copies.append((tool_name, copy))
+            return copies
+
+    def clear(self):
+        with self._lock:
+            self._tools.clear()
+
+
+class PrometheusTextfileSink(InMemoryMetrics):
+    """InMemoryMetrics that rewrites `path` with prometheus_text(), at most every `interval` seconds"""
+
+    def __init__(self, path: str, interval: float = 10.0, measure_sizes: bool = True):
+        super().__init__(measure_sizes)
+        self.path = path
+        self.interval = interval
+        self._next_write = 0.0
+
+    def record(self, event: Dict[str, Any]):
+        super().record(event)
+        now = time.monotonic()
+        with self._lock:
+            due = now >= self._next_write
+            if due:
+                self._next_write = now + self.interval
+        if due:
+            self.write()
+
+    def write(self):
+        # A temporary file of its own per write, concurrent writers never replace each other's file
+        descriptor, temporary_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".",
+                                                      dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                file.write(self.prometheus_text())
+            # Scrapers never read a half written file
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+
+class JsonlMetricsSink:
+    """Appends one JSON line per call event to a local file"""
+
+    def __init__(self, path: str, measure_sizes: bool = True):
+        self.path = path
+        self.wants_sizes = measure_sizes
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, event: Dict[str, Any]):
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def configure_from_env():
+    """Sinks from TRAVEL_TOOLS_METRICS_JSONL and TRAVEL_TOOLS_METRICS_PROMETHEUS, sampling from
+    TRAVEL_TOOLS_DEBUG_SAMPLE_RATE"""
+    sinks = []
+    if os.environ.get("TRAVEL_TOOLS_METRICS_JSONL"):
+        sinks.append(JsonlMetricsSink(os.environ["TRAVEL_TOOLS_METRICS_JSONL"]))
+    if os.environ.get("TRAVEL_TOOLS_METRICS_PROMETHEUS"):
+        sinks.append(PrometheusTextfileSink(os.environ["TRAVEL_TOOLS_METRICS_PROMETHEUS"]))
+    debug_sample_rate = float(os.environ.get("TRAVEL_TOOLS_DEBUG_SAMPLE_RATE", 0))
+    if sinks or debug_sample_rate:
+        configure_instrumentation(*sinks, debug_sample_rate=debug_sample_rate)
+
+
+configure_from_env()
@@ -0,0 +1,278 @@
+import array
+import bisect
+import datetime
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .dates import parse_date
+
+# Inventory file layout: MAGIC, the length of a JSON header as a little endian uint32, the header,
+# then one block per column, 8 byte aligned. Rows are sorted by (origin, destination, date,
+# price), so the flights of one route and day are a contiguous run, cheapest first. The index
+# columns hold every distinct (origin, destination, date) key, sorted, and the row where its run
+# starts; a lookup is a binary search over the memory-mapped keys, nothing is loaded upfront.
+MAGIC = b"FLTINV01"
+ROW_COLUMNS = [
+    ("price_cents", "I"),
+    ("departure", "H"),      # minutes after midnight
+    ("duration", "H"),       # minutes
+    ("seats", "H"),
+    ("airline", "B"),        # index into the header's airlines
+    ("fare_class", "B"),     # index into the header's fare classes
+    ("flight_number", "H"),
+]
+EPOCH = datetime.date(1970, 1, 1)
+
+# City names as they show up in slots and LLM tool arguments, mapped to the codes of the inventory
+CITY_CODES = {
+    "new york": "NYC",
+    "paris": "PAR",
+    "london": "LON",
+    "berlin": "BER",
+    "new delhi": "DEL",
+    "delhi": "DEL",
+    "mumbai": "BOM",
+    "frankfurt": "FRA",
+    "rome": "ROM",
+    "madrid": "MAD",
+    "amsterdam": "AMS",
+    "dubai": "DXB",
+    "singapore": "SIN",
+    "tokyo": "TYO",
+    "los angeles": "LAX",
+    "san francisco": "SFO",
+    "chicago": "CHI",
+}
+
+
+def normalize_city(city: str) -> str:
+    """Inventory code of a city name or code, e.g. "New York", "new york " and "nyc" all become "NYC"."""
+    city = city.strip()
+    return CITY_CODES.get(city.casefold(), city.upper())
+
+
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _route_key(origin_id: int, destination_id: int, day: int) -> int:
+    return origin_id << 32 | destination_id << 16 | day
+
+
+class FlightInventory:
+    """Read-only flight legs from an inventory file, memory-mapped.
+
+    search() returns flights in the shape of TravelTools.search_flights, cheapest first.
+    Lookups cost a binary search over the route keys plus a scan of that route's flights of the
+    day, so they stay well under a millisecond with millions of legs loaded.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a flight inventory file")
+        header_length, = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_length])
+        if header["byteorder"] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']} endian machine")
+
+        self.path = path
+        self.airports: List[str] = header["airports"]
+        self.airlines: List[Tuple[str, str]] = [tuple(airline) for airline in header["airlines"]]
+        self.fare_classes: List[str] = header["fare_classes"]
+        self._airport_ids = {code: index for index, code in enumerate(self.airports)}
+        self._view = memoryview(self._mmap)
+        self._columns = {name: self._view[offset:offset + length].cast(typecode)
+                         for name, (typecode, offset, length) in header["columns"].items()}
+
+    def __len__(self) -> int:
+        return len(self._columns["price_cents"])
+
+    @property
+    def route_count(self) -> int:
+        """Number of distinct (origin, destination, date) keys"""
+        return len(self._columns["keys"])
+
+    def close(self):
+        for column in self._columns.values():
+            column.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _rows(self, origin: str, destination: str, day: datetime.date) -> range:
+        origin_id = self._airport_ids.get(normalize_city(origin))
+        destination_id = self._airport_ids.get(normalize_city(destination))
+        if origin_id is None or destination_id is None:
+            return range(0)
+        keys = self._columns["keys"]
+        key = _route_key(origin_id, destination_id, (day - EPOCH).days)
+        position = bisect.bisect_left(keys, key)
+        if position == len(keys) or keys[position] != key:
+            return range(0)
+        starts = self._columns["starts"]
+        end = starts[position + 1] if position + 1 < len(starts) else len(self)
+        return range(starts[position], end)
+
+    def iter_search(self, origin: str, destination: str, date: str, passengers: int = 1,
+                    max_price: Optional[float] = None, departure_after: Optional[str] = None,
+                    departure_before: Optional[str] = None) -> Iterator[Dict]:
+        """Flights of a route and day with enough free seats, cheapest first, one at a time.
+
+        max_price: in the inventory's currency
+        departure_after, departure_before: "HH:MM", inclusive
+        """
+        day = parse_date(date)
+        max_cents = None if max_price is None else round(max_price * 100)
+        earliest = _parse_time(departure_after)
+        latest = _parse_time(departure_before)
+        columns = self._columns
+        prices, departures, seats = columns["price_cents"], columns["departure"], columns["seats"]
+        for row in self._rows(origin, destination, day):
+            if max_cents is not None and prices[row] > max_cents:
+                # Rows are sorted by price, nothing after this one is cheap enough either
+                return
+            departure = departures[row]
+            if (seats[row] < passengers or (earliest is not None and departure < earliest)
+                    or (latest is not None and departure > latest)):
+                continue
+            yield self._flight(row, day)
+
+    def search(self, origin: str, destination: str, date: str, passengers: int = 1,
+               max_price: Optional[float] = None, departure_after: Optional[str] = None,
+               departure_before: Optional[str] = None, top_k: Optional[int] = None) -> List[Dict]:
+        """The `top_k` cheapest flights matching the filters, see iter_search"""
+        return list(islice(self.iter_search(origin, destination, date, passengers, max_price,
+                                            departure_after, departure_before), top_k))
+
+    def _flight(self, row: int, day: datetime.date) -> Dict:
+        columns = self._columns
+        departure = columns["departure"][row]
+        days_later, arrival = divmod(departure + columns["duration"][row], 24 * 60)
+        airline_code, airline_name = self.airlines[columns["airline"][row]]
+        return {
+            "flight_id": f"{airline_code}{columns['flight_number'][row]}",
+            "airline": airline_name,
+            "departure": f"{day.isoformat()} {departure // 60:02d}:{departure % 60:02d}",
+            "arrival": f"{day.isoformat()} {arrival // 60:02d}:{arrival % 60:02d}"
+                       + (f"+{days_later}" if days_later else ""),
+            "price": columns["price_cents"][row] / 100,
+            "seats_available": columns["seats"][row],
+            "fare_class": self.fare_classes[columns["fare_class"][row]],
+        }
+
+
+def write_inventory(path: str, airports: Sequence[str], airlines: Sequence[Tuple[str, str]],
+                    fare_classes: Sequence[str], columns: Dict[str, array.array], keys: array.array,
+                    starts: array.array):
+    """Write an inventory file from row columns (see ROW_COLUMNS) already sorted by route key and
+    price, and the route index (sorted keys and the first row of each)"""
+    blocks = [(name, columns[name]) for name, _ in ROW_COLUMNS] + [("keys", keys), ("starts", starts)]
+    header = {"byteorder": sys.byteorder, "airports": list(airports), "airlines": [list(a) for a in airlines],
+              "fare_classes": list(fare_classes), "columns": {}}
+
+    # The block offsets depend on the header length, which depends on the offsets: lay out the
+    # blocks after a header padded to a fixed size
+    header_size = len(json.dumps(header)) + 64 * len(blocks) + 64
+    offset = len(MAGIC) + 4 + header_size
+    for name, column in blocks:
+        offset += -offset % 8
+        header["columns"][name] = [column.typecode, offset, len(column) * column.itemsize]
+        offset += len(column) * column.itemsize
+    header_bytes = json.dumps(header).encode().ljust(header_size)
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(MAGIC + struct.pack("<I", header_size) + header_bytes)
+        for name, column in blocks:
+            file.write(b"\0" * (-file.tell() % 8))
+            column.tofile(file)
+    # Readers never see a half written file
+    os.replace(temporary_path, path)
+
+
+DEFAULT_AIRPORTS = ["NYC", "PAR", "LON", "BER", "DEL", "BOM", "FRA", "ROM", "MAD", "AMS", "DXB", "SIN", "TYO",
+                    "LAX", "SFO", "CHI", "MIA", "YTO", "SYD", "HKG", "IST", "DOH", "ZRH", "VIE", "CPH", "OSL",
+                    "STO", "HEL", "LIS", "BCN", "MIL", "ATH", "PRG", "WAW", "BUD", "DUB", "MEX", "SAO", "BUE",
+                    "JNB", "CAI", "BKK", "KUL", "SEL", "PEK", "SHA", "BLR", "MEL", "AKL", "BOS"]
+DEFAULT_AIRLINES = [("AA", "American Airlines"), ("DL", "Delta"), ("UA", "United Airlines"), ("AF", "Air France"),
+                    ("LH", "Lufthansa"), ("BA", "British Airways"), ("AI", "Air India"), ("EK", "Emirates")]
+DEFAULT_FARE_CLASSES = ["Economy", "Premium Economy", "Business", "First"]
+
+
+def generate_inventory(path: str, start_date: str = "2025-08-01", days: int = 365, route_share: float = 0.5,
+                       legs_per_day: int = 4, airports: Sequence[str] = DEFAULT_AIRPORTS, hubs: int = 8,
+                       seed: int = 0) -> int:
+    """Write a synthetic inventory file and return its number of flight legs.
+
+    route_share: share of the airport pairs with scheduled flights, the first `hubs` airports
+        (the demo cities with DEFAULT_AIRPORTS) are all connected to each other
+    legs_per_day: average number of flights per route and day
+    """
+    rng = random.Random(seed)
+    first_day = (parse_date(start_date) - EPOCH).days
+    columns = {name: array.array(typecode) for name, typecode in ROW_COLUMNS}
+    keys, starts = array.array("Q"), array.array("I")
+    appenders = [columns[name].append for name, _ in ROW_COLUMNS]
+    rows = 0
+    for origin_id in range(len(airports)):
+        for destination_id in range(len(airports)):
+            if origin_id == destination_id:
+                continue
+            if rng.random() >= route_share and max(origin_id, destination_id) >= hubs:
+                continue
+            duration = rng.randrange(60, 16 * 60, 5)
+            base_price = 50 + duration // 3
+            airlines = rng.sample(range(len(DEFAULT_AIRLINES)), 3)
+            for day in range(first_day, first_day + days):
+                legs = []
+                for _ in range(rng.randint(1, 2 * legs_per_day - 1)):
+                    fare_class = rng.choices(range(len(DEFAULT_FARE_CLASSES)), weights=(70, 15, 12, 3))[0]
+                    price = round(base_price * (1 + fare_class * 1.5) * rng.uniform(0.7, 1.6), 2)
+                    legs.append((int(price * 100), rng.randrange(0, 24 * 60, 5), duration + rng.randrange(0, 45, 5),
+                                 rng.randint(0, 180), rng.choice(airlines), fare_class, rng.randint(100, 9999)))
+                legs.sort()
+                keys.append(_route_key(origin_id, destination_id, day))
+                starts.append(rows)
+                for leg in legs:
+                    for append, value in zip(appenders, leg):
+                        append(value)
+                rows += len(legs)
+    write_inventory(path, airports, DEFAULT_AIRLINES, DEFAULT_FARE_CLASSES, columns, keys, starts)
+    return rows
+
+
+_shared_inventory = None
+_shared_inventory_lock = threading.Lock()
+
+
+def shared_flight_inventory() -> Optional[FlightInventory]:
+    """Process-wide inventory from the file at FLIGHT_INVENTORY_PATH, None when it isn't set"""
+    global _shared_inventory
+    path = os.environ.get("FLIGHT_INVENTORY_PATH")
+    if path is None:
+        return None
+    if _shared_inventory is None or _shared_inventory.path != path:
+        with _shared_inventory_lock:
+            if _shared_inventory is None or _shared_inventory.path != path:
+                _shared_inventory = FlightInventory(path)
+    return _shared_inventory
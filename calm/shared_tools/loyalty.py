@@ -0,0 +1,243 @@
+import array
+import bisect
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Loyalty index file layout: MAGIC, the length of a JSON header as a little endian uint32, the
+# header, then two 8 byte aligned columns: the members' keys as sorted uint64 and their tiers as
+# uint8 indexes into the header's tier names. A lookup is a binary search over the memory-mapped
+# keys, 9 bytes per member on disk and nothing loaded upfront.
+MAGIC = b"LOYIDX01"
+# Member ids are up to 12 characters of 0-9 and A-Z, read as base 37 digits (0 pads), which fits in 64 bits
+MEMBER_ID_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_MEMBER_ID_LENGTH = 12
+_DIGITS = {character: value + 1 for value, character in enumerate(MEMBER_ID_ALPHABET)}
+DEFAULT_TIERS = ["Silver", "Gold", "Platinum"]
+
+
+def member_key(member_id: Optional[str]) -> Optional[int]:
+    """Index key of a member id, ignoring case and surrounding whitespace. None for ids that can't be members,
+    including the None of bookings without a member"""
+    if member_id is None:
+        return None
+    member_id = member_id.strip().upper()
+    if not member_id or len(member_id) > MAX_MEMBER_ID_LENGTH:
+        return None
+    key = 0
+    for character in member_id:
+        digit = _DIGITS.get(character)
+        if digit is None:
+            return None
+        key = key * 37 + digit
+    return key
+
+
+class LoyaltyIndex:
+    """Read-only loyalty tiers from an index file, memory-mapped.
+
+    The file is never modified in place: a refreshed member file replaces it (see
+    write_loyalty_index), and a LoyaltyIndex keeps reading the version it opened. Use
+    ReloadingLoyaltyIndex to pick up new versions.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(file.fileno())
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a loyalty index file")
+        header_length, = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_length])
+        if header["byteorder"] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']} endian machine")
+
+        self.path = path
+        # Identifies the file version, see ReloadingLoyaltyIndex
+        self.version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self.tiers: List[str] = header["tiers"]
+        self._view = memoryview(self._mmap)
+        self._columns = {name: self._view[offset:offset + length].cast(typecode)
+                         for name, (typecode, offset, length) in header["columns"].items()}
+
+    def __len__(self) -> int:
+        return len(self._columns["keys"])
+
+    def close(self):
+        for column in self._columns.values():
+            column.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def tier(self, member_id: Optional[str]) -> Optional[str]:
+        """Tier of the member, None if there is no such member"""
+        key = member_key(member_id)
+        if key is None:
+            return None
+        keys = self._columns["keys"]
+        position = bisect.bisect_left(keys, key)
+        if position == len(keys) or keys[position] != key:
+            return None
+        return self.tiers[self._columns["tiers"][position]]
+
+    def tiers_many(self, member_ids: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """tier() of every member id, in input order.
+
+        The ids are looked up in key order, so each binary search starts where the previous one
+        ended and consecutive searches touch the same pages.
+        """
+        keys, tiers = self._columns["keys"], self._columns["tiers"]
+        lookup_keys = [member_key(member_id) for member_id in member_ids]
+        results: List[Optional[str]] = [None] * len(member_ids)
+        position = 0
+        for index in sorted((index for index, key in enumerate(lookup_keys) if key is not None),
+                            key=lookup_keys.__getitem__):
+            key = lookup_keys[index]
+            position = bisect.bisect_left(keys, key, position)
+            if position < len(keys) and keys[position] == key:
+                results[index] = self.tiers[tiers[position]]
+        return results
+
+
+class ReloadingLoyaltyIndex:
+    """LoyaltyIndex that switches to the new version of its file once the file is replaced.
+
+    At most every `check_interval` seconds a lookup stats the file; when it changed, the new
+    version is opened and swapped in with a single assignment. Lookups running against the old
+    version finish on it, its mapping is released once nothing references it any more.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._index = LoyaltyIndex(path)
+        self._next_check = time.monotonic() + check_interval
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def current(self) -> LoyaltyIndex:
+        now = time.monotonic()
+        if now >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._next_check = now + self.check_interval
+                self.reload()
+            finally:
+                self._lock.release()
+        return self._index
+
+    def reload(self) -> bool:
+        """Open the file again if it was replaced, whether it was"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._index.version:
+            return False
+        self._index = LoyaltyIndex(self.path)
+        self.reloads += 1
+        return True
+
+    def __len__(self) -> int:
+        return len(self.current())
+
+    def tier(self, member_id: Optional[str]) -> Optional[str]:
+        return self.current().tier(member_id)
+
+    def tiers_many(self, member_ids: Sequence[Optional[str]]) -> List[Optional[str]]:
+        return self.current().tiers_many(member_ids)
+
+
+def write_loyalty_index(path: str, members: Iterable[Tuple[str, str]], tiers: Sequence[str] = DEFAULT_TIERS):
+    """Write (member_id, tier) pairs to a new index file, replacing `path` atomically.
+
+    Ids that can't be members (see member_key) are rejected, a member listed twice keeps its
+    last tier.
+    """
+    tier_ids = {tier: index for index, tier in enumerate(tiers)}
+    by_key = {}
+    for member_id, tier in members:
+        key = member_key(member_id)
+        if key is None:
+            raise ValueError(f"Invalid member id {member_id!r}")
+        if tier not in tier_ids:
+            raise ValueError(f"Unknown tier {tier!r} for member {member_id}, expected one of {list(tiers)}")
+        by_key[key] = tier_ids[tier]
+    ordered = sorted(by_key)
+    _write_columns(path, tiers, array.array("Q", ordered), array.array("B", (by_key[key] for key in ordered)))
+
+
+def _write_columns(path: str, tiers: Sequence[str], keys: array.array, tier_column: array.array):
+    header = {"byteorder": sys.byteorder, "tiers": list(tiers), "columns": {}}
+    header_size = len(json.dumps(header)) + 128
+    offset = len(MAGIC) + 4 + header_size
+    for name, column in (("keys", keys), ("tiers", tier_column)):
+        offset += -offset % 8
+        header["columns"][name] = [column.typecode, offset, len(column) * column.itemsize]
+        offset += len(column) * column.itemsize
+    header_bytes = json.dumps(header).encode().ljust(header_size)
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(MAGIC + struct.pack("<I", header_size) + header_bytes)
+        for column in (keys, tier_column):
+            file.write(b"\0" * (-file.tell() % 8))
+            column.tofile(file)
+    # Readers never see a half written file, and those that mapped the old one keep it
+    os.replace(temporary_path, path)
+
+
+# The members the demos use, see TravelTools.check_loyalty_status
+DEMO_MEMBERS = [("AXQW123456", "Platinum"), ("PLT789012", "Platinum"), ("PLT345678", "Platinum")]
+
+
+def generate_loyalty_index(path: str, members: int, tier_weights: Sequence[float] = (60, 30, 10),
+                           seed: int = 0) -> int:
+    """Write an index of DEMO_MEMBERS plus `members` synthetic ones (LY followed by 10 digits,
+    randomly spaced) and return its number of members"""
+    rng = random.Random(seed)
+    keys, tier_column = array.array("Q"), array.array("B")
+    number = 0
+    for tier in rng.choices(range(len(DEFAULT_TIERS)), weights=tier_weights, k=members):
+        number += rng.randint(1, 9)
+        # Same length ids, so increasing numbers give increasing keys
+        keys.append(member_key(f"LY{number:010d}"))
+        tier_column.append(tier)
+    for member_id, tier in DEMO_MEMBERS:
+        key = member_key(member_id)
+        position = bisect.bisect_left(keys, key)
+        keys.insert(position, key)
+        tier_column.insert(position, DEFAULT_TIERS.index(tier))
+    _write_columns(path, DEFAULT_TIERS, keys, tier_column)
+    return len(keys)
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def shared_loyalty_index() -> Optional[ReloadingLoyaltyIndex]:
+    """Process-wide index of the file at LOYALTY_INDEX_PATH, None when it isn't set"""
+    global _shared_index
+    path = os.environ.get("LOYALTY_INDEX_PATH")
+    if path is None:
+        return None
+    if _shared_index is None or _shared_index.path != path:
+        with _shared_index_lock:
+            if _shared_index is None or _shared_index.path != path:
+                _shared_index = ReloadingLoyaltyIndex(path)
+    return _shared_index
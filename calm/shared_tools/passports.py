@@ -0,0 +1,234 @@
+import datetime
+import json
+import operator
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence
+
+from .countries import MRZ_COUNTRY_CODES, normalize_country
+from .dates import parse_date
+
+
+class PassportRule(NamedTuple):
+    """Passport rules of one country (code as returned by normalize_country).
+
+    number_patterns: regexes a passport number issued by the country matches in full, any of them;
+        {country} stands for the country code
+    entry_validity_months: months a passport must still be valid on arrival in the country
+    """
+    country: str
+    number_patterns: List[str]
+    entry_validity_months: int
+
+
+# The country code followed by digits, the format of the passport numbers in the demos
+DEMO_NUMBER_PATTERN = "{country}[0-9]{6,10}"
+DEFAULT_RULE = PassportRule("*", ["[A-Z0-9]{6,9}"], 6)
+DEFAULT_PASSPORT_RULES = [
+    PassportRule("US", ["[0-9]{9}", "[A-Z][0-9]{8}", DEMO_NUMBER_PATTERN], 6),
+    PassportRule("IN", ["[A-Z][0-9]{7}", DEMO_NUMBER_PATTERN], 6),
+    PassportRule("DE", ["[CFGHJKLMNPRTVWXYZ][CFGHJKLMNPRTVWXYZ0-9]{8}", DEMO_NUMBER_PATTERN], 3),
+    PassportRule("FR", ["[0-9]{2}[A-Z]{2}[0-9]{5}", DEMO_NUMBER_PATTERN], 3),
+    PassportRule("IT", ["[A-Z]{2}[0-9]{7}", DEMO_NUMBER_PATTERN], 3),
+    PassportRule("UK", ["[0-9]{9}", DEMO_NUMBER_PATTERN], 0),
+]
+
+# ICAO 9303 check digits: characters weighted 7, 3, 1, repeating, sum modulo 10
+_CHARACTER_VALUES = {**{str(digit): digit for digit in range(10)},
+                     **{chr(ord("A") + offset): 10 + offset for offset in range(26)}, "<": 0}
+MRZ_LINE_LENGTH = 44
+_WEIGHTS = (7, 3, 1) * (MRZ_LINE_LENGTH // 3 + 1)
+_MRZ_LINE = re.compile(f"[0-9A-Z<]{{{MRZ_LINE_LENGTH}}}")
+
+
+def check_digit(value: str) -> int:
+    return sum(map(operator.mul, map(_CHARACTER_VALUES.__getitem__, value), _WEIGHTS)) % 10
+
+
+def _mrz_date(value: str, future: bool) -> datetime.date:
+    # Two digit years: expiry dates are this century, birth dates not in the future
+    year = 2000 + int(value[:2])
+    if not future and year > datetime.date.today().year:
+        year -= 100
+    return datetime.date(year, int(value[2:4]), int(value[4:6]))
+
+
+def parse_mrz(mrz: str) -> Dict:
+    """Fields and check digit errors of the machine readable zone of a passport (TD3).
+
+    Takes the second MRZ line, or both lines; "errors" lists what failed, empty when the zone is
+    valid.
+    """
+    line = "".join(mrz.split()).upper()[-MRZ_LINE_LENGTH:]
+    if _MRZ_LINE.fullmatch(line) is None:
+        return {"errors": [f"not a {MRZ_LINE_LENGTH} character passport MRZ line"]}
+    errors = []
+    for name, value, digit in (("passport number", line[0:9], line[9]), ("birth date", line[13:19], line[19]),
+                               ("expiry date", line[21:27], line[27]), ("personal number", line[28:42], line[42]),
+                               ("composite", line[0:10] + line[13:20] + line[21:43], line[43])):
+        if digit == "<" and name == "personal number" and set(value) == {"<"}:
+            continue
+        if _CHARACTER_VALUES[digit] != check_digit(value):
+            errors.append(f"{name} check digit is wrong")
+    fields = {"passport_number": line[0:9].rstrip("<"),
+              "nationality": MRZ_COUNTRY_CODES.get(line[10:13].rstrip("<"), line[10:13].rstrip("<")),
+              "sex": line[20], "errors": errors}
+    for name, value, future in (("birth_date", line[13:19], False), ("expiry_date", line[21:27], True)):
+        try:
+            fields[name] = _mrz_date(value, future).isoformat()
+        except ValueError:
+            fields[name] = None
+            errors.append(f"{name.replace('_', ' ')} is not a date")
+    return fields
+
+
+def _months_between(start: datetime.date, end: datetime.date) -> int:
+    """Whole months from start to end, negative when end is earlier"""
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if months > 0 and end.day < start.day:
+        months -= 1
+    elif months < 0 and end.day > start.day:
+        months += 1
+    return months
+
+
+class PassportRules:
+    """Passport number formats and validity rules by country, with their regexes compiled once.
+
+    Destinations without a rule get DEFAULT_RULE's entry validity. Passport numbers are only
+    checked against the issuing country's own rule: a number without a country, or from a country
+    without a rule, is not valid. validate_manifest() checks a whole passenger list in one call,
+    resolving each country and date once however many passengers share them.
+    """
+
+    def __init__(self, rules: Iterable[PassportRule] = DEFAULT_PASSPORT_RULES,
+                 default_rule: PassportRule = DEFAULT_RULE):
+        self.rules = {rule.country: rule for rule in rules}
+        self.default_rule = default_rule
+        self._patterns: Dict[Optional[str], Optional[Pattern]] = {}
+
+    def rule(self, country: Optional[str]) -> PassportRule:
+        return self.rules.get(normalize_country(country), self.default_rule)
+
+    def _pattern(self, country: Optional[str]) -> Optional[Pattern]:
+        """Number formats of the issuing country, None when it is missing or has no rule"""
+        if country not in self._patterns:
+            rule = self.rules.get(normalize_country(country))
+            pattern = None
+            if rule is not None:
+                pattern = re.compile("|".join(f"(?:{number_pattern.replace('{country}', re.escape(rule.country))})"
+                                              for number_pattern in rule.number_patterns))
+            self._patterns[country] = pattern
+        return self._patterns[country]
+
+    def validate_number(self, passport_number: str, country: Optional[str]) -> bool:
+        """Whether the passport number has the format of the country's passports. False for a missing
+        country or one without a rule, whose numbers can't be checked"""
+        pattern = self._pattern(country)
+        return pattern is not None and pattern.fullmatch(passport_number.strip().upper()) is not None
+
+    def expiry_status(self, passport_number: str, travel_date: str, expiry_date: str,
+                      destination: Optional[str] = None) -> Dict:
+        """Whether the passport is valid on the travel date, and long enough for the destination"""
+        return self._expiry_status(passport_number, parse_date(travel_date), travel_date,
+                                   parse_date(expiry_date),
+                                   self.rule(destination).entry_validity_months)
+
+    @staticmethod
+    def _expiry_status(passport_number: str, travel_day: datetime.date, travel_date: str,
+                       expiry_day: datetime.date, required_months: int) -> Dict:
+        months_remaining = _months_between(travel_day, expiry_day)
+        valid = expiry_day > travel_day
+        return {
+            "passport_number": passport_number,
+            "valid": valid,
+            "expires": expiry_day.isoformat(),
+            "months_remaining": months_remaining,
+            "required_months": required_months,
+            "meets_requirements": valid and months_remaining >= required_months,
+            "travel_date": travel_date,
+        }
+
+    def validate_manifest(self, passengers: Sequence[Dict], travel_date: str,
+                          destination: Optional[str] = None) -> List[Dict]:
+        """Check every passenger of a manifest, results in input order.
+
+        A passenger is {"passport_number", "nationality", "expiry_date"} or {"mrz", ...}, the
+        fields read from the MRZ filling in the others. A passenger is "valid" when the number
+        matches the nationality's format, the MRZ (if given) passes its check digits and the
+        passport is valid long enough for the destination; "errors" says what failed, including
+        fields that can't be read, which never fail the rest of the manifest.
+        """
+        travel_day = parse_date(travel_date)
+        required_months = self.rule(destination).entry_validity_months
+        expiry_days: Dict[str, datetime.date] = {}
+        country_codes: Dict[Optional[str], Optional[str]] = {}
+        results = []
+        for passenger in passengers:
+            errors = []
+            if passenger.get("mrz"):
+                mrz = parse_mrz(passenger["mrz"])
+                errors += mrz["errors"]
+                passenger = {**mrz, **{key: value for key, value in passenger.items() if value is not None}}
+            passport_number = passenger.get("passport_number") or ""
+            if isinstance(passport_number, int) and not isinstance(passport_number, bool):
+                passport_number = str(passport_number)
+            elif not isinstance(passport_number, str):
+                errors.append("passport number not text")
+                passport_number = ""
+            nationality = passenger.get("nationality")
+            if nationality not in country_codes:
+                country_codes[nationality] = normalize_country(nationality)
+            country_code = country_codes[nationality]
+            pattern = self._pattern(nationality)
+            format_valid = pattern is not None and pattern.fullmatch(passport_number.strip().upper()) is not None
+            if not country_code:
+                errors.append("nationality unknown")
+            elif pattern is None:
+                errors.append(f"no passport rules for {country_code}")
+            elif not format_valid:
+                errors.append(f"passport number doesn't match the {country_code} format")
+            expiry_date = passenger.get("expiry_date")
+            expiry = None
+            expiry_day = None
+            if not expiry_date:
+                errors.append("expiry date unknown")
+            elif not isinstance(expiry_date, str):
+                errors.append("expiry date not a date")
+            else:
+                expiry_day = expiry_days.get(expiry_date)
+                if expiry_day is None:
+                    try:
+                        expiry_day = expiry_days[expiry_date] = parse_date(expiry_date)
+                    except ValueError:
+                        errors.append("expiry date not a date")
+            if expiry_day is not None:
+                expiry = self._expiry_status(passport_number, travel_day, travel_date, expiry_day, required_months)
+                if not expiry["meets_requirements"]:
+                    errors.append(f"passport expires {expiry['expires']}, {required_months} months of validity "
+                                  f"required on arrival")
+            results.append({"passport_number": passport_number, "nationality": country_code,
+                            "format_valid": format_valid, "expiry": expiry, "valid": not errors, "errors": errors})
+        return results
+
+    @classmethod
+    def load(cls, path: str) -> "PassportRules":
+        """Rules from a JSON list of {"country", "number_patterns", "entry_validity_months"}"""
+        with open(path, encoding="utf-8") as file:
+            return cls(PassportRule(**rule) for rule in json.load(file))
+
+
+_shared_rules = None
+_shared_rules_lock = threading.Lock()
+
+
+def shared_passport_rules() -> PassportRules:
+    """Process-wide rules, loaded from PASSPORT_RULES_PATH when it is set, else DEFAULT_PASSPORT_RULES"""
+    global _shared_rules
+    if _shared_rules is None:
+        with _shared_rules_lock:
+            if _shared_rules is None:
+                path = os.environ.get("PASSPORT_RULES_PATH")
+                _shared_rules = PassportRules.load(path) if path else PassportRules()
+    return _shared_rules
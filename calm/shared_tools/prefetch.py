@@ -0,0 +1,132 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+class _ConversationPrefetch:
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.tasks: Dict[Tuple, asyncio.Task] = {}
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # A lookup nobody ends up asking for must not log "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class Prefetcher:
+    """Runs TravelTools lookups ahead of the custom actions that need them.
+
+    Lookups run as asyncio tasks on the action server's event loop, through an async TravelTools
+    client (see shared_async_travel_tools). Results are kept per conversation and keyed by tool
+    name and arguments, so an action only gets a prefetched result when it asks for exactly the
+    call that was prefetched; anything else falls through to a direct call. Entries expire after
+    `ttl_seconds` and discard() drops a conversation's entries, cancelling lookups still running,
+    when the user stops the flow.
+    """
+
+    def __init__(self, tools, ttl_seconds: float = 300):
+        self.tools = tools
+        self.ttl_seconds = ttl_seconds
+        self._conversations: Dict[str, _ConversationPrefetch] = {}
+        self._next_purge = time.monotonic() + ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def _purge_expired(self, now: float):
+        if now < self._next_purge:
+            return
+        for conversation_id in [conversation_id for conversation_id, conversation in self._conversations.items()
+                                if conversation.expires_at <= now]:
+            self.discard(conversation_id)
+        self._next_purge = now + self.ttl_seconds
+
+    def _conversation(self, conversation_id: str) -> _ConversationPrefetch:
+        now = time.monotonic()
+        self._purge_expired(now)
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            conversation = self._conversations[conversation_id] = _ConversationPrefetch(now + self.ttl_seconds)
+        conversation.expires_at = now + self.ttl_seconds
+        return conversation
+
+    def submit(self, conversation_id: str, tool_name: str, *args) -> asyncio.Task:
+        """Start `tool_name(*args)` in the background for a conversation"""
+        key = (tool_name,) + args
+        conversation = self._conversation(conversation_id)
+        task = conversation.tasks.get(key)
+        if task is None or task.cancelled():
+            task = conversation.tasks[key] = asyncio.ensure_future(getattr(self.tools, tool_name)(*args))
+            task.add_done_callback(_retrieve_exception)
+        return task
+
+    async def call(self, conversation_id: str, tool_name: str, *args, timeout: Optional[float] = None) -> Any:
+        """Result of `tool_name(*args)`, prefetched if possible and called directly otherwise"""
+        conversation = self._conversations.get(conversation_id)
+        task = None
+        if conversation is not None and conversation.expires_at > time.monotonic():
+            task = conversation.tasks.get((tool_name,) + args)
+        if task is not None and not task.cancelled():
+            try:
+                # Shielded, a timeout here leaves the lookup running for the next caller
+                result = await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+            except Exception:
+                # A failed or slow prefetch must not fail the action, retry the call directly
+                pass
+            else:
+                self.hits += 1
+                return result
+        self.misses += 1
+        return await getattr(self.tools, tool_name)(*args)
+
+    def discard(self, conversation_id: str):
+        """Forget a conversation's prefetched results, e.g. when the user stops the flow"""
+        conversation = self._conversations.pop(conversation_id, None)
+        if conversation is not None:
+            for task in conversation.tasks.values():
+                task.cancel()
+
+    def prefetch_cancellation(self, conversation_id: str, booking_details: Dict[str, Any],
+                              cancellation_date: Optional[str] = None):
+        """Start every lookup of the cancel_flight flow that only depends on the booking.
+
+        Mirrors the calls made by the get_fare_rules, calculate_cancellation_fee,
+        check_loyalty_status and apply_loyalty_discount actions.
+        """
+        cancellation_date = cancellation_date or datetime.now().strftime("%Y-%m-%d")
+        flight = booking_details["flight"]
+        self.submit(conversation_id, "get_fare_rules", flight["airline"], flight["fare_class"],
+                    booking_details["booking_date"])
+        fee_task = self.submit(conversation_id, "calculate_cancellation_fee",
+                               booking_details["booking_reference"], cancellation_date)
+        loyalty_task = self.submit(conversation_id, "check_loyalty_status", booking_details.get("member_id"))
+
+        async def prefetch_discount():
+            # The discount depends on both results, its key is only known once they are in
+            fee, loyalty = await asyncio.gather(fee_task, loyalty_task)
+            await self.submit(conversation_id, "apply_loyalty_discount", loyalty["status"],
+                              fee["original_amount"], fee["cancellation_fee"], booking_details["booking_reference"])
+
+        chain = self._conversation(conversation_id).tasks[("prefetch_discount",)] = \
+            asyncio.ensure_future(prefetch_discount())
+        chain.add_done_callback(_retrieve_exception)
+
+    def stats(self) -> Dict[str, int]:
+        return {"conversations": len(self._conversations), "hits": self.hits, "misses": self.misses}
+
+
+_shared_prefetcher = None
+
+
+def shared_prefetcher() -> Prefetcher:
+    """Process-wide Prefetcher on top of the shared async TravelTools client"""
+    global _shared_prefetcher
+    if _shared_prefetcher is None:
+        from .http_tools import shared_async_travel_tools
+        _shared_prefetcher = Prefetcher(shared_async_travel_tools())
+    return _shared_prefetcher
@@ -1,13 +1,47 @@
+import asyncio
+import contextvars
 import json
 import os
-from typing import Dict, List, Any
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterator, List, Any, Optional, Sequence
+from openai import AsyncOpenAI, OpenAI
 
+from calm.shared_tools.async_booking import AsyncTravelTools
 from calm.shared_tools.booking import TravelTools
+from react_agent.history import ConversationHistory
+from react_agent.llm_requests import AsyncHedgedChatClient, HedgedChatClient, pooled_async_openai
+from react_agent.macro_tools import MacroTool
+from react_agent.model_routing import ModelRouter
+from react_agent.response_cache import AsyncCachingChatClient, CachingChatClient, ResponseCache
+from react_agent.tool_selection import ToolSelector
+from react_agent.tool_validation import compile_tool_validators
+from react_agent.tracing import NOOP_TRACER
 
 # Set your OpenAI API key
 # export OPENAI_API_KEY="your-api-key-here"
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Seconds a chat completion may take, as request_timeout in calm/endpoints.yml
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "7"))
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=LLM_REQUEST_TIMEOUT)
+async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=LLM_REQUEST_TIMEOUT)
+# Opt-in hedged requests, a duplicate is sent when no answer came back within this percentile
+# of the latencies so far, see react_agent/llm_requests.py
+if os.getenv("LLM_HEDGE_PERCENTILE"):
+    hedge_options = dict(deadline=LLM_REQUEST_TIMEOUT, hedge_percentile=float(os.environ["LLM_HEDGE_PERCENTILE"]))
+    client = HedgedChatClient(lambda: pooled_async_openai(api_key=os.getenv("OPENAI_API_KEY"),
+                                                          timeout=LLM_REQUEST_TIMEOUT), **hedge_options)
+    async_client = AsyncHedgedChatClient(pooled_async_openai(api_key=os.getenv("OPENAI_API_KEY"),
+                                                             timeout=LLM_REQUEST_TIMEOUT), **hedge_options)
+# Opt-in on-disk cache of LLM responses, see react_agent/response_cache.py
+if os.getenv("LLM_RESPONSE_CACHE_PATH"):
+    response_cache = ResponseCache(os.environ["LLM_RESPONSE_CACHE_PATH"])
+    client = CachingChatClient(client, response_cache)
+    async_client = AsyncCachingChatClient(async_client, response_cache)
+
+MAX_ITERATIONS = 10
+FALLBACK_RESPONSE = "I apologize, but I'm having trouble processing your request. Could you please try again?"
 
 
 # =============================================================================
@@ -24,14 +58,17 @@ TOOL_SCHEMAS = [
         "type": "function",
         "function": {
             "name": "search_flights",
-            "description": "Search for available flights between two cities",
+            "description": "Search for available flights between two cities, cheapest first",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "origin": {"type": "string", "description": "Origin city code (e.g., NYC, LAX)"},
                     "destination": {"type": "string", "description": "Destination city code (e.g., PAR, LON)"},
-                    "date": {"type": "string", "description": "Travel date in YYYY-MM-DD format"},
-                    "passengers": {"type": "integer", "description": "Number of passengers"}
+                    "date": {"type": "string", "format": "date", "description": "Travel date in YYYY-MM-DD format"},
+                    "passengers": {"type": "integer", "description": "Number of passengers"},
+                    "max_price": {"type": "number", "description": "Only flights up to this price per passenger"},
+                    "max_results": {"type": "integer",
+                                    "description": "Number of cheapest flights to return, 10 by default"}
                 },
                 "required": ["origin", "destination", "date", "passengers"]
             }
@@ -61,7 +98,8 @@ TOOL_SCHEMAS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "birth_date": {"type": "string", "description": "Date of birth in YYYY-MM-DD format"},
+                    "birth_date": {"type": "string", "format": "date",
+                                   "description": "Date of birth in YYYY-MM-DD format"},
                     "minimum_age": {"type": "integer", "description": "Minimum age requirement"}
                 },
                 "required": ["birth_date", "minimum_age"]
@@ -107,12 +145,47 @@ TOOL_SCHEMAS = [
                 "properties": {
                     "passport_number": {"type": "string", "description": "Passport number"},
                     "country": {"type": "string", "description": "Issuing country code"},
-                    "travel_date": {"type": "string", "description": "Travel date in YYYY-MM-DD format"}
+                    "travel_date": {"type": "string", "format": "date",
+                                    "description": "Travel date in YYYY-MM-DD format"},
+                    "expiry_date": {"type": "string", "format": "date",
+                                    "description": "Passport expiry date in YYYY-MM-DD format"},
+                    "destination": {"type": "string",
+                                    "description": "Destination country, whose entry rules set the validity needed"}
                 },
                 "required": ["passport_number", "country", "travel_date"]
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "validate_passenger_manifest",
+            "description": "Validate the passports of all passengers of a booking in one call: number format, "
+                           "MRZ check digits and expiry against the destination's entry rules",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "passengers": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "passport_number": {"type": "string"},
+                                "nationality": {"type": "string", "description": "Issuing country"},
+                                "expiry_date": {"type": "string", "format": "date", "description": "YYYY-MM-DD"},
+                                "mrz": {"type": "string", "description": "Machine readable zone, if scanned"}
+                            }
+                        },
+                        "description": "One entry per passenger"
+                    },
+                    "travel_date": {"type": "string", "format": "date",
+                                    "description": "Travel date in YYYY-MM-DD format"},
+                    "destination": {"type": "string", "description": "Destination country"}
+                },
+                "required": ["passengers", "travel_date"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -122,8 +195,8 @@ TOOL_SCHEMAS = [
                 "type": "object",
                 "properties": {
                     "city": {"type": "string", "description": "City name"},
-                    "checkin": {"type": "string", "description": "Check-in date YYYY-MM-DD"},
-                    "checkout": {"type": "string", "description": "Check-out date YYYY-MM-DD"},
+                    "checkin": {"type": "string", "format": "date", "description": "Check-in date YYYY-MM-DD"},
+                    "checkout": {"type": "string", "format": "date", "description": "Check-out date YYYY-MM-DD"},
                     "rooms": {"type": "integer", "description": "Number of rooms needed"}
                 },
                 "required": ["city", "checkin", "checkout", "rooms"]
@@ -209,12 +282,18 @@ TOOL_SCHEMAS = [
         "type": "function",
         "function": {
             "name": "get_fare_rules",
-            "description": "Get cancellation and change rules for airline fare",
+            "description": "Get cancellation and change rules for airline fare. For an existing booking pass "
+                           "its booking_date or booking_ref, without either the rules for new bookings are returned",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "airline": {"type": "string", "description": "Airline code or name"},
-                    "fare_class": {"type": "string", "description": "Fare class (Economy, Business, First)"}
+                    "fare_class": {"type": "string", "description": "Fare class (Economy, Business, First)"},
+                    "booking_date": {"type": "string", "format": "date",
+                                     "description": "Date the booking was made (YYYY-MM-DD), selects the rules "
+                                                    "in force then"},
+                    "booking_ref": {"type": "string",
+                                    "description": "Booking reference, selects the rules in force when it was made"}
                 },
                 "required": ["airline", "fare_class"]
             }
@@ -224,12 +303,14 @@ TOOL_SCHEMAS = [
         "type": "function",
         "function": {
             "name": "calculate_cancellation_fee",
-            "description": "Calculate cancellation fees based on timing and fare rules",
+            "description": "Calculate cancellation fees based on timing and fare rules, before any loyalty "
+                           "waiver",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "booking_ref": {"type": "string", "description": "Booking reference"},
-                    "cancellation_date": {"type": "string", "description": "Date of cancellation YYYY-MM-DD"},
+                    "cancellation_date": {"type": "string", "format": "date",
+                                          "description": "Date of cancellation YYYY-MM-DD"},
                 },
                 "required": ["booking_ref", "cancellation_date"]
             }
@@ -239,14 +320,18 @@ TOOL_SCHEMAS = [
         "type": "function",
         "function": {
             "name": "apply_loyalty_discount",
-            "description": "Apply loyalty discount based on membership tier",
+            "description": "Apply the fee waiver of the membership tier to the cancellation fee "
+                           "calculate_cancellation_fee quoted, returns the fee and refund after the discount",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "loyalty_status": {"type": "string", "description": "Loyalty status"},
                     "original_booking_amount": {"type": "number", "description": "Original booking amount"},
                     "cancellation_fee": {"type": "number", "description": "Cancellation fee"},
-                }
+                    "booking_ref": {"type": "string",
+                                    "description": "Booking reference, selects the fare rules it was booked on"},
+                },
+                "required": ["loyalty_status", "original_booking_amount", "cancellation_fee"]
             }
         }
     },
@@ -325,18 +410,190 @@ TOOL_SCHEMAS = [
                 "required": ["email", "cancellation_details"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_flights_many",
+            "description": "Search flights for several routes at once, one list of flight options per route. "
+                           "All argument lists must have the same length, entry i of each list describes route i",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "origins": {"type": "array", "items": {"type": "string"}, "description": "Origin city codes"},
+                    "destinations": {"type": "array", "items": {"type": "string"},
+                                     "description": "Destination city codes"},
+                    "dates": {"type": "array", "items": {"type": "string", "format": "date"},
+                              "description": "Travel dates in YYYY-MM-DD format"},
+                    "passengers": {"type": "array", "items": {"type": "integer"},
+                                   "description": "Number of passengers per route"}
+                },
+                "required": ["origins", "destinations", "dates", "passengers"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_visa_requirements_many",
+            "description": "Check visa requirements for several passengers at once, e.g. a group booking. "
+                           "Results are in input order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "passport_countries": {"type": "array", "items": {"type": "string"},
+                                           "description": "Passport issuing country code of each passenger"},
+                    "destinations": {"type": "array", "items": {"type": "string"},
+                                     "description": "Destination country code of each passenger"}
+                },
+                "required": ["passport_countries", "destinations"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "validate_passport_format_many",
+            "description": "Validate the passport number format of several passengers at once. "
+                           "Results are in input order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "passport_numbers": {"type": "array", "items": {"type": "string"},
+                                         "description": "Passport numbers"},
+                    "country_codes": {"type": "array", "items": {"type": "string"},
+                                      "description": "Issuing country code of each passport"}
+                },
+                "required": ["passport_numbers", "country_codes"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "check_passport_expiry_status_many",
+            "description": "Check if several passports are valid for their travel dates at once. "
+                           "Results are in input order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "passport_numbers": {"type": "array", "items": {"type": "string"},
+                                         "description": "Passport numbers"},
+                    "countries": {"type": "array", "items": {"type": "string"},
+                                  "description": "Issuing country code of each passport"},
+                    "travel_dates": {"type": "array", "items": {"type": "string", "format": "date"},
+                                     "description": "Travel date in YYYY-MM-DD format for each passport"}
+                },
+                "required": ["passport_numbers", "countries", "travel_dates"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "calculate_cancellation_fee_many",
+            "description": "Calculate the cancellation fees of several bookings at once. Results are in input order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "booking_refs": {"type": "array", "items": {"type": "string"}, "description": "Booking references"},
+                    "cancellation_dates": {"type": "array", "items": {"type": "string", "format": "date"},
+                                           "description": "Date of cancellation YYYY-MM-DD for each booking"}
+                },
+                "required": ["booking_refs", "cancellation_dates"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "check_loyalty_status_many",
+            "description": "Check the loyalty status of several members at once. Results are in input order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "member_ids": {"type": "array", "items": {"type": "string"}, "description": "Member IDs"}
+                },
+                "required": ["member_ids"]
+            }
+        }
     }
 ]
 
 
+# Tools that belong to the same process and are offered together when tool selection is on
+TOOL_GROUPS = {
+    "flight_booking": ["search_flights", "get_visa_requirements", "check_minimum_age",
+                       "get_country_entry_requirements", "validate_passport_format",
+                       "check_passport_expiry_status", "search_flights_many", "get_visa_requirements_many",
+                       "validate_passport_format_many", "check_passport_expiry_status_many",
+                       "validate_passenger_manifest"],
+    "hotels": ["search_hotels"],
+    "payment": ["validate_credit_card", "authorize_payment"],
+    "flight_cancellation": ["validate_booking_reference", "validate_passenger_name", "get_booking_details",
+                            "get_fare_rules", "calculate_cancellation_fee", "apply_loyalty_discount",
+                            "check_loyalty_status", "calculate_points_refund", "process_refund",
+                            "generate_cancellation_confirmation", "send_cancellation_email",
+                            "calculate_cancellation_fee_many", "check_loyalty_status_many"],
+}
+
+# Compiled once: raises at import if a schema disagrees with the TravelTools method behind it
+TOOL_VALIDATORS = compile_tool_validators(TOOL_SCHEMAS, TravelTools)
+
+
 # =============================================================================
 # REAL LLM TRAVEL AGENT
 # =============================================================================
 
 class RealLLMTravelAgent:
-    def __init__(self):
-        self.tools = TravelTools()
-        self.conversation_history = []
+    def __init__(self, max_tool_workers: int = 1, tool_concurrency_limits: Optional[Dict[str, int]] = None,
+                 llm_client=None, tools: Optional[TravelTools] = None, tracer=NOOP_TRACER,
+                 history_token_budget: Optional[int] = None, tool_selector: Optional[ToolSelector] = None,
+                 history: Optional[ConversationHistory] = None, macro_tools: Sequence[MacroTool] = (),
+                 model_router: Optional[ModelRouter] = None):
+        """
+        max_tool_workers: size of the thread pool used to run the tool calls of a single
+            LLM turn. 1 keeps the original sequential behaviour. The pool is started on first
+            use and shut down by close(), or by leaving the agent's `with` block.
+        tool_concurrency_limits: optional cap on how many calls of a given tool may run
+            at the same time, e.g. {"process_refund": 1}. Tools not listed are only
+            bounded by the pool size.
+        llm_client: OpenAI client used for chat completions, defaults to the module-level `client`.
+        tools: TravelTools implementation the LLM's tool calls run against, e.g. a CachedTravelTools
+            (see calm/shared_tools/cache.py) to reuse lookup results across turns and agents.
+        tracer: records turn / iteration / llm_request / tool_call spans, see react_agent/tracing.py.
+            Tracing is off by default.
+        history_token_budget: maximum number of conversation history tokens sent with each
+            request. Older turns are then replaced by a summary of the facts they established,
+            see react_agent/history.py. None sends the whole history.
+        tool_selector: picks the subset of TOOL_SCHEMAS sent with each request, e.g.
+            ToolSelector(TOOL_SCHEMAS, TOOL_GROUPS) from react_agent/tool_selection.py. None sends
+            every schema.
+        history: conversation to continue, e.g. one handed out by a SessionStore
+            (react_agent/sessions.py). history_token_budget is ignored when it is given.
+        macro_tools: chains of tools offered to the LLM as one extra tool each, e.g.
+            cancellation_quote_macro() from react_agent/macro_tools.py
+        model_router: picks the model of each react_loop iteration, e.g. ModelRouter() from
+            react_agent/model_routing.py for gpt-4o-mini tool dispatch and gpt-4o answers. None
+            uses gpt-4o throughout.
+        """
+        self.llm_client = llm_client if llm_client is not None else client
+        self.tracer = tracer
+        self.tools = tools if tools is not None else TravelTools()
+        self.history = history if history is not None else ConversationHistory(token_budget=history_token_budget)
+        self.tool_selector = tool_selector
+        self.macro_tools = {macro.name: macro for macro in macro_tools}
+        self.tool_validators = TOOL_VALIDATORS.extended([macro.schema for macro in macro_tools])
+        self.model_router = model_router
+        self._routed_turn = None
+        self.used_tools = set()
+        self.last_turn_timing = None
+        self.max_tool_workers = max(1, max_tool_workers)
+        self._tool_executor = None
+        self._tool_limiters = {
+            tool_name: threading.BoundedSemaphore(limit)
+            for tool_name, limit in (tool_concurrency_limits or {}).items()
+        }
         self.flight_booking_guideline = """
 1. Always search for flights when users mention specific travel plans
 2. Always check all entry requirements (like visa, health) for international travel.
@@ -380,6 +637,7 @@ When users provide travel details, use the available tools to:
 - Search for accommodations if requested
 - Process payments securely
 - Handle cancellations and refunds
+- Handle several passengers, routes or bookings in one call with the *_many tools
 
 Always use tools rather than guessing or providing outdated information."""
 
@@ -398,8 +656,15 @@ Always use tools rather than guessing or providing outdated information."""
     def get_system_prompt(self):
         return self.system_prompt
 
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """Every user message and final answer so far, uncompacted"""
+        return self.history.messages
+
     def call_tool(self, tool_name: str, **kwargs) -> Any:
         """Execute a tool function"""
+        if tool_name in self.macro_tools:
+            return self.macro_tools[tool_name].run(self.call_tool, **kwargs)
         if hasattr(self.tools, tool_name):
             tool_func = getattr(self.tools, tool_name)
             result = tool_func(**kwargs)
@@ -407,115 +672,585 @@ Always use tools rather than guessing or providing outdated information."""
         else:
             return {"error": f"Tool {tool_name} not found"}
 
-    def process_function_calls(self, function_calls: List) -> List[Dict]:
-        """Process function calls from the LLM"""
-        results = []
+    def _validate_function_call(self, call):
+        """Arguments of an LLM tool call, or the error result sent back in place of running it"""
+        function_args, error = self.tool_validators.validate(call.function.name, call.function.arguments)
+        if error is not None:
+            print(f"⚠️ LLM called {call.function.name} with invalid arguments: {error.get('invalid_arguments')}")
+        else:
+            print(f"🔧 LLM called: {call.function.name}({function_args})")
+        return function_args, error
+
+    def _rejected_function_call(self, call, error: Dict) -> Dict:
+        return {
+            "call_id": call.id,
+            "function_name": call.function.name,
+            "arguments": None,
+            "result": error,
+            "duration": 0.0
+        }
+
+    @staticmethod
+    def _failed_tool_result(function_name: str, error: Exception) -> Dict:
+        """Result sent back to the LLM for a call the validators passed but the tool rejected"""
+        print(f"⚠️ {function_name} failed: {error!r}")
+        return {"error": f"{function_name} failed: {error}. Check the arguments and call it again"}
+
+    def _execute_function_call(self, call) -> Dict:
+        """Run a single LLM tool call and time it"""
+        function_name = call.function.name
+        function_args, error = self._validate_function_call(call)
+        if error is not None:
+            return self._rejected_function_call(call, error)
 
-        for call in function_calls:
-            function_name = call.function.name
-            function_args = json.loads(call.function.arguments)
+        with self.tracer.span("tool_call", tool=function_name, call_id=call.id):
+            start = perf_counter()
+            limiter = self._tool_limiters.get(function_name)
+            try:
+                if limiter is None:
+                    result = self.call_tool(function_name, **function_args)
+                else:
+                    with limiter:
+                        result = self.call_tool(function_name, **function_args)
+            except (ValueError, KeyError, TypeError) as e:
+                result = self._failed_tool_result(function_name, e)
+            duration = perf_counter() - start
 
-            print(f"🔧 LLM called: {function_name}({function_args})")
+        return {
+            "call_id": call.id,
+            "function_name": function_name,
+            "arguments": function_args,
+            "result": result,
+            "duration": duration
+        }
+
+    def process_function_calls(self, function_calls: List) -> List[Dict]:
+        """Process function calls from the LLM, concurrently if max_tool_workers > 1.
 
-            # Execute the function
-            result = self.call_tool(function_name, **function_args)
+        Results are always returned in the same order as `function_calls`, so the tool
+        messages line up with the tool_call_ids of the assistant message.
+        """
+        if self.max_tool_workers == 1 or len(function_calls) < 2:
+            results = [self._execute_function_call(call) for call in function_calls]
+        else:
+            if self._tool_executor is None:
+                self._tool_executor = ThreadPoolExecutor(max_workers=self.max_tool_workers,
+                                                         thread_name_prefix="travel-tool")
+            # Run each call in a copy of the caller's context so tool spans nest under the current iteration
+            contexts = [contextvars.copy_context() for _ in function_calls]
+            results = list(self._tool_executor.map(
+                lambda context, call: context.run(self._execute_function_call, call), contexts, function_calls
+            ))
 
-            results.append({
-                "call_id": call.id,
-                "function_name": function_name,
-                "arguments": function_args,
-                "result": result
-            })
+        for result in results:
+            print(f"   ⏱️ {result['function_name']} took {round(result['duration'] * 1000, 1)} ms")
+            self._remember_tool_result(result)
 
         return results
 
-    def react_loop(self, user_message: str) -> str:
-        """Real ReAct loop with LLM making decisions"""
-        from time import time
+    def close(self):
+        """Shut down the thread pool of the concurrent tool calls, if one was started"""
+        if self._tool_executor is not None:
+            self._tool_executor.shutdown(wait=True)
+            self._tool_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _remember_tool_result(self, result: Dict):
+        function_name = result["function_name"]
+        if result["arguments"] is None:
+            # Rejected before it ran, nothing to remember
+            return
+        self.used_tools.add(function_name)
+        macro = self.macro_tools.get(function_name)
+        if macro is None:
+            self.history.record_tool_result(function_name, result["arguments"], result["result"])
+        elif isinstance(result["result"], dict):
+            for step in macro.steps:
+                self.history.record_tool_result(step.tool, {}, result["result"].get(step.output))
+
+    def _chat_completion_kwargs(self, messages: List[Dict], model: str = "gpt-4o") -> Dict:
+        """Arguments for every chat.completions.create call of the ReAct loop"""
+        tools = TOOL_SCHEMAS
+        if self.tool_selector is not None:
+            tools = self.tool_selector.select(messages, self.used_tools)
+            print(f"🧰 Offering {len(tools)} of {len(TOOL_SCHEMAS)} tools")
+        if self.macro_tools:
+            tools = tools + [macro.schema for macro in self.macro_tools.values()]
+        return dict(
+            model=model,
+            messages=messages,
+            tools=tools,
+            tool_choice="auto",  # Let LLM decide when to use tools
+            temperature=0.1
+        )
+
+    def _create_chat_completion(self, messages: List[Dict], model: str = "gpt-4o"):
+        """Returns the chat completion and the number of retries the client needed for it"""
+        kwargs = self._chat_completion_kwargs(messages, model)
+        if isinstance(self.llm_client, OpenAI):
+            raw_response = self.llm_client.chat.completions.with_raw_response.create(**kwargs)
+            return raw_response.parse(), raw_response.retries_taken
+        return self.llm_client.chat.completions.create(**kwargs), 0
+
+    def _next_chat_completion(self, messages: List[Dict]):
+        """_create_chat_completion on the model the router picks, asking again when it drops the response"""
+        if self._routed_turn is None:
+            return self._create_chat_completion(messages)
+        route = self._routed_turn.route()
+        retries = 0
+        while route is not None:
+            start = perf_counter()
+            response, route_retries = self._create_chat_completion(messages, route.model)
+            retries += route_retries
+            next_route = self._routed_turn.review(route, response, perf_counter() - start, self.tool_validators)
+            if next_route is not None:
+                print(f"🔀 {route.model} response dropped, asking {next_route.model} ({next_route.name})")
+            route = next_route
+        return response, retries
+
+    @staticmethod
+    def _record_llm_response(span, response, retries: int):
+        if not span.recording:
+            return
+        usage = getattr(response, "usage", None)
+        span.set(
+            model=response.model,
+            prompt_tokens=usage.prompt_tokens if usage is not None else None,
+            completion_tokens=usage.completion_tokens if usage is not None else None,
+            tool_calls=len(response.choices[0].message.tool_calls or []),
+            retries=retries,
+        )
+
+    @staticmethod
+    def _assistant_tool_call_message(message) -> Dict:
+        """LLM's function call message, in the shape expected back by the chat completions API"""
+        return {
+            "role": "assistant",
+            "content": message.content,
+            "tool_calls": [
+                {
+                    "id": call.id,
+                    "type": "function",
+                    "function": {
+                        "name": call.function.name,
+                        "arguments": call.function.arguments
+                    }
+                } for call in message.tool_calls
+            ]
+        }
+
+    @staticmethod
+    def _tool_result_messages(function_results: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "role": "tool",
+                "tool_call_id": result["call_id"],
+                "content": json.dumps(result["result"])
+            } for result in function_results
+        ]
+
+    def _start_turn(self, user_message: str) -> List[Dict]:
         print(f"\n" + '\033[1m' + f"💬 User: {user_message}" + '\033[0m')
         print("="*25)
 
-        start = time()
         # Add conversation history
-        messages = [{"role": "system", "content": self.system_prompt}] + self.conversation_history + [
+        history = self.history.prompt_messages()
+        if self.history.last_turn_stats["saved_tokens"] > 0:
+            stats = self.history.last_turn_stats
+            print(f"🗜️ History: sending ~{stats['sent_tokens']} of ~{stats['history_tokens']} tokens "
+                  f"({stats['compacted_turns']} turn(s) summarised, ~{stats['saved_tokens']} saved)")
+        self._routed_turn = self.model_router.start_turn() if self.model_router is not None else None
+        return [{"role": "system", "content": self.system_prompt}] + history + [
             {"role": "user", "content": user_message}]
 
-        max_iterations = 10
-
-        for iteration in range(max_iterations):
-            print(f"\n🤔 Iteration {iteration + 1}: LLM deciding what to do...")
-
-            # Get LLM response with potential function calls
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                tools=TOOL_SCHEMAS,
-                tool_choice="auto",  # Let LLM decide when to use tools
-                temperature=0.1
-            )
-
-            message = response.choices[0].message
-
-            # Check if LLM wants to call functions
-            if message.tool_calls:
-                print(f"💭 LLM decided to call {len(message.tool_calls)} tool(s)")
-
-                # Add LLM's function call message to conversation
-                messages.append({
-                    "role": "assistant",
-                    "content": message.content,
-                    "tool_calls": [
-                        {
-                            "id": call.id,
-                            "type": "function",
-                            "function": {
-                                "name": call.function.name,
-                                "arguments": call.function.arguments
-                            }
-                        } for call in message.tool_calls
-                    ]
-                })
+    def _finish_turn(self, user_message: str, response_text: str, elapsed: float,
+                     time_to_first_token: Optional[float] = None, echo_response: bool = True):
+        if echo_response:
+            print("="*25)
+            print(f"\n" + '\033[1m' + f"🤖 Agent: {response_text}" + '\033[0m')
+        else:
+            # The response has already been streamed to stdout token by token
+            print('\033[0m')
+        if time_to_first_token is not None:
+            print(f"\n Time to first token: {round(time_to_first_token, 2)} seconds")
+        print(f"\n Time to respond: {round(elapsed, 2)} seconds")
+        print("=" * 25)
+        self.last_turn_timing = {"time_to_first_token": time_to_first_token, "total": elapsed}
+        # Update conversation history
+        self.history.add_turn(user_message, response_text)
+
+    @staticmethod
+    def _merge_tool_call_deltas(tool_calls: Dict[int, Dict], deltas: List):
+        """Assemble streamed tool call fragments, which arrive keyed by their index in the message"""
+        for delta in deltas:
+            entry = tool_calls.setdefault(delta.index, {"id": None, "name": "", "arguments": ""})
+            if delta.id:
+                entry["id"] = delta.id
+            if delta.function is not None:
+                entry["name"] += delta.function.name or ""
+                entry["arguments"] += delta.function.arguments or ""
 
-                # Process function calls
-                function_results = self.process_function_calls(message.tool_calls)
+    @staticmethod
+    def _streamed_message(content_parts: List[str], tool_calls: Dict[int, Dict]):
+        """Same attributes as a non-streamed `response.choices[0].message`"""
+        return SimpleNamespace(
+            content="".join(content_parts) or None,
+            tool_calls=[
+                SimpleNamespace(id=entry["id"], type="function",
+                                function=SimpleNamespace(name=entry["name"], arguments=entry["arguments"]))
+                for _, entry in sorted(tool_calls.items())
+            ] or None
+        )
 
-                # Add function results to conversation
-                for result in function_results:
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": result["call_id"],
-                        "content": json.dumps(result["result"])
-                    })
+    def react_loop(self, user_message: str) -> str:
+        """Real ReAct loop with LLM making decisions"""
+        from time import time
+        start = time()
+        messages = self._start_turn(user_message)
 
-                # Continue loop - LLM might want to call more functions
-                continue
+        with self.tracer.span("turn") as turn_span:
+            for iteration in range(MAX_ITERATIONS):
+                print(f"\n🤔 Iteration {iteration + 1}: LLM deciding what to do...")
+
+                with self.tracer.span("iteration", index=iteration + 1):
+                    # Get LLM response with potential function calls
+                    with self.tracer.span("llm_request", messages=len(messages)) as llm_span:
+                        response, retries = self._next_chat_completion(messages)
+                        self._record_llm_response(llm_span, response, retries)
+
+                    message = response.choices[0].message
+
+                    # Check if LLM wants to call functions
+                    if message.tool_calls:
+                        print(f"💭 LLM decided to call {len(message.tool_calls)} tool(s)")
+
+                        # Add LLM's function call message to conversation
+                        messages.append(self._assistant_tool_call_message(message))
+
+                        # Process function calls
+                        function_results = self.process_function_calls(message.tool_calls)
+
+                        # Add function results to conversation
+                        messages.extend(self._tool_result_messages(function_results))
+
+                        # Continue loop - LLM might want to call more functions
+                        continue
+
+                    else:
+                        # LLM is ready to respond to user
+                        print("💭 LLM decided to respond to user")
+                        response_text = message.content
+                        break
 
             else:
-                # LLM is ready to respond to user
-                print("💭 LLM decided to respond to user")
-                response_text = message.content
-                break
+                response_text = FALLBACK_RESPONSE
 
-        else:
-            response_text = "I apologize, but I'm having trouble processing your request. Could you please try again?"
+            turn_span.set(iterations=iteration + 1)
 
         end = time()
+        self._finish_turn(user_message, response_text, end - start)
+
+        return response_text
+
+    def react_loop_stream(self, user_message: str) -> Iterator[str]:
+        """Streaming variant of react_loop, yields the tokens of the answer.
+
+        Tool call iterations work as in react_loop: their deltas are assembled and the tools run
+        before the next request. A streamed message only shows whether it calls tools once it is
+        complete, so the content of each iteration is held until then and only the answer's is
+        yielded; any text the model writes before its tool calls is never shown as the answer. The
+        time to the first yielded token and the total turn time are both printed and kept in
+        `self.last_turn_timing`.
+        """
+        start = perf_counter()
+        time_to_first_token = None
+        messages = self._start_turn(user_message)
+
+        with self.tracer.span("turn", stream=True) as turn_span:
+            for iteration in range(MAX_ITERATIONS):
+                print(f"\n🤔 Iteration {iteration + 1}: LLM deciding what to do...")
+
+                with self.tracer.span("iteration", index=iteration + 1):
+                    with self.tracer.span("llm_request", messages=len(messages), stream=True) as llm_span:
+                        stream = self.llm_client.chat.completions.create(**self._chat_completion_kwargs(messages),
+                                                                         stream=True,
+                                                                         stream_options={"include_usage": True})
+                        streamed = _StreamedMessage()
+                        for chunk in stream:
+                            streamed.add(chunk)
+                        message = streamed.message()
+                        streamed.record(llm_span)
+
+                    if message.tool_calls:
+                        print(f"💭 LLM decided to call {len(message.tool_calls)} tool(s)")
+
+                        messages.append(self._assistant_tool_call_message(message))
+                        function_results = self.process_function_calls(message.tool_calls)
+                        messages.extend(self._tool_result_messages(function_results))
+
+                        # Continue loop - LLM might want to call more functions
+                        continue
+
+                    else:
+                        response_text = message.content or ""
+                        break
+
+            else:
+                response_text = FALLBACK_RESPONSE
+                streamed = _StreamedMessage([response_text])
+
+            if streamed.content_parts:
+                time_to_first_token = self._start_answer(start)
+                yield from streamed.content_parts
+            turn_span.set(iterations=iteration + 1, time_to_first_token=time_to_first_token)
+
+        self._finish_turn(user_message, response_text, perf_counter() - start,
+                          time_to_first_token=time_to_first_token, echo_response=time_to_first_token is None)
+
+        return response_text
+
+    @staticmethod
+    def _start_answer(start: float) -> float:
+        """Print the answer header, returns the time to the first answer token"""
         print("="*25)
-        print(f"\n" + '\033[1m' + f"🤖 Agent: {response_text}" + '\033[0m')
-        print(f"\n Time to respond: {round(end - start, 2)} seconds")
-        print("=" * 25)
-        # Update conversation history
-        self.conversation_history.extend([
-            {"role": "user", "content": user_message},
-            {"role": "assistant", "content": response_text}
-        ])
+        print(f"\n" + '\033[1m' + "🤖 Agent: ", end="", flush=True)
+        return perf_counter() - start
+
+
+class _StreamedMessage:
+    """The chunks of one streamed chat completion, assembled into its message"""
+
+    def __init__(self, content_parts: Optional[List[str]] = None):
+        self.content_parts = content_parts or []
+        self.tool_calls: Dict[int, Dict] = {}
+        self.model = None
+        self.usage = None
+
+    def add(self, chunk):
+        self.model = chunk.model
+        if chunk.usage is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return
+        delta = chunk.choices[0].delta
+        if delta.tool_calls:
+            RealLLMTravelAgent._merge_tool_call_deltas(self.tool_calls, delta.tool_calls)
+        if delta.content:
+            self.content_parts.append(delta.content)
+
+    def message(self):
+        return RealLLMTravelAgent._streamed_message(self.content_parts, self.tool_calls)
+
+    def record(self, llm_span):
+        if llm_span.recording:
+            llm_span.set(model=self.model,
+                         prompt_tokens=self.usage.prompt_tokens if self.usage is not None else None,
+                         completion_tokens=self.usage.completion_tokens if self.usage is not None else None,
+                         tool_calls=len(self.tool_calls))
+
+
+# =============================================================================
+# ASYNC LLM TRAVEL AGENT
+# =============================================================================
+
+class AsyncRealLLMTravelAgent(RealLLMTravelAgent):
+    """asyncio version of RealLLMTravelAgent.
+
+    Same system prompt, TOOL_SCHEMAS and iteration cap, but the LLM round trips and tool calls
+    are awaited, so a single event loop can serve many conversations at once - one agent
+    instance per conversation, all sharing one AsyncOpenAI client.
+    """
+
+    def __init__(self, tool_concurrency_limits: Optional[Dict[str, int]] = None, llm_client=None, **options):
+        """
+        tool_concurrency_limits: optional cap on how many calls of a given tool this agent may
+            run at the same time, e.g. {"process_refund": 1}.
+        llm_client: AsyncOpenAI client used for chat completions, defaults to the module-level
+            `async_client`.
+        options: tools, tracer, history_token_budget, tool_selector, history, macro_tools and
+            model_router, as for RealLLMTravelAgent. The tools are wrapped for the event loop.
+        """
+        super().__init__(llm_client=llm_client if llm_client is not None else async_client, **options)
+        self.tools = AsyncTravelTools(self.tools)
+        self._tool_limiters = {
+            tool_name: asyncio.Semaphore(limit)
+            for tool_name, limit in (tool_concurrency_limits or {}).items()
+        }
+
+    async def call_tool(self, tool_name: str, **kwargs) -> Any:
+        """Execute a tool function"""
+        if tool_name in self.macro_tools:
+            return await self.macro_tools[tool_name].arun(self.call_tool, **kwargs)
+        if hasattr(self.tools, tool_name):
+            tool_func = getattr(self.tools, tool_name)
+            result = await tool_func(**kwargs)
+            return result
+        else:
+            return {"error": f"Tool {tool_name} not found"}
+
+    async def _execute_function_call(self, call) -> Dict:
+        """Run a single LLM tool call and time it"""
+        function_name = call.function.name
+        function_args, error = self._validate_function_call(call)
+        if error is not None:
+            return self._rejected_function_call(call, error)
+
+        with self.tracer.span("tool_call", tool=function_name, call_id=call.id):
+            start = perf_counter()
+            limiter = self._tool_limiters.get(function_name)
+            try:
+                if limiter is None:
+                    result = await self.call_tool(function_name, **function_args)
+                else:
+                    async with limiter:
+                        result = await self.call_tool(function_name, **function_args)
+            except (ValueError, KeyError, TypeError) as e:
+                result = self._failed_tool_result(function_name, e)
+            duration = perf_counter() - start
+
+        return {
+            "call_id": call.id,
+            "function_name": function_name,
+            "arguments": function_args,
+            "result": result,
+            "duration": duration
+        }
+
+    async def process_function_calls(self, function_calls: List) -> List[Dict]:
+        """Process function calls from the LLM concurrently, keeping their order"""
+        results = await asyncio.gather(*(self._execute_function_call(call) for call in function_calls))
+
+        for result in results:
+            print(f"   ⏱️ {result['function_name']} took {round(result['duration'] * 1000, 1)} ms")
+            self._remember_tool_result(result)
+
+        return list(results)
+
+    async def _create_chat_completion(self, messages: List[Dict], model: str = "gpt-4o"):
+        """Returns the chat completion and the number of retries the client needed for it"""
+        kwargs = self._chat_completion_kwargs(messages, model)
+        if isinstance(self.llm_client, AsyncOpenAI):
+            raw_response = await self.llm_client.chat.completions.with_raw_response.create(**kwargs)
+            return raw_response.parse(), raw_response.retries_taken
+        return await self.llm_client.chat.completions.create(**kwargs), 0
+
+    async def _next_chat_completion(self, messages: List[Dict]):
+        """_create_chat_completion on the model the router picks, asking again when it drops the response"""
+        if self._routed_turn is None:
+            return await self._create_chat_completion(messages)
+        route = self._routed_turn.route()
+        retries = 0
+        while route is not None:
+            start = perf_counter()
+            response, route_retries = await self._create_chat_completion(messages, route.model)
+            retries += route_retries
+            next_route = self._routed_turn.review(route, response, perf_counter() - start, self.tool_validators)
+            if next_route is not None:
+                print(f"🔀 {route.model} response dropped, asking {next_route.model} ({next_route.name})")
+            route = next_route
+        return response, retries
+
+    async def react_loop(self, user_message: str) -> str:
+        """Real ReAct loop with LLM making decisions"""
+        from time import time
+        start = time()
+        messages = self._start_turn(user_message)
+
+        with self.tracer.span("turn") as turn_span:
+            for iteration in range(MAX_ITERATIONS):
+                print(f"\n🤔 Iteration {iteration + 1}: LLM deciding what to do...")
+
+                with self.tracer.span("iteration", index=iteration + 1):
+                    # Get LLM response with potential function calls
+                    with self.tracer.span("llm_request", messages=len(messages)) as llm_span:
+                        response, retries = await self._next_chat_completion(messages)
+                        self._record_llm_response(llm_span, response, retries)
+
+                    message = response.choices[0].message
+
+                    # Check if LLM wants to call functions
+                    if message.tool_calls:
+                        print(f"💭 LLM decided to call {len(message.tool_calls)} tool(s)")
+
+                        messages.append(self._assistant_tool_call_message(message))
+                        function_results = await self.process_function_calls(message.tool_calls)
+                        messages.extend(self._tool_result_messages(function_results))
+
+                        # Continue loop - LLM might want to call more functions
+                        continue
+
+                    else:
+                        # LLM is ready to respond to user
+                        print("💭 LLM decided to respond to user")
+                        response_text = message.content
+                        break
+
+            else:
+                response_text = FALLBACK_RESPONSE
+
+            turn_span.set(iterations=iteration + 1)
+
+        end = time()
+        self._finish_turn(user_message, response_text, end - start)
 
         return response_text
 
 
+    async def react_loop_stream(self, user_message: str) -> AsyncIterator[str]:
+        """asyncio version of RealLLMTravelAgent.react_loop_stream, use with `async for`"""
+        start = perf_counter()
+        time_to_first_token = None
+        messages = self._start_turn(user_message)
+
+        with self.tracer.span("turn", stream=True) as turn_span:
+            for iteration in range(MAX_ITERATIONS):
+                print(f"\n🤔 Iteration {iteration + 1}: LLM deciding what to do...")
+
+                with self.tracer.span("iteration", index=iteration + 1):
+                    with self.tracer.span("llm_request", messages=len(messages), stream=True) as llm_span:
+                        stream = await self.llm_client.chat.completions.create(
+                            **self._chat_completion_kwargs(messages), stream=True,
+                            stream_options={"include_usage": True})
+                        streamed = _StreamedMessage()
+                        async for chunk in stream:
+                            streamed.add(chunk)
+                        message = streamed.message()
+                        streamed.record(llm_span)
+
+                    if message.tool_calls:
+                        print(f"💭 LLM decided to call {len(message.tool_calls)} tool(s)")
+
+                        messages.append(self._assistant_tool_call_message(message))
+                        function_results = await self.process_function_calls(message.tool_calls)
+                        messages.extend(self._tool_result_messages(function_results))
+                        continue
+
+                    else:
+                        response_text = message.content or ""
+                        break
+
+            else:
+                response_text = FALLBACK_RESPONSE
+                streamed = _StreamedMessage([response_text])
+
+            if streamed.content_parts:
+                time_to_first_token = self._start_answer(start)
+                for part in streamed.content_parts:
+                    yield part
+            turn_span.set(iterations=iteration + 1, time_to_first_token=time_to_first_token)
+
+        self._finish_turn(user_message, response_text, perf_counter() - start,
+                          time_to_first_token=time_to_first_token, echo_response=time_to_first_token is None)
+
+
 # Interactive mode
-def interactive_mode():
-    """Run in interactive mode for testing"""
+def interactive_mode(stream: bool = True):
+    """Run in interactive mode for testing, printing the answer token by token when `stream` is set"""
     if not os.getenv("OPENAI_API_KEY"):
         print("❌ Please set your OPENAI_API_KEY environment variable")
         return
@@ -531,7 +1266,11 @@ def interactive_mode():
             break
 
         try:
-            agent.react_loop(user_input)
+            if stream:
+                for token in agent.react_loop_stream(user_input):
+                    print(token, end="", flush=True)
+            else:
+                agent.react_loop(user_input)
         except Exception as e:
             print(f"❌ Error: {e}")
 
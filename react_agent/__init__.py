@@ -0,0 +1 @@
+"""Building blocks used by the ReAct travel agent in flight_agent_react.py"""
@@ -0,0 +1,196 @@
+"""
+Token-budgeted conversation history for the ReAct agent.
+
+Every turn the agent resends the system prompt plus the whole conversation. ConversationHistory
+keeps the full log, but the messages it hands back for the prompt are limited to a token budget:
+the latest turns are always kept verbatim and older ones are folded into a single system
+message holding structured facts (booking reference, member id, chosen flight, ...) and a
+one-line note per compacted user request.
+"""
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+BOOKING_REFERENCE_PATTERN = re.compile(r"\bCONF\d+\b", re.IGNORECASE)
+FLIGHT_ID_PATTERN = re.compile(r"\b[A-Z]{2}\d{2,4}\b", re.IGNORECASE)
+
+# Fixed per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+COMPACTED_REQUEST_CHARS = 80
+MAX_COMPACTED_REQUESTS = 10
+
+
+def approximate_token_count(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token), close enough for budgeting English text"""
+    if not text:
+        return 0
+    return len(text) // 4 + 1
+
+
+def _booking_facts(arguments: Dict, result: Any) -> Dict[str, Any]:
+    if not isinstance(result, dict):
+        return {}
+    flight = result.get("flight") or {}
+    return {
+        "booking_reference": result.get("booking_reference"),
+        "member_id": result.get("member_id"),
+        "booked_flight": flight.get("flight_id"),
+        "route": flight.get("route"),
+        "travel_date": flight.get("date"),
+    }
+
+
+# Facts worth keeping once the turn that produced them is compacted, per tool
+FACT_EXTRACTORS: Dict[str, Callable[[Dict, Any], Dict[str, Any]]] = {
+    "validate_booking_reference": lambda arguments, result: (
+        {"booking_reference": arguments.get("reference_code")} if result is True else {}),
+    "validate_passenger_name": lambda arguments, result: (
+        {"passenger_last_name": arguments.get("last_name")} if result is True else {}),
+    "get_booking_details": _booking_facts,
+    "check_loyalty_status": lambda arguments, result: (
+        {"member_id": result.get("member_id"), "loyalty_status": result.get("status")}
+        if isinstance(result, dict) else {}),
+    "calculate_cancellation_fee": lambda arguments, result: (
+        {"cancellation_fee": result.get("cancellation_fee"), "refund_amount": result.get("refund_amount")}
+        if isinstance(result, dict) else {}),
+    "apply_loyalty_discount": lambda arguments, result: (
+        {"refund_amount": result.get("refund_amount")} if isinstance(result, dict) else {}),
+    "process_refund": lambda arguments, result: (
+        {"refund_transaction_id": result.get("transaction_id")} if isinstance(result, dict) else {}),
+    "generate_cancellation_confirmation": lambda arguments, result: {"cancellation_confirmation": result},
+}
+
+
+class ConversationHistory:
+    def __init__(self, token_budget: Optional[int] = None, keep_last_turns: int = 2,
+                 count_tokens: Callable[[Optional[str]], int] = approximate_token_count):
+        """
+        token_budget: maximum number of history tokens sent with each request, on top of the
+            system prompt. None keeps the whole history, as before.
+        keep_last_turns: number of most recent user/assistant exchanges that are never compacted
+        count_tokens: token counter for a message's content
+        """
+        self.token_budget = token_budget
+        self.keep_last_turns = keep_last_turns
+        self.count_tokens = count_tokens
+        # Full log, as the agent has always kept it
+        self.messages: List[Dict[str, Any]] = []
+        self._token_counts: List[int] = []
+        self.facts: Dict[str, Any] = {}
+        self._offered_flights = set()
+        self._compacted_requests: List[str] = []
+        # Index into `messages` of the first message still sent verbatim
+        self._first_kept = 0
+        self._kept_tokens = 0
+        self._summary_tokens = 0
+        self.last_turn_stats: Optional[Dict[str, int]] = None
+        self.tokens_saved_total = 0
+
+    def _message_tokens(self, message: Dict[str, Any]) -> int:
+        return self.count_tokens(message.get("content")) + MESSAGE_OVERHEAD_TOKENS
+
+    def add_turn(self, user_message: str, response_text: str):
+        """Record a finished exchange and compact older turns if the budget is exceeded"""
+        for match in BOOKING_REFERENCE_PATTERN.findall(user_message):
+            self.facts.setdefault("booking_reference", match.upper())
+        chosen = {flight_id.upper() for flight_id in FLIGHT_ID_PATTERN.findall(user_message)} & self._offered_flights
+        if chosen:
+            self.facts["chosen_flight"] = sorted(chosen)[0]
+
+        for message in ({"role": "user", "content": user_message},
+                        {"role": "assistant", "content": response_text}):
+            tokens = self._message_tokens(message)
+            self.messages.append(message)
+            self._token_counts.append(tokens)
+            self._kept_tokens += tokens
+        self._compact()
+
+    def record_tool_result(self, function_name: str, arguments: Dict, result: Any):
+        """Pick the facts worth remembering out of a tool result"""
+        if function_name == "search_flights" and isinstance(result, list):
+            self._offered_flights.update(flight.get("flight_id") for flight in result if isinstance(flight, dict))
+            return
+        extractor = FACT_EXTRACTORS.get(function_name)
+        if extractor is None:
+            return
+        self.facts.update({key: value for key, value in extractor(arguments, result).items() if value is not None})
+        if self._first_kept:
+            # The summary message carries the facts, keep its size current
+            self._summary_tokens = self._message_tokens(self._summary_message())
+
+    def _compact(self):
+        if self.token_budget is None:
+            return
+        min_kept = 2 * self.keep_last_turns
+        compacted = False
+        while (self._kept_tokens + self._summary_tokens > self.token_budget
+               and len(self.messages) - self._first_kept > min_kept):
+            # Fold the oldest kept user/assistant pair into the summary
+            user_message = self.messages[self._first_kept]["content"] or ""
+            if len(user_message) > COMPACTED_REQUEST_CHARS:
+                user_message = user_message[:COMPACTED_REQUEST_CHARS].rstrip() + "…"
+            self._compacted_requests.append(user_message)
+            self._kept_tokens -= self._token_counts[self._first_kept] + self._token_counts[self._first_kept + 1]
+            self._first_kept += 2
+            compacted = True
+        if compacted:
+            self._summary_tokens = self._message_tokens(self._summary_message())
+
+    def _summary_message(self) -> Dict[str, str]:
+        lines = ["Summary of the earlier part of this conversation."]
+        if self.facts:
+            lines.append(f"Known facts: {json.dumps(self.facts, sort_keys=True)}")
+        requests = self._compacted_requests[-MAX_COMPACTED_REQUESTS:]
+        skipped = len(self._compacted_requests) - len(requests)
+        lines.append("Earlier user requests:" + (f" ({skipped} older omitted)" if skipped else ""))
+        lines.extend(f"- {request}" for request in requests)
+        return {"role": "system", "content": "\n".join(lines)}
+
+    def prompt_messages(self) -> List[Dict[str, Any]]:
+        """History to send with the next request and, in last_turn_stats, what it saved"""
+        full_tokens = sum(self._token_counts)
+        if self._first_kept:
+            messages = [self._summary_message()] + self.messages[self._first_kept:]
+        else:
+            messages = list(self.messages)
+        sent_tokens = self._kept_tokens + self._summary_tokens
+        self.last_turn_stats = {
+            "history_tokens": full_tokens,
+            "sent_tokens": sent_tokens,
+            "saved_tokens": full_tokens - sent_tokens,
+            "compacted_turns": self._first_kept // 2,
+        }
+        self.tokens_saved_total += full_tokens - sent_tokens
+        return messages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable state, see from_dict"""
+        return {
+            "token_budget": self.token_budget,
+            "keep_last_turns": self.keep_last_turns,
+            "messages": self.messages,
+            "token_counts": self._token_counts,
+            "facts": self.facts,
+            "offered_flights": sorted(self._offered_flights),
+            "compacted_requests": self._compacted_requests,
+            "first_kept": self._first_kept,
+            "kept_tokens": self._kept_tokens,
+            "summary_tokens": self._summary_tokens,
+            "tokens_saved_total": self.tokens_saved_total,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any],
+                  count_tokens: Callable[[Optional[str]], int] = approximate_token_count) -> "ConversationHistory":
+        history = cls(token_budget=state["token_budget"], keep_last_turns=state["keep_last_turns"],
+                      count_tokens=count_tokens)
+        history.messages = state["messages"]
+        history._token_counts = state["token_counts"]
+        history.facts = state["facts"]
+        history._offered_flights = set(state["offered_flights"])
+        history._compacted_requests = state["compacted_requests"]
+        history._first_kept = state["first_kept"]
+        history._kept_tokens = state["kept_tokens"]
+        history._summary_tokens = state["summary_tokens"]
+        history.tokens_saved_total = state["tokens_saved_total"]
+        return history
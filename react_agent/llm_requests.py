@@ -0,0 +1,211 @@
+"""
+Request layer for the agent's chat completion calls: pooled connections, per-call deadlines and
+hedged requests.
+
+A few slow chat completions make up most of the p99 turn latency. HedgedChatClient sends the
+request, and if no answer has come back after the hedge delay, sends the same request again on
+another pooled connection. Whichever answer arrives first is returned and the other request is
+cancelled, which closes its connection. The hedge delay is a percentile of the latencies seen
+so far (95th by default), so only the slowest few percent of the calls are duplicated, or a
+fixed number of seconds. Every call has an overall deadline: when neither answer is back by
+then, LLMDeadlineExceeded is raised instead of waiting for the client's own timeout.
+
+A hedged duplicate is billed like any other request, so hedge late. Streaming requests are not
+hedged, they only get the deadline; HedgedChatClient hands their chunks back as a plain iterator.
+
+    llm_client = HedgedChatClient(lambda: pooled_async_openai(base_url), deadline=7.0)
+    agent = RealLLMTravelAgent(llm_client=llm_client)
+
+or by setting LLM_HEDGE_PERCENTILE for flight_agent_react's module-level clients.
+
+AsyncHedgedChatClient is the same for AsyncRealLLMTravelAgent. HedgedChatClient runs the
+requests on an event loop thread of its own, which is what makes cancelling the slower one
+possible from synchronous code.
+"""
+import asyncio
+import collections
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterator, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+# As request_timeout in calm/endpoints.yml
+DEFAULT_DEADLINE = 7.0
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    pass
+
+
+def pooled_async_openai(base_url: Optional[str] = None, api_key: Optional[str] = None, max_connections: int = 100,
+                        max_keepalive_connections: int = 20, keepalive_expiry: float = 60.0,
+                        connect_timeout: float = 2.0, timeout: float = DEFAULT_DEADLINE) -> AsyncOpenAI:
+    """AsyncOpenAI client on a keep-alive connection pool, without retries of its own.
+
+    keepalive_expiry is longer than httpx' default of 5 seconds so that connections survive the
+    gaps between the turns of a conversation and the TLS handshake isn't paid again.
+    """
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+                            keepalive_expiry=keepalive_expiry),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+    )
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+
+
+class AsyncHedgedChatClient:
+    """Stand-in for an AsyncOpenAI client whose chat.completions.create hedges, see the module docstring"""
+
+    def __init__(self, client: AsyncOpenAI, deadline: float = DEFAULT_DEADLINE, hedge_after: Optional[float] = None,
+                 hedge_percentile: float = 0.95, initial_hedge_after: float = 2.0, min_samples: int = 20,
+                 window: int = 500, max_attempts: int = 2):
+        """
+        client: the client the requests go through, e.g. pooled_async_openai()
+        deadline: seconds a create call may take in total, hedges included
+        hedge_after: fixed seconds after which a duplicate is sent. None uses hedge_percentile of
+            the last `window` latencies, or initial_hedge_after until min_samples were seen
+        max_attempts: requests in flight for one call at most, the original included. An
+            attempt that fails is replaced right away while the deadline allows.
+        """
+        self.client = client
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_after = initial_hedge_after
+        self.min_samples = min_samples
+        self.max_attempts = max(1, max_attempts)
+        self._latencies = collections.deque(maxlen=window)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.failed_attempts = 0
+        self.deadlines_exceeded = 0
+
+    def hedge_delay(self) -> float:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if len(self._latencies) < self.min_samples:
+            return self.initial_hedge_after
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        start = time.monotonic()
+        deadline = start + self.deadline
+        if kwargs.get("stream"):
+            return await self.client.chat.completions.create(**{**kwargs, "timeout": self.deadline})
+
+        def attempt():
+            timeout = max(0.001, deadline - time.monotonic())
+            return asyncio.ensure_future(self.client.chat.completions.create(**{**kwargs, "timeout": timeout}))
+
+        attempts = [attempt()]
+        pending = set(attempts)
+        next_hedge = start + self.hedge_delay()
+        error = None
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                can_hedge = len(attempts) < self.max_attempts
+                wait_until = min(deadline, next_hedge) if can_hedge else deadline
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wait_until - now),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not attempts[0]:
+                            self.hedge_wins += 1
+                        self._latencies.append(time.monotonic() - start)
+                        return task.result()
+                    error = task.exception()
+                    self.failed_attempts += 1
+                if len(attempts) < self.max_attempts and (done or time.monotonic() >= next_hedge):
+                    # Hedge once the delay is up, or replace a failed attempt straight away
+                    if not done:
+                        self.hedges += 1
+                    task = attempt()
+                    attempts.append(task)
+                    pending.add(task)
+                    next_hedge = deadline
+            if error is not None and not pending:
+                raise error
+            self.deadlines_exceeded += 1
+            raise LLMDeadlineExceeded(f"No chat completion within {self.deadline} s ({len(attempts)} attempt(s))")
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                    self.cancelled += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "cancelled": self.cancelled,
+            "failed_attempts": self.failed_attempts,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+        }
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class HedgedChatClient(AsyncHedgedChatClient):
+    """AsyncHedgedChatClient for synchronous callers.
+
+    `client_factory` creates the AsyncOpenAI client, e.g. pooled_async_openai, on the event loop
+    thread the requests run on.
+    """
+
+    def __init__(self, client_factory=pooled_async_openai, **options):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="hedged-llm-requests", daemon=True)
+        self._thread.start()
+
+        async def create_client():
+            return client_factory()
+
+        super().__init__(asyncio.run_coroutine_threadsafe(create_client(), self._loop).result(), **options)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_sync))
+
+    def _create_sync(self, **kwargs):
+        response = asyncio.run_coroutine_threadsafe(self._create(**kwargs), self._loop).result()
+        if kwargs.get("stream"):
+            return self._iterate_stream(response)
+        return response
+
+    def _iterate_stream(self, stream) -> Iterator:
+        """Chunks of an AsyncStream opened on the event loop thread, each read there as well"""
+        chunks = stream.__aiter__()
+        done = object()
+
+        async def next_chunk():
+            try:
+                return await chunks.__anext__()
+            except StopAsyncIteration:
+                return done
+
+        try:
+            while True:
+                chunk = asyncio.run_coroutine_threadsafe(next_chunk(), self._loop).result()
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.close(), self._loop).result()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,210 @@
+"""
+Macro tools: deterministic chains of TravelTools calls offered to the LLM as a single tool.
+
+The ReAct agent spends one LLM iteration per step of a process like the cancellation quote
+(get_booking_details -> get_fare_rules -> calculate_cancellation_fee -> check_loyalty_status ->
+apply_loyalty_discount) and can skip steps or pass the wrong arguments along the way. A
+MacroTool runs such a chain locally and wires each step's arguments from the macro inputs and
+the results of the earlier steps.
+
+Chains are compiled from the CALM flows in calm/data/flows: the order of the `action` steps comes
+from the flow, and ACTION_BINDINGS says which TravelTools method each custom action calls and
+where its arguments come from, mirroring the slots the action reads in calm/actions/flights.
+"""
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import yaml
+
+FLOWS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calm", "data", "flows")
+
+# An argument is either a dotted path into the macro context ("inputs.booking_reference",
+# "booking_details.flight.airline") or a callable computing it from the context.
+Binding = Union[str, Callable[[Dict[str, Any]], Any]]
+
+
+class MacroError(Exception):
+    pass
+
+
+class ActionBinding(NamedTuple):
+    tool: str
+    arguments: Dict[str, Binding]
+    # Context key the result is stored under, the slot the custom action sets
+    output: str
+
+
+ACTION_BINDINGS: Dict[str, ActionBinding] = {
+    "get_booking_details": ActionBinding(
+        "get_booking_details", {"booking_reference": "inputs.booking_reference"}, "booking_details"),
+    "get_fare_rules": ActionBinding(
+        "get_fare_rules",
+        {"airline": "booking_details.flight.airline", "fare_class": "booking_details.flight.fare_class",
+         "booking_date": "booking_details.booking_date"},
+        "fare_rules"),
+    "calculate_cancellation_fee": ActionBinding(
+        "calculate_cancellation_fee",
+        {"booking_ref": "booking_details.booking_reference",
+         "cancellation_date": lambda context: context["inputs"].get("cancellation_date")
+                                              or datetime.now().strftime("%Y-%m-%d")},
+        "cancellation_fee_details"),
+    "check_loyalty_status": ActionBinding(
+        "check_loyalty_status", {"member_id": "booking_details.member_id"}, "loyalty_status"),
+    "apply_loyalty_discount": ActionBinding(
+        "apply_loyalty_discount",
+        {"loyalty_status": "loyalty_status.status",
+         "original_booking_amount": "cancellation_fee_details.original_amount",
+         "cancellation_fee": "cancellation_fee_details.cancellation_fee",
+         "booking_ref": "booking_details.booking_reference"},
+        "refund_details"),
+    "get_flight_options": ActionBinding(
+        "search_flights",
+        {"origin": "inputs.origin", "destination": "inputs.destination", "date": "inputs.travel_date",
+         "passengers": lambda context: context["inputs"].get("passengers", 1)},
+        "flight_options"),
+    "validate_passport_format": ActionBinding(
+        "validate_passport_format",
+        {"passport_number": "inputs.passport_number", "country_code": "inputs.passport_country"},
+        "passport_validity"),
+    "check_passport_expiry_status": ActionBinding(
+        "check_passport_expiry_status",
+        {"passport_number": "inputs.passport_number", "country": "inputs.passport_country",
+         "travel_date": "inputs.travel_date"},
+        "passport_expiry_status"),
+    "get_country_entry_requirements": ActionBinding(
+        "get_country_entry_requirements", {"country_code": "inputs.destination_country"},
+        "country_entry_requirements"),
+    "get_visa_requirements": ActionBinding(
+        "get_visa_requirements",
+        {"passport_country": "inputs.passport_country", "destination": "inputs.destination_country"},
+        "visa_requirements"),
+}
+
+
+def _resolve(binding: Binding, context: Dict[str, Any]) -> Any:
+    if callable(binding):
+        return binding(context)
+    value: Any = context
+    for key in binding.split("."):
+        if not isinstance(value, dict) or key not in value:
+            raise MacroError(f"'{binding}' is not available")
+        value = value[key]
+    return value
+
+
+class MacroTool:
+    def __init__(self, name: str, description: str, parameters: Dict[str, Any], steps: Sequence[ActionBinding]):
+        """
+        name, description, parameters: how the macro is presented to the LLM, parameters being a
+            JSON schema object for its inputs
+        steps: the calls to make, in order
+        """
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+        self.steps = list(steps)
+
+    @property
+    def schema(self) -> Dict[str, Any]:
+        return {"type": "function",
+                "function": {"name": self.name, "description": self.description, "parameters": self.parameters}}
+
+    def _context(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [name for name in self.parameters.get("required", []) if inputs.get(name) in (None, "")]
+        if missing:
+            raise MacroError(f"Missing required argument(s): {', '.join(missing)}")
+        return {"inputs": inputs}
+
+    def run(self, call_tool: Callable[..., Any], **inputs) -> Dict[str, Any]:
+        """Run every step through `call_tool(tool_name, **arguments)` and return all step results"""
+        try:
+            context = self._context(inputs)
+            for step in self.steps:
+                arguments = {name: _resolve(binding, context) for name, binding in step.arguments.items()}
+                context[step.output] = call_tool(step.tool, **arguments)
+        except MacroError as error:
+            return {"error": f"{self.name} failed: {error}"}
+        context.pop("inputs")
+        return context
+
+    async def arun(self, call_tool: Callable[..., Any], **inputs) -> Dict[str, Any]:
+        """As run, for a coroutine `call_tool`"""
+        try:
+            context = self._context(inputs)
+            for step in self.steps:
+                arguments = {name: _resolve(binding, context) for name, binding in step.arguments.items()}
+                context[step.output] = await call_tool(step.tool, **arguments)
+        except MacroError as error:
+            return {"error": f"{self.name} failed: {error}"}
+        context.pop("inputs")
+        return context
+
+
+def flow_actions(flow_file: str, flow_id: str) -> List[str]:
+    """Custom actions of a flow's main path, in order. Responses (utter_*) and branches are skipped."""
+    with open(flow_file, encoding="utf-8") as file:
+        flows = yaml.safe_load(file)["flows"]
+    return [step["action"] for step in flows[flow_id]["steps"]
+            if "action" in step and not step["action"].startswith("utter_")]
+
+
+def compile_flow_macro(flow_file: str, flow_id: str, name: str, description: str, parameters: Dict[str, Any],
+                       actions: Optional[Sequence[str]] = None) -> MacroTool:
+    """Build a MacroTool from the actions of a CALM flow.
+
+    actions: restrict the macro to these actions of the flow, which keep the flow's order
+    """
+    steps = []
+    for action in flow_actions(flow_file, flow_id):
+        if actions is not None and action not in actions:
+            continue
+        if action not in ACTION_BINDINGS:
+            raise ValueError(f"No binding for action '{action}' of flow '{flow_id}'")
+        steps.append(ACTION_BINDINGS[action])
+    return MacroTool(name, description, parameters, steps)
+
+
+def cancellation_quote_macro() -> MacroTool:
+    """Booking details, fare rules, cancellation fee and loyalty discount in one call (cancel_flight flow)"""
+    return compile_flow_macro(
+        os.path.join(FLOWS_DIR, "flights", "cancel_flight.yml"), "cancel_flight",
+        name="get_cancellation_quote",
+        description="Get the booking details, fare rules, cancellation fee, loyalty status of the booking's member "
+                    "and the final refund after the loyalty discount for a booking, in one call. Use this instead "
+                    "of calling get_booking_details, get_fare_rules, calculate_cancellation_fee, "
+                    "check_loyalty_status and apply_loyalty_discount one by one.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "booking_reference": {"type": "string", "description": "Booking reference code"},
+                "cancellation_date": {"type": "string",
+                                      "description": "Date of cancellation YYYY-MM-DD, defaults to today"},
+            },
+            "required": ["booking_reference"],
+        },
+    )
+
+
+def passenger_documents_macro() -> MacroTool:
+    """Passport format, passport expiry, entry and visa requirements in one call (book_flight flow)"""
+    return compile_flow_macro(
+        os.path.join(FLOWS_DIR, "flights", "book_flight.yml"), "book_flight",
+        name="check_passenger_documents",
+        description="Validate a passenger's passport format and expiry and get the entry and visa requirements "
+                    "of the destination country, in one call. Use this instead of calling "
+                    "validate_passport_format, check_passport_expiry_status, get_country_entry_requirements and "
+                    "get_visa_requirements one by one.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "passport_number": {"type": "string", "description": "Passport number"},
+                "passport_country": {"type": "string", "description": "Passport issuing country code (e.g., US, IN)"},
+                "destination_country": {"type": "string", "description": "Destination country code (e.g., FR)"},
+                "travel_date": {"type": "string", "description": "Travel date in YYYY-MM-DD format"},
+            },
+            "required": ["passport_number", "passport_country", "destination_country", "travel_date"],
+        },
+        actions=["validate_passport_format", "check_passport_expiry_status", "get_country_entry_requirements",
+                 "get_visa_requirements"],
+    )
@@ -0,0 +1,208 @@
+"""
+Per-iteration model choice for the ReAct loop: a small model picks the tool calls, a large one
+writes the answer.
+
+Most iterations of a turn only pick the next step of a guideline ("validate the booking
+reference", "get the booking details"), which gpt-4o-mini does at a fraction of gpt-4o's price
+and latency. Only the answer the user reads needs the large model, as in the CALM assistant,
+where the command generator and the rephraser use different model groups (calm/endpoints.yml).
+
+An iteration's type is what came before it in the turn: the user message, or the tools the
+previous iteration called. The router learns per type how often the iteration turned out to be
+the answer; after the last step of a guideline (apply_loyalty_discount, a payment) it nearly
+always is. Iterations whose type ended in the answer at least answer_confidence of the time, over
+min_samples iterations, go straight to the large model ("answer" route). The others go to the
+small model, and what it returns is checked before anything runs:
+
+- tool calls whose arguments validate against the tool schemas, and that weren't already made
+  this turn or earlier in the same response, are kept ("dispatch" route)
+- a text answer is dropped and the iteration asked again of the large model ("reask" route),
+  unless small_final_answers is set
+- invalid arguments or a tool call repeated with the same arguments (the small model going in
+  circles) are dropped as well, and the large model takes over for the rest of the turn
+  ("escalation" route)
+
+Dropped responses are never added to the conversation, so the large model doesn't see the small
+model's mistakes. The extra small request in front of a reask is only paid for the iterations
+whose type doesn't tell: while the router is still learning, and for types such as the user
+message, which is answered right away about as often as it starts a guideline.
+
+    agent = RealLLMTravelAgent(model_router=ModelRouter())
+    ...
+    agent.model_router.stats()  # requests, latency, tokens and cost per route
+
+One ModelRouter can be shared by many agents, and learns from all of them; the per-turn state
+lives in the RoutedTurn each turn starts.
+
+The routing applies to react_loop, sync and async. react_loop_stream keeps using the large model
+for every iteration.
+"""
+import collections
+import json
+import threading
+from typing import Dict, NamedTuple, Optional
+
+# USD per million prompt and completion tokens
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+class Route(NamedTuple):
+    name: str
+    model: str
+
+
+class ModelRouter:
+    """Routing policy and per-route statistics, can be shared by the agents of many conversations"""
+
+    def __init__(self, small_model: str = "gpt-4o-mini", large_model: str = "gpt-4o",
+                 small_final_answers: bool = False, answer_confidence: float = 0.9, min_samples: int = 10,
+                 prices: Optional[Dict[str, tuple]] = None, window: int = 1000):
+        """
+        small_model, large_model: models of the dispatch and of the answer / reask / escalation routes
+        small_final_answers: keep the small model's answers instead of asking the large model again
+        answer_confidence: share of an iteration type's iterations that must have been the answer
+            for the next one to go straight to the large model, above 1 never
+        min_samples: iterations of a type seen before its share is trusted
+        prices: USD per million (prompt, completion) tokens of each model, MODEL_PRICES by default
+        window: requests per route kept for the latency percentiles, and iterations per type for
+            the answer shares
+        """
+        self.small_model = small_model
+        self.large_model = large_model
+        self.small_final_answers = small_final_answers
+        self.answer_confidence = answer_confidence
+        self.min_samples = min_samples
+        self.prices = prices if prices is not None else MODEL_PRICES
+        self._window = window
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict] = {}
+        # Per iteration type, whether its recent iterations were the answer
+        self._outcomes: Dict[tuple, collections.deque] = {}
+        # Small model responses dropped, by reason
+        self.rejected: Dict[str, int] = collections.Counter()
+
+    def start_turn(self) -> "RoutedTurn":
+        return RoutedTurn(self)
+
+    def answer_share(self, iteration_type: tuple) -> Optional[float]:
+        """Share of the iteration type's iterations that were the answer, None before min_samples"""
+        with self._lock:
+            outcomes = self._outcomes.get(iteration_type)
+            if outcomes is None or len(outcomes) < self.min_samples:
+                return None
+            return sum(outcomes) / len(outcomes)
+
+    def learn(self, iteration_type: tuple, answered: bool):
+        with self._lock:
+            outcomes = self._outcomes.get(iteration_type)
+            if outcomes is None:
+                outcomes = self._outcomes[iteration_type] = collections.deque(maxlen=self._window)
+            outcomes.append(answered)
+
+    def record(self, route: Route, response, seconds: float, rejected: Optional[str] = None):
+        usage = getattr(response, "usage", None)
+        prompt_tokens = usage.prompt_tokens if usage is not None else 0
+        completion_tokens = usage.completion_tokens if usage is not None else 0
+        prompt_price, completion_price = self.prices.get(route.model, (0.0, 0.0))
+        with self._lock:
+            stats = self._routes.get(route.name)
+            if stats is None:
+                stats = self._routes[route.name] = {
+                    "requests": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0,
+                    "models": collections.Counter(), "latencies": collections.deque(maxlen=self._window),
+                }
+            stats["requests"] += 1
+            stats["seconds"] += seconds
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost"] += (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+            stats["models"][route.model] += 1
+            stats["latencies"].append(seconds)
+            if rejected is not None:
+                self.rejected[rejected] += 1
+
+    def reset_stats(self):
+        """Forget the per-route statistics and dropped responses, keep what was learned about iteration types"""
+        with self._lock:
+            self._routes.clear()
+            self.rejected.clear()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per route: requests, models, mean and p95 latency in ms, tokens and cost in USD"""
+        report = {}
+        with self._lock:
+            for name, stats in self._routes.items():
+                latencies = sorted(stats["latencies"])
+                report[name] = {
+                    "requests": stats["requests"],
+                    "models": dict(stats["models"]),
+                    "mean_ms": round(stats["seconds"] / stats["requests"] * 1000, 1),
+                    "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000, 1),
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "completion_tokens": stats["completion_tokens"],
+                    "cost": round(stats["cost"], 6),
+                }
+        return report
+
+
+class RoutedTurn:
+    """Routing state of one turn: whether it was escalated, the tool calls made so far and the type
+    of the next iteration, () for the first, else the names of the tools the previous one called"""
+
+    def __init__(self, router: ModelRouter):
+        self.router = router
+        self.escalated = False
+        self.iteration_type: tuple = ()
+        self._calls = set()
+        # Whether the next response reviewed is the iteration's first, the one learned from
+        self._first_request = True
+
+    def route(self) -> Route:
+        """Route of the next iteration's first request"""
+        router = self.router
+        if self.escalated:
+            return Route("escalation", router.large_model)
+        share = router.answer_share(self.iteration_type)
+        if share is not None and share >= router.answer_confidence:
+            return Route("answer", router.large_model)
+        return Route("dispatch", router.small_model)
+
+    def review(self, route: Route, response, seconds: float, tool_validators) -> Optional[Route]:
+        """Records the request, returns the route to ask again on if its response is dropped, else None.
+
+        tool_validators: the agent's ToolValidators, the arguments are checked as they will be when run
+        """
+        router = self.router
+        message = response.choices[0].message
+        small = route.model != router.large_model
+        if self._first_request:
+            router.learn(self.iteration_type, not message.tool_calls)
+            self._first_request = False
+        if small and not message.tool_calls and not router.small_final_answers:
+            router.record(route, response, seconds, rejected="final_answer")
+            return Route("reask", router.large_model)
+
+        reason = None
+        calls = []
+        for call in message.tool_calls or ():
+            arguments, error = tool_validators.validate(call.function.name, call.function.arguments)
+            if error is not None:
+                reason = reason or "invalid_arguments"
+                continue
+            key = (call.function.name, json.dumps(arguments, sort_keys=True, default=str))
+            if key in self._calls or key in calls:
+                reason = reason or "repeated_call"
+            calls.append(key)
+        if small and reason is not None:
+            router.record(route, response, seconds, rejected=reason)
+            self.escalated = True
+            return Route("escalation", router.large_model)
+        router.record(route, response, seconds)
+        self._calls.update(calls)
+        self._first_request = True
+        if message.tool_calls:
+            self.iteration_type = tuple(sorted({call.function.name for call in message.tool_calls}))
+        return None
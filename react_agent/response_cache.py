@@ -0,0 +1,166 @@
+"""
+On-disk cache of chat completion responses, for the requests the ReAct agent repeats.
+
+The same opening "I want to cancel my flight", the same fare rule questions and every rerun of
+a notebook scenario send byte-identical requests, each paying a full LLM round trip. A request
+is keyed on a SHA-256 of its canonical JSON (model, temperature, messages, tools, tool_choice,
+keys sorted), and the response is stored whole, so a hit replays the same message, tool call ids
+and arguments included. Entries live in a local SQLite file under a size limit: once it is
+exceeded, the least recently used ones are deleted. Streamed requests are passed through.
+
+The cache is opt-in, by wrapping the client handed to the agent:
+
+    cache = ResponseCache("llm_cache.sqlite3", max_bytes=100_000_000)
+    agent = RealLLMTravelAgent(llm_client=CachingChatClient(client, cache))
+
+or by setting LLM_RESPONSE_CACHE_PATH for flight_agent_react's module-level clients. stats()
+reports the hit rate and the LLM time the hits saved, measured when each response was first
+fetched.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from openai.types.chat import ChatCompletion
+
+# Request fields that decide the response, everything else (timeouts, headers) is left out of the key
+KEY_FIELDS = ("model", "temperature", "messages", "tools", "tool_choice", "top_p", "seed", "response_format")
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    canonical = json.dumps({field: request.get(field) for field in KEY_FIELDS}, sort_keys=True,
+                           separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None):
+        """
+        path: SQLite file of the cache, ":memory:" for one that doesn't outlive the process
+        max_bytes: limit on the size of the stored responses, least recently used ones are
+            deleted beyond it
+        ttl: seconds an entry stays valid, None for no expiry
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                         "size INTEGER NOT NULL, latency REAL NOT NULL, created_at REAL NOT NULL, "
+                         "used_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self._db.commit()
+        self._stored_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key: str) -> Optional[ChatCompletion]:
+        """Cached response of the request with this key, counting a hit or a miss"""
+        with self._lock:
+            row = self._db.execute("SELECT response, latency, created_at FROM responses WHERE key = ?",
+                                   (key,)).fetchone()
+            now = time.time()
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                self._delete(key)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            self.saved_seconds += row[1]
+        return ChatCompletion.model_validate_json(row[0])
+
+    def put(self, key: str, response: ChatCompletion, latency: float):
+        """Store a response fetched in `latency` seconds, evicting the least recently used beyond max_bytes"""
+        serialized = response.model_dump_json()
+        if len(serialized) > self.max_bytes:
+            return
+        with self._lock:
+            now = time.time()
+            self._delete(key)
+            self._db.execute("INSERT INTO responses (key, response, size, latency, created_at, used_at) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", (key, serialized, len(serialized), latency, now, now))
+            self._stored_bytes += len(serialized)
+            while self._stored_bytes > self.max_bytes:
+                oldest_key, = self._db.execute("SELECT key FROM responses ORDER BY used_at LIMIT 1").fetchone()
+                self._delete(oldest_key)
+                self.evictions += 1
+            self._db.commit()
+
+    def _delete(self, key: str):
+        row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._stored_bytes -= row[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._stored_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "stored_bytes": self._stored_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+class CachingChatClient:
+    """Stand-in for an OpenAI client whose chat.completions.create answers from a ResponseCache.
+
+    Misses go to the wrapped client and are stored. Requests with stream=True always go to the
+    wrapped client.
+    """
+
+    def __init__(self, client, cache: ResponseCache):
+        self.client = client
+        self.cache = cache
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        if kwargs.get("stream"):
+            return self.client.chat.completions.create(**kwargs)
+        key = request_key(kwargs)
+        response = self.cache.get(key)
+        if response is None:
+            start = time.perf_counter()
+            response = self.client.chat.completions.create(**kwargs)
+            self.cache.put(key, response, time.perf_counter() - start)
+        return response
+
+
+class AsyncCachingChatClient(CachingChatClient):
+    """CachingChatClient around an AsyncOpenAI client"""
+
+    async def _create(self, **kwargs):
+        if kwargs.get("stream"):
+            return await self.client.chat.completions.create(**kwargs)
+        key = request_key(kwargs)
+        response = self.cache.get(key)
+        if response is None:
+            start = time.perf_counter()
+            response = await self.client.chat.completions.create(**kwargs)
+            self.cache.put(key, response, time.perf_counter() - start)
+        return response
@@ -0,0 +1,164 @@
+"""
+Bounded store for the conversation histories of many agent sessions.
+
+Resident histories are kept in LRU order under an overall memory limit, measured as the size of
+their JSON serialisation. When the limit is exceeded the least recently used sessions are
+written to a local SQLite file and dropped from memory; they are loaded back lazily the next
+time their session id comes up. A history an agent still holds when its session is evicted
+stays the session's history: get() hands the same object out again and save() re-admits it, so a
+turn added meanwhile isn't lost to the older copy on disk. flush() writes every resident session
+out, so a new process pointed at the same file picks up where the old one stopped.
+
+    store = SessionStore("sessions.sqlite3", max_resident_bytes=50_000_000)
+    agent = RealLLMTravelAgent(history=store.get(session_id))
+    agent.react_loop(user_message)
+    store.save(session_id)
+"""
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from .history import ConversationHistory
+
+
+class SessionStore:
+    def __init__(self, path: str, max_resident_bytes: int = 64 * 1024 * 1024,
+                 max_resident_sessions: Optional[int] = None,
+                 history_factory: Callable[[], ConversationHistory] = ConversationHistory):
+        """
+        path: SQLite file evicted sessions are spilled to, ":memory:" for a throwaway store
+        max_resident_bytes: limit on the serialised size of all resident histories
+        max_resident_sessions: optional limit on the number of resident histories
+        history_factory: creates the history of a session seen for the first time
+        """
+        self.path = path
+        self.max_resident_bytes = max_resident_bytes
+        self.max_resident_sessions = max_resident_sessions
+        self.history_factory = history_factory
+        self._resident: "OrderedDict[str, ConversationHistory]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._resident_bytes = 0
+        # Every history handed out and still referenced, resident or not
+        self._in_use: "weakref.WeakValueDictionary[str, ConversationHistory]" = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                         "(session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)")
+        self._db.commit()
+        self.evictions = 0
+        self.reloads = 0
+        self.reload_seconds_total = 0.0
+        self.reload_seconds_max = 0.0
+
+    def get(self, session_id: str) -> ConversationHistory:
+        """History of a session: resident, reloaded from disk, or new"""
+        with self._lock:
+            history = self._resident.get(session_id)
+            if history is not None:
+                self._resident.move_to_end(session_id)
+                return history
+            history = self._in_use.get(session_id)
+            if history is not None:
+                # Evicted while still in use, the object is newer than what was spilled
+                self._admit(session_id, history, len(json.dumps(history.to_dict())))
+                return history
+
+            start = time.perf_counter()
+            row = self._db.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                history = self.history_factory()
+                size = 0
+            else:
+                history = ConversationHistory.from_dict(json.loads(row[0]))
+                size = len(row[0])
+                elapsed = time.perf_counter() - start
+                self.reloads += 1
+                self.reload_seconds_total += elapsed
+                self.reload_seconds_max = max(self.reload_seconds_max, elapsed)
+            self._admit(session_id, history, size)
+            return history
+
+    def _admit(self, session_id: str, history: ConversationHistory, size: int):
+        self._resident[session_id] = history
+        self._sizes[session_id] = size
+        self._resident_bytes += size
+        self._in_use[session_id] = history
+        self._evict(keep=session_id)
+
+    def save(self, session_id: str):
+        """Account for a session's history having grown, e.g. after a turn, evicting others if needed.
+
+        A session evicted since get() is re-admitted with the history handed out.
+        """
+        with self._lock:
+            history = self._resident.get(session_id)
+            if history is None:
+                history = self._in_use.get(session_id)
+                if history is not None:
+                    self._admit(session_id, history, len(json.dumps(history.to_dict())))
+                return
+            size = len(json.dumps(history.to_dict()))
+            self._resident_bytes += size - self._sizes[session_id]
+            self._sizes[session_id] = size
+            self._resident.move_to_end(session_id)
+            self._evict(keep=session_id)
+
+    def _spill(self, session_id: str, history: ConversationHistory):
+        self._db.execute("INSERT OR REPLACE INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)",
+                         (session_id, json.dumps(history.to_dict()), time.time()))
+
+    def _evict(self, keep: str):
+        spilled = False
+        while len(self._resident) > 1 and (
+                self._resident_bytes > self.max_resident_bytes
+                or (self.max_resident_sessions is not None and len(self._resident) > self.max_resident_sessions)):
+            session_id = next(iter(self._resident))
+            if session_id == keep:
+                # Never evict the session being served, move on to the next least recently used
+                self._resident.move_to_end(session_id)
+                session_id = next(iter(self._resident))
+            history = self._resident.pop(session_id)
+            self._resident_bytes -= self._sizes.pop(session_id)
+            self._spill(session_id, history)
+            self.evictions += 1
+            spilled = True
+        if spilled:
+            self._db.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if session_id in self._resident:
+                del self._resident[session_id]
+                self._resident_bytes -= self._sizes.pop(session_id)
+            self._in_use.pop(session_id, None)
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._db.commit()
+
+    def flush(self):
+        """Write every resident session to disk, keeping them resident"""
+        with self._lock:
+            for session_id, history in self._resident.items():
+                self._spill(session_id, history)
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            spilled = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            return {
+                "resident_sessions": len(self._resident),
+                "resident_bytes": self._resident_bytes,
+                "stored_sessions": spilled,
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+                "reload_ms_avg": round(self.reload_seconds_total / self.reloads * 1000, 3) if self.reloads else 0.0,
+                "reload_ms_max": round(self.reload_seconds_max * 1000, 3),
+            }
@@ -0,0 +1,102 @@
+"""
+Per-request tool retrieval for the ReAct agent.
+
+Instead of sending every schema in TOOL_SCHEMAS with each chat completion, ToolSelector scores
+the tools against the recent user messages with a small TF-IDF index built from each tool's
+name, description and parameter descriptions. The best matches are widened to their tool group
+(a cancellation needs the whole cancellation chain, not just the best matching step) and to
+the tools already used in the session. When nothing matches well enough and no tool has been
+used yet, the full set is sent.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "e", "for", "from", "g", "i", "if", "in",
+    "is", "it", "me", "my", "of", "on", "or", "please", "the", "to", "want", "we", "what", "with", "would",
+    "you", "your",
+}
+SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "ed", "es", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 4 and word[-1] == word[-2]:
+        # cancell(ation) / cancell(ing) -> cancel
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(word) for word in re.findall(r"[a-z]+", text.lower().replace("_", " "))
+            if word not in STOP_WORDS and len(word) > 1]
+
+
+def _schema_text(schema: Dict) -> str:
+    function = schema["function"]
+    parts = [function["name"], function["name"], function.get("description", "")]
+    for name, parameter in function.get("parameters", {}).get("properties", {}).items():
+        parts.extend([name, parameter.get("description", "")])
+    return " ".join(parts)
+
+
+class ToolSelector:
+    def __init__(self, tool_schemas: Sequence[Dict], groups: Optional[Dict[str, Sequence[str]]] = None,
+                 top_k: int = 3, min_score: float = 0.12, context_user_messages: int = 2):
+        """
+        tool_schemas: the full tool set, in the order it should be sent
+        groups: named groups of tools that are always offered together, e.g. every step of the
+            cancellation process. A tool may belong to one group at most.
+        top_k: number of best scoring tools to start from
+        min_score: cosine similarity a tool needs to be picked; if none reaches it and no tool
+            has been used yet, the full set is sent
+        context_user_messages: how many of the latest user messages make up the query
+        """
+        self.tool_schemas = list(tool_schemas)
+        self.top_k = top_k
+        self.min_score = min_score
+        self.context_user_messages = context_user_messages
+        self.group_of = {tool: list(members) for members in (groups or {}).values() for tool in members}
+
+        documents = [Counter(tokenize(_schema_text(schema))) for schema in self.tool_schemas]
+        document_frequency = Counter(term for document in documents for term in document)
+        total = len(documents)
+        self.idf = {term: math.log((1 + total) / (1 + count)) + 1 for term, count in document_frequency.items()}
+        self.vectors = [self._weigh(document) for document in documents]
+        self.names = [schema["function"]["name"] for schema in self.tool_schemas]
+
+    def _weigh(self, counts: Counter) -> Dict[str, float]:
+        vector = {term: (1 + math.log(count)) * self.idf[term] for term, count in counts.items() if term in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def scores(self, query: str) -> Dict[str, float]:
+        query_vector = self._weigh(Counter(tokenize(query)))
+        return {
+            name: sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items())
+            for name, vector in zip(self.names, self.vectors)
+        }
+
+    def _query(self, messages: Sequence[Dict]) -> str:
+        user_messages = [message.get("content") or "" for message in messages if message.get("role") == "user"]
+        return " ".join(user_messages[-self.context_user_messages:])
+
+    def select(self, messages: Sequence[Dict], used_tools: Iterable[str] = ()) -> List[Dict]:
+        """Schemas to send for the next request, in their original order"""
+        scores = self.scores(self._query(messages))
+        best = sorted((name for name in self.names if scores[name] >= self.min_score),
+                      key=lambda name: scores[name], reverse=True)[:self.top_k]
+        used_tools = list(used_tools)
+        if not best and not used_tools:
+            return self.tool_schemas
+
+        # A message without keywords ("yes", "Smith") carries on with the process already in use
+        selected = set()
+        for name in best + used_tools:
+            selected.update(self.group_of.get(name, [name]))
+        return [schema for schema, name in zip(self.tool_schemas, self.names) if name in selected]
@@ -0,0 +1,282 @@
+"""
+Validation of the arguments the LLM passes to its tool calls.
+
+compile_tool_validators() turns TOOL_SCHEMAS into one validator per tool when the agent module
+is imported, checking each schema against the signature of the method that implements it: a
+property the method doesn't accept, or a method parameter without default the schema doesn't
+list, fails right there instead of in the middle of a conversation. Parameters the method
+requires count as required even when the schema's "required" list omits them.
+
+A validator takes the raw JSON arguments of a tool call and returns the arguments to call the
+tool with, coerced where the intent is unambiguous ("2" for an integer, 650 for a string, null
+for an optional argument), or an error result listing every problem at once, so the model can
+fix the call in one iteration. Strings with "format": "date" must be YYYY-MM-DD dates, and the
+lists of a *_many batch tool must have the same length:
+
+    {"error": "Invalid arguments for calculate_cancellation_fee, nothing was run. Fix them and call it again",
+     "invalid_arguments": [{"argument": "cancellation_date", "problem": "missing"}],
+     "expected": {"booking_ref": "string", "cancellation_date": "string"}}
+"""
+import datetime
+import inspect
+import json
+import re
+import typing
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Schema type each Python annotation of a tool parameter may be declared as
+_ANNOTATION_TYPES = {str: {"string"}, int: {"integer"}, float: {"number", "integer"}, bool: {"boolean"},
+                     list: {"array"}, dict: {"object"}}
+
+# Strings with "format": "date" are dates the tools parse with date.fromisoformat
+_ISO_DATE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+Problems = List[Dict[str, str]]
+Checker = Callable[[Any, str, Problems], Any]
+
+
+def _describe(value: Any) -> str:
+    text = json.dumps(value, default=str)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+def _compile(schema: Dict[str, Any]) -> Checker:
+    """Checker for a JSON schema node: returns the coerced value, appends to problems if invalid"""
+    schema_type = schema.get("type")
+    if schema_type == "string" and schema.get("format") == "date":
+        def check(value, path, problems):
+            if isinstance(value, str) and _ISO_DATE.fullmatch(value.strip()):
+                try:
+                    datetime.date.fromisoformat(value.strip())
+                    return value.strip()
+                except ValueError:
+                    pass
+            problems.append({"argument": path, "problem": f"expected a date as YYYY-MM-DD, got {_describe(value)}"})
+    elif schema_type == "string":
+        def check(value, path, problems):
+            if isinstance(value, str):
+                return value
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+            problems.append({"argument": path, "problem": f"expected a string, got {_describe(value)}"})
+    elif schema_type == "integer":
+        def check(value, path, problems):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if isinstance(value, str):
+                try:
+                    return int(value.strip())
+                except ValueError:
+                    pass
+            problems.append({"argument": path, "problem": f"expected an integer, got {_describe(value)}"})
+    elif schema_type == "number":
+        def check(value, path, problems):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                try:
+                    return float(value.strip().lstrip("$"))
+                except ValueError:
+                    pass
+            problems.append({"argument": path, "problem": f"expected a number, got {_describe(value)}"})
+    elif schema_type == "boolean":
+        def check(value, path, problems):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.lower() in ("true", "false"):
+                return value.lower() == "true"
+            problems.append({"argument": path, "problem": f"expected true or false, got {_describe(value)}"})
+    elif schema_type == "array":
+        check_item = _compile(schema.get("items", {}))
+
+        def check(value, path, problems):
+            if not isinstance(value, list):
+                problems.append({"argument": path, "problem": f"expected an array, got {_describe(value)}"})
+                return None
+            return [check_item(item, f"{path}[{index}]", problems) for index, item in enumerate(value)]
+    elif schema_type == "object":
+        check_object = _object_checker(schema, allow_unknown=schema.get("additionalProperties", True) is not False)
+
+        def check(value, path, problems):
+            if not isinstance(value, dict):
+                problems.append({"argument": path, "problem": f"expected an object, got {_describe(value)}"})
+                return None
+            return check_object(value, path, problems)
+    else:
+        def check(value, path, problems):
+            return value
+
+    if "enum" not in schema:
+        return check
+    allowed = schema["enum"]
+    check_type = check
+
+    def check(value, path, problems):
+        value = check_type(value, path, problems)
+        if value is not None and value not in allowed:
+            problems.append({"argument": path, "problem": f"expected one of {_describe(allowed)}, "
+                                                          f"got {_describe(value)}"})
+        return value
+
+    return check
+
+
+def _object_checker(schema: Dict[str, Any], allow_unknown: bool,
+                    required: Sequence[str] = ()) -> Callable[[Dict, str, Problems], Dict]:
+    checkers = {name: _compile(property_schema) for name, property_schema in schema.get("properties", {}).items()}
+    required = set(schema.get("required", ())) | set(required)
+
+    def check(value, path, problems):
+        prefix = f"{path}." if path else ""
+        arguments = {}
+        for name, argument in value.items():
+            checker = checkers.get(name)
+            if checker is None:
+                if allow_unknown:
+                    arguments[name] = argument
+                else:
+                    problems.append({"argument": prefix + name, "problem": "unknown argument"})
+            elif argument is not None:
+                arguments[name] = checker(argument, prefix + name, problems)
+        # Null counts as not given: optional arguments fall back to their defaults
+        problems += [{"argument": prefix + name, "problem": "missing"} for name in required
+                     if value.get(name) is None]
+        return arguments
+
+    return check
+
+
+class ToolValidator:
+    """Compiled argument validator of one tool"""
+
+    def __init__(self, name: str, parameters: Dict[str, Any], required: Sequence[str] = (),
+                 accepts_unknown: bool = False, same_length: Sequence[str] = ()):
+        """
+        same_length: array arguments that must have as many items as each other, the columns of
+            a batch tool
+        """
+        self.name = name
+        self.required = sorted(set(parameters.get("required", ())) | set(required))
+        self.expected = {name: property_schema.get("type", "any")
+                               + (" YYYY-MM-DD" if property_schema.get("format") == "date" else "")
+                         for name, property_schema in parameters.get("properties", {}).items()}
+        self.same_length = list(same_length)
+        self._check = _object_checker(parameters, accepts_unknown, required)
+
+    def __call__(self, raw_arguments: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(arguments, None) when the call is valid, else (None, error result for the LLM)"""
+        try:
+            arguments = json.loads(raw_arguments) if raw_arguments else {}
+        except ValueError as e:
+            return None, self._error([{"argument": "", "problem": f"arguments are not valid JSON: {e}"}])
+        if not isinstance(arguments, dict):
+            return None, self._error([{"argument": "", "problem": "arguments must be a JSON object"}])
+        problems: Problems = []
+        arguments = self._check(arguments, "", problems)
+        lengths = {name: len(arguments[name]) for name in self.same_length if isinstance(arguments.get(name), list)}
+        if len(set(lengths.values())) > 1:
+            problems.append({"argument": ", ".join(lengths),
+                             "problem": "all lists must have the same length, got "
+                                        + ", ".join(f"{length} {name}" for name, length in lengths.items())})
+        if problems:
+            return None, self._error(problems)
+        return arguments, None
+
+    def _error(self, problems: Problems) -> Dict[str, Any]:
+        return {"error": f"Invalid arguments for {self.name}, nothing was run. Fix them and call it again",
+                "invalid_arguments": problems,
+                "expected": {name: f"{schema_type}{'' if name in self.required else ', optional'}"
+                             for name, schema_type in self.expected.items()}}
+
+
+def _annotation_types(annotation) -> Optional[set]:
+    """Schema types an annotation allows, None when it doesn't constrain them"""
+    if annotation is inspect.Parameter.empty or annotation is Any:
+        return None
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        types = [_annotation_types(argument) for argument in typing.get_args(annotation)
+                 if argument is not type(None)]
+        return None if any(allowed is None for allowed in types) else set().union(*types)
+    return _ANNOTATION_TYPES.get(origin or annotation)
+
+
+def _check_signature(name: str, parameters: Dict[str, Any],
+                     tool_func: Callable[..., Any]) -> Tuple[List[str], List[str]]:
+    """The parameters the tool requires, and how the schema disagrees with the tool's signature"""
+    signature_parameters = inspect.signature(tool_func).parameters
+    properties = parameters.get("properties", {})
+    accepts_any = any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in signature_parameters.values())
+    problems = []
+    for property_name, property_schema in properties.items():
+        parameter = signature_parameters.get(property_name)
+        if parameter is None:
+            if not accepts_any:
+                problems.append(f"{name}: the schema has {property_name!r}, which the tool doesn't accept")
+            continue
+        allowed = _annotation_types(parameter.annotation)
+        if allowed is not None and property_schema.get("type") not in allowed:
+            problems.append(f"{name}: {property_name!r} is {property_schema.get('type')!r} in the schema but "
+                            f"annotated {parameter.annotation}")
+    required = [parameter_name for parameter_name, parameter in signature_parameters.items()
+                if parameter.default is inspect.Parameter.empty
+                and parameter.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)]
+    problems += [f"{name}: the tool requires {parameter_name!r}, which the schema doesn't have"
+                 for parameter_name in required if parameter_name not in properties]
+    return required, problems
+
+
+class ToolValidators:
+    """Validators by tool name, see compile_tool_validators()"""
+
+    def __init__(self, validators: Dict[str, ToolValidator]):
+        self.validators = validators
+
+    def get(self, tool_name: str) -> Optional[ToolValidator]:
+        return self.validators.get(tool_name)
+
+    def __contains__(self, tool_name: str) -> bool:
+        return tool_name in self.validators
+
+    def extended(self, schemas: Sequence[Dict[str, Any]]) -> "ToolValidators":
+        """Copy with validators for extra schemas that have no method to check against, e.g. macro tools"""
+        validators = dict(self.validators)
+        validators.update((schema["function"]["name"],
+                           ToolValidator(schema["function"]["name"], schema["function"].get("parameters", {})))
+                          for schema in schemas)
+        return ToolValidators(validators)
+
+    def validate(self, tool_name: str, raw_arguments: Optional[str]):
+        """(arguments, error result): tools without a validator get their arguments parsed only"""
+        validator = self.validators.get(tool_name)
+        if validator is None:
+            try:
+                return (json.loads(raw_arguments) if raw_arguments else {}), None
+            except ValueError as e:
+                return None, {"error": f"Arguments of {tool_name} are not valid JSON: {e}"}
+        return validator(raw_arguments)
+
+
+def compile_tool_validators(schemas: Sequence[Dict[str, Any]], tools: Any) -> ToolValidators:
+    """Validators for the function `schemas`, checked against the methods of `tools` (a class or
+    instance) that implement them. Raises ValueError listing every mismatch."""
+    validators = {}
+    problems = []
+    for schema in schemas:
+        name = schema["function"]["name"]
+        parameters = schema["function"].get("parameters", {})
+        tool_func = getattr(tools, name, None)
+        if tool_func is None:
+            problems.append(f"{name}: {getattr(tools, '__name__', type(tools).__name__)} has no such tool")
+            continue
+        required, signature_problems = _check_signature(name, parameters, tool_func)
+        problems += signature_problems
+        # The *_many batch tools take one list per argument of the single tool, entry i of each is call i
+        same_length = ([property_name for property_name, property_schema in parameters.get("properties", {}).items()
+                        if property_schema.get("type") == "array"] if name.endswith("_many") else ())
+        validators[name] = ToolValidator(name, parameters, required, same_length=same_length)
+    if problems:
+        raise ValueError("Tool schemas don't match the tools:\n" + "\n".join(problems))
+    return ToolValidators(validators)
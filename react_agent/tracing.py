@@ -0,0 +1,152 @@
+"""
+Latency tracing for the ReAct loop.
+
+A trace is a tree of spans: turn -> iteration -> llm_request / tool_call. Finished spans are
+handed to exporters as plain dicts, e.g. JsonlSpanExporter for a local file or
+InMemorySpanCollector in tests and benchmarks:
+
+    collector = InMemorySpanCollector()
+    agent = RealLLMTravelAgent(tracer=Tracer(collector))
+
+The current span lives in a contextvar, so nesting follows asyncio tasks and any thread that
+runs inside a copied context. NOOP_TRACER, the default, hands out one shared do-nothing span,
+which keeps the disabled path to a method call.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "attributes",
+                 "start_time", "_start", "duration", "_token")
+
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = os.urandom(8).hex()
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer.export(self.to_dict())
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    recording = False
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, *exporters):
+        self.exporters = list(exporters)
+
+    def span(self, name: str, **attributes) -> Span:
+        return Span(self, name, attributes)
+
+    def export(self, span: Dict[str, Any]):
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+class NoopTracer:
+    enabled = False
+
+    def span(self, name: str, **attributes) -> _NoopSpan:
+        return _NOOP_SPAN
+
+
+NOOP_TRACER = NoopTracer()
+
+
+class InMemorySpanCollector:
+    """Keeps finished spans in a list, children before their parents"""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]):
+        with self._lock:
+            self.spans.append(span)
+
+    def by_name(self, name: str) -> List[Dict[str, Any]]:
+        return [span for span in self.spans if span["name"] == name]
+
+    def children(self, span: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [child for child in self.spans if child["parent_id"] == span["span_id"]]
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonlSpanExporter:
+    """Appends one JSON line per finished span to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]):
+        line = json.dumps(span, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
@@ -0,0 +1,30 @@
+import pytest
+
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.cache import CachedTravelTools
+
+
+@pytest.mark.parametrize("tool_name, spellings", [
+    ("get_country_entry_requirements", [("USA",), ("US",)]),
+    ("get_visa_requirements", [("india", "FR"), ("IN", "FR")]),
+])
+def test_cached_result_does_not_depend_on_call_order(tool_name, spellings):
+    results = []
+    for order in (spellings, spellings[::-1]):
+        tools = CachedTravelTools(TravelTools())
+        results.append([getattr(tools, tool_name)(*args) for args in order])
+        assert results[-1][0] == results[-1][1]
+        assert tools.cache_stats()[tool_name]["hits"] == 1
+    assert results[0] == results[1]
+
+
+def test_cached_result_matches_the_tool_called_with_the_canonical_spelling():
+    tools = CachedTravelTools(TravelTools())
+    assert tools.get_visa_requirements("india", "FR") == TravelTools.get_visa_requirements("IN", "FR")
+    assert tools.get_visa_requirements("india", "FR")["visa_required"] is True
+
+
+def test_loyalty_tiers_are_never_served_from_the_cache():
+    tools = CachedTravelTools(TravelTools())
+    tools.check_loyalty_status("AXQW123456")
+    assert "check_loyalty_status" not in tools.cache_stats()
@@ -0,0 +1,25 @@
+from calm.shared_tools.booking import TravelTools
+
+
+def test_cancellation_fee_leaves_the_waiver_to_the_loyalty_discount():
+    fee = TravelTools.calculate_cancellation_fee("CONF12345", "2025-08-20")
+    assert fee["cancellation_fee"] == 200.0
+    assert fee["refund_amount"] == 450.0
+    refund = TravelTools.apply_loyalty_discount("Platinum", fee["original_amount"], fee["cancellation_fee"],
+                                                "CONF12345")
+    assert refund["loyalty_waiver_percentage"] == 100
+    assert refund["refund_amount"] == 650.0
+
+
+def test_loyalty_discount_uses_the_fare_rules_of_the_booking():
+    # CONF12345 was booked under version 1, which waives nothing for Gold; version 2 waives 25%
+    assert TravelTools.apply_loyalty_discount("Gold", 650.0, 200.0, "CONF12345")["refund_amount"] == 450.0
+    assert TravelTools.apply_loyalty_discount("Gold", 650.0, 200.0)["refund_amount"] == 500.0
+
+
+def test_unknown_booking_references_are_not_quoted():
+    error = {"error": "No booking found with reference CONF99999"}
+    assert TravelTools.calculate_cancellation_fee("CONF99999", "2025-08-20") == error
+    assert TravelTools.calculate_cancellation_fee_many(["CONF99999"], ["2025-08-20"]) == [error]
+    assert TravelTools.get_fare_rules("Delta", "Economy", booking_ref="CONF99999") == error
+    assert TravelTools.apply_loyalty_discount("Platinum", 650.0, 200.0, "CONF99999") == error
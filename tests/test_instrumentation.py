@@ -0,0 +1,33 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.instrumentation import (InMemoryMetrics, PrometheusTextfileSink, configure_instrumentation,
+                                                disable_instrumentation)
+
+
+class FailingSink:
+    def record(self, event):
+        raise OSError("disk full")
+
+
+def test_failing_sink_does_not_fail_the_tool_call():
+    metrics = InMemoryMetrics()
+    configure_instrumentation(FailingSink(), metrics)
+    try:
+        result = TravelTools.get_visa_requirements("IN", "FR")
+    finally:
+        disable_instrumentation()
+    assert result == TravelTools.get_visa_requirements("IN", "FR")
+    assert metrics.snapshot()["get_visa_requirements"]["calls"] == 1
+
+
+def test_concurrent_textfile_writes_do_not_fail(tmp_path):
+    path = tmp_path / "travel_tools.prom"
+    sink = PrometheusTextfileSink(str(path), interval=0)
+    event = {"tool": "get_visa_requirements", "time": 0.0, "duration_ms": 1.0, "error": None,
+             "argument_bytes": None, "result_bytes": None}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: sink.record(event), range(400)))
+    assert 'travel_tools_calls_total{tool="get_visa_requirements"}' in path.read_text()
+    assert os.listdir(tmp_path) == ["travel_tools.prom"]
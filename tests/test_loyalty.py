@@ -0,0 +1,10 @@
+from calm.shared_tools.loyalty import LoyaltyIndex, member_key, write_loyalty_index
+
+
+def test_bookings_without_a_member_have_no_tier(tmp_path):
+    path = str(tmp_path / "loyalty.idx")
+    write_loyalty_index(path, [("AXQW123456", "Platinum"), ("M000000001", "Gold")])
+    assert member_key(None) is None
+    with LoyaltyIndex(path) as index:
+        assert index.tier(None) is None
+        assert index.tiers_many([None, "axqw123456 ", None, "M000000001"]) == [None, "Platinum", None, "Gold"]
@@ -0,0 +1,42 @@
+import json
+from types import SimpleNamespace
+
+from react_agent.model_routing import ModelRouter
+
+
+class AcceptingValidators:
+    @staticmethod
+    def validate(name, arguments):
+        return json.loads(arguments), None
+
+
+def response(*calls, content=None):
+    tool_calls = [SimpleNamespace(function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+                  for name, arguments in calls]
+    message = SimpleNamespace(content=content, tool_calls=tool_calls or None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_a_call_repeated_within_one_response_escalates():
+    turn = ModelRouter().start_turn()
+    route = turn.route()
+    duplicated = response(("get_booking_details", {"booking_reference": "CONF12345"}),
+                          ("get_booking_details", {"booking_reference": "CONF12345"}))
+    assert turn.review(route, duplicated, 0.1, AcceptingValidators).name == "escalation"
+    assert turn.router.rejected == {"repeated_call": 1}
+
+
+def test_iterations_that_are_usually_the_answer_go_straight_to_the_large_model():
+    router = ModelRouter(min_samples=3)
+    payment = response(("process_payment", {"amount": 650.0}))
+    for _ in range(3):
+        turn = router.start_turn()
+        assert turn.review(turn.route(), payment, 0.1, AcceptingValidators) is None
+        route = turn.route()
+        assert route.name == "dispatch"
+        assert turn.review(route, response(content="Booked."), 0.1, AcceptingValidators).name == "reask"
+
+    turn = router.start_turn()
+    assert turn.route().name == "dispatch"
+    turn.review(turn.route(), payment, 0.1, AcceptingValidators)
+    assert turn.route() == ("answer", "gpt-4o")
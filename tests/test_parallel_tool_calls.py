@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-test")
+
+from flight_agent_react import RealLLMTravelAgent
+
+
+class SlowVisaTools:
+    """get_visa_requirements taking longer for earlier calls, counting how many run at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def get_visa_requirements(self, passport_country: str, destination: str):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05 if passport_country == "P0" else 0.01)
+        with self._lock:
+            self.running -= 1
+        return {"passport_country": passport_country, "destination": destination}
+
+
+def tool_call(index: int):
+    arguments = json.dumps({"passport_country": f"P{index}", "destination": "FR"})
+    return SimpleNamespace(id=f"call_{index}",
+                           function=SimpleNamespace(name="get_visa_requirements", arguments=arguments))
+
+
+def test_parallel_tool_calls_keep_their_order_and_respect_the_limits():
+    calls = [tool_call(index) for index in range(6)]
+    with RealLLMTravelAgent(max_tool_workers=4, tool_concurrency_limits={"get_visa_requirements": 2},
+                            tools=SlowVisaTools()) as agent:
+        results = agent.process_function_calls(calls)
+        assert agent.tools.max_running == 2
+    assert [result["call_id"] for result in results] == [call.id for call in calls]
+    assert [result["result"]["passport_country"] for result in results] == [f"P{index}" for index in range(6)]
+
+
+def test_close_shuts_the_tool_pool_down():
+    agent = RealLLMTravelAgent(max_tool_workers=4, tools=SlowVisaTools())
+    agent.process_function_calls([tool_call(0), tool_call(1)])
+    executor = agent._tool_executor
+    agent.close()
+    assert agent._tool_executor is None
+    assert executor._shutdown
+
+
+class SleepingVisaTools:
+    def get_visa_requirements(self, passport_country: str, destination: str):
+        time.sleep(0.1)
+        return {"passport_country": passport_country, "destination": destination}
+
+
+def test_tool_calls_of_one_turn_run_concurrently():
+    with RealLLMTravelAgent(max_tool_workers=3, tools=SleepingVisaTools()) as agent:
+        start = time.perf_counter()
+        results = agent.process_function_calls([tool_call(index) for index in range(3)])
+        elapsed = time.perf_counter() - start
+    assert [result["result"]["passport_country"] for result in results] == ["P0", "P1", "P2"]
+    # One after the other the three 100 ms calls take 300 ms
+    assert elapsed < 0.2
@@ -0,0 +1,36 @@
+import pytest
+
+from calm.shared_tools.passports import PassportRules
+
+
+@pytest.mark.parametrize("country", [None, "", "Narnia"])
+def test_numbers_without_a_known_issuing_country_are_not_valid(country):
+    rules = PassportRules()
+    assert rules.validate_number("IN1234567", country) is False
+    check, = rules.validate_manifest([{"passport_number": "IN1234567", "nationality": country,
+                                       "expiry_date": "2030-01-01"}], "2025-09-15")
+    assert not check["valid"] and not check["format_valid"]
+
+
+def test_numbers_are_checked_against_the_issuing_country():
+    rules = PassportRules()
+    assert rules.validate_number("IN1234567", "India")
+    assert not rules.validate_number("IN1234567", "US")
+
+
+def test_unreadable_fields_only_fail_their_passenger():
+    rules = PassportRules()
+    checks = rules.validate_manifest([
+        {"passport_number": "IN1234567", "nationality": "India", "expiry_date": "01/2030"},
+        {"passport_number": ["IN1234567"], "nationality": "India", "expiry_date": "2030-01-01"},
+        {"passport_number": 123456789, "nationality": "US", "expiry_date": "01/01/2030"},
+    ], "2025-09-15")
+    assert checks[0]["errors"] == ["expiry date not a date"]
+    assert checks[1]["errors"][0] == "passport number not text"
+    assert checks[2]["valid"] and checks[2]["passport_number"] == "123456789"
+
+
+def test_expiry_status_reads_the_dates_alike():
+    rules = PassportRules()
+    assert rules.expiry_status("IN1234567", "15/09/2025", "01/01/2030") == \
+        rules.expiry_status("IN1234567", "15/09/2025", "2030-01-01")
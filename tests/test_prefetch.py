@@ -0,0 +1,22 @@
+import asyncio
+
+from calm.shared_tools.async_booking import AsyncTravelTools
+from calm.shared_tools.booking import TravelTools
+from calm.shared_tools.prefetch import Prefetcher
+
+
+def test_bookings_without_a_member_are_prefetched():
+    async def run():
+        prefetcher = Prefetcher(AsyncTravelTools())
+        booking_details = TravelTools.get_booking_details("CONF12345")
+        del booking_details["member_id"]
+        prefetcher.prefetch_cancellation("conversation", booking_details, "2025-08-20")
+        loyalty = await prefetcher.call("conversation", "check_loyalty_status", None)
+        fee = await prefetcher.call("conversation", "calculate_cancellation_fee", "CONF12345", "2025-08-20")
+        prefetcher.discard("conversation")
+        return loyalty, fee, prefetcher.stats()
+
+    loyalty, fee, stats = asyncio.run(run())
+    assert loyalty == {"member_id": None, "status": None}
+    assert fee["cancellation_fee"] == 200.0
+    assert stats == {"conversations": 0, "hits": 2, "misses": 0}
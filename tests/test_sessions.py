@@ -0,0 +1,22 @@
+from react_agent.sessions import SessionStore
+
+
+def test_turn_added_to_an_evicted_session_is_kept():
+    store = SessionStore(":memory:", max_resident_sessions=1)
+    history_a = store.get("A")
+    store.get("B")
+    history_a.add_turn("cancel my flight booking", "Please share your booking reference.")
+    store.save("A")
+
+    assert store.get("A").messages == history_a.messages
+    assert len(store.get("A").messages) == 2
+
+
+def test_evicted_session_reloads_from_disk_once_released():
+    store = SessionStore(":memory:", max_resident_sessions=1)
+    store.get("A").add_turn("hello", "Hi, how can I help?")
+    store.save("A")
+    store.get("B")
+
+    assert store.stats()["resident_sessions"] == 1
+    assert len(store.get("A").messages) == 2
@@ -0,0 +1,53 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-test")
+
+from flight_agent_react import AsyncRealLLMTravelAgent, RealLLMTravelAgent
+
+VISA_CALL = SimpleNamespace(index=0, id="call_0", function=SimpleNamespace(
+    name="get_visa_requirements", arguments=json.dumps({"passport_country": "IN", "destination": "FR"})))
+
+
+def chunk(content=None, tool_calls=None):
+    return SimpleNamespace(model="fake", usage=None,
+                           choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+
+# The first reply writes a preamble before its tool call, the second is the answer
+SCRIPT = [[chunk("Let me "), chunk("check that. "), chunk(tool_calls=[VISA_CALL])],
+          [chunk("You need "), chunk("a visa.")]]
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.replies = iter(SCRIPT)
+
+    def create(self, **kwargs):
+        return iter(next(self.replies))
+
+
+class AsyncFakeCompletions(FakeCompletions):
+    async def create(self, **kwargs):
+        async def chunks():
+            for reply_chunk in next(self.replies):
+                yield reply_chunk
+        return chunks()
+
+
+def test_only_the_answer_is_streamed():
+    agent = RealLLMTravelAgent(llm_client=SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions())))
+    assert list(agent.react_loop_stream("Do I need a visa for France?")) == ["You need ", "a visa."]
+    assert agent.last_turn_timing["time_to_first_token"] is not None
+
+
+def test_async_agent_streams_the_answer():
+    agent = AsyncRealLLMTravelAgent(
+        llm_client=SimpleNamespace(chat=SimpleNamespace(completions=AsyncFakeCompletions())))
+
+    async def tokens():
+        return [token async for token in agent.react_loop_stream("Do I need a visa for France?")]
+
+    assert asyncio.run(tokens()) == ["You need ", "a visa."]
@@ -0,0 +1,44 @@
+import json
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-test")
+
+from flight_agent_react import TOOL_VALIDATORS, RealLLMTravelAgent
+
+
+def tool_call(name, **arguments):
+    return SimpleNamespace(id=f"call_{name}", function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def problems(name, **arguments):
+    arguments, error = TOOL_VALIDATORS.validate(name, json.dumps(arguments))
+    return error["invalid_arguments"] if error is not None else []
+
+
+def test_dates_must_be_iso_dates():
+    assert problems("calculate_cancellation_fee", booking_ref="CONF12345", cancellation_date="tomorrow") == [
+        {"argument": "cancellation_date", "problem": 'expected a date as YYYY-MM-DD, got "tomorrow"'}]
+    assert problems("check_passport_expiry_status", passport_number="US12345678", country="US",
+                    travel_date="15 Sept")[0]["argument"] == "travel_date"
+    assert problems("calculate_cancellation_fee_many", booking_refs=["CONF12345"],
+                    cancellation_dates=["2025-02-30"])[0]["argument"] == "cancellation_dates[0]"
+    assert problems("calculate_cancellation_fee", booking_ref="CONF12345", cancellation_date="2025-08-20") == []
+
+
+def test_batch_lists_must_have_the_same_length():
+    assert problems("calculate_cancellation_fee_many", booking_refs=["CONF12345", "CONF12345"],
+                    cancellation_dates=["2025-08-20"]) == [
+        {"argument": "booking_refs, cancellation_dates",
+         "problem": "all lists must have the same length, got 2 booking_refs, 1 cancellation_dates"}]
+
+
+def test_a_tool_raising_is_reported_to_the_model_instead_of_ending_the_turn():
+    class FailingTools:
+        @staticmethod
+        def get_booking_details(booking_reference):
+            raise KeyError("flight")
+
+    agent = RealLLMTravelAgent(tools=FailingTools())
+    result, = agent.process_function_calls([tool_call("get_booking_details", booking_reference="CONF12345")])
+    assert "get_booking_details failed" in result["result"]["error"]